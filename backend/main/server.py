@@ -1,37 +1,150 @@
 import os
+import math
 from pathlib import Path
 import shutil
 import time
 import json
 import asyncio
+from contextlib import asynccontextmanager
 from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
-from fastapi import FastAPI, File, UploadFile
+from fastapi import FastAPI, File, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+from pydantic import BaseModel
 
-from pipeline.realtime_pipeline import realtime_pipeline
+from pipeline.realtime_pipeline import get_default_pipeline
+from tsm import load_tsm
 from pipeline.pipeline import pipeline
+from realtime_handling.camera_registry import CameraRegistry
+from realtime_handling.connect_phone_cam import CAPTURE_BACKENDS
+from realtime_handling.broadcast import BroadcastHub, EventHub
+from realtime_handling.event_engine import ViolenceEventEngine
+from realtime_handling.tick_scheduler import TickScheduler
+from realtime_handling.binary_protocol import DeltaEncoder
+from realtime_handling.preview_stream import PreviewHub, BOUNDARY
+from realtime_handling.activation import ACTIVATION_POLICIES
+from realtime_handling.latency import LatencyMonitor
+from realtime_handling.shm_ingest import get_ingest_pool
+from realtime_handling.roi import normalize_rois
+from realtime_handling.history_store import HistoryStore
 
 # -------------------------
 # Config
 # -------------------------
-NUM_CAMERAS = int(input("Number of camera (from 1 - 8): "))
-lst_camera_urls = []
-for i in range(NUM_CAMERAS):
-    camera_url = input("Link of " + str(i + 1) + "th camera: ")
-    lst_camera_urls.append(camera_url)
+# Cameras are managed at runtime through /cameras and persisted in this file
+CAMERA_REGISTRY_PATH = os.environ.get("CAMERA_REGISTRY_PATH", "cameras.json")
+camera_registry = CameraRegistry(CAMERA_REGISTRY_PATH)
+camera_sync_lock = asyncio.Lock()
+
+# Target rate of the realtime loop (ticks/sec); overrunning ticks are skipped, not queued
+REALTIME_TICK_HZ = float(os.environ.get("REALTIME_TICK_HZ", 5))
+
+# Binary WebSocket stream: skip cameras that moved less than this (percentage points)
+WS_DELTA_EPSILON = 2
+# ... and send a full keyframe every N results so clients can resync
+WS_KEYFRAME_INTERVAL = 10
+
+# Re-scoring logged features with another TSM checkpoint: only .pt files of this directory
+TSM_CHECKPOINT_DIR = "tsm"
+
+# MJPEG previews re-served from the backend's own capture workers
+PREVIEW_MAX_WIDTH = 640
+PREVIEW_FPS = 10.0
 
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # Thread pool để chạy pipeline nặng mà không block server
 executor = ThreadPoolExecutor(max_workers=4)
+# One dedicated thread for the realtime loop, so ticks never overlap or wait behind uploads
+inference_executor = ThreadPoolExecutor(max_workers=1)
+
+# Realtime pipeline (loads the backbone and TSM checkpoints)
+default_pipeline = get_default_pipeline()
+tsm_model = default_pipeline.tsm_model
+
+# Incident clips are recorded by the pipeline's capture workers (see CLIP_* in realtime_pipeline.py)
+clip_recorder = default_pipeline.clip_recorder
+# None unless FEATURE_LOG_DIR is set (see FEATURE_LOG_* in realtime_pipeline.py)
+feature_log = default_pipeline.feature_log
+checkpoint_models = {}
+
+# One preview encoder per watched camera, shared by all its viewers
+# (on_demand cameras only decode while somebody watches their preview)
+preview_hub = PreviewHub(default_pipeline.get_worker, on_watch=default_pipeline.set_demand,
+                         max_width=PREVIEW_MAX_WIDTH, fps=PREVIEW_FPS)
+
+# Every realtime result is published once here and fanned out to all viewers
+realtime_hub = BroadcastHub()
+realtime_ticker = TickScheduler(REALTIME_TICK_HZ)
+# Per-camera capture -> result latency histograms, from the timestamps carried by each result
+latency_monitor = LatencyMonitor()
+
+# Incident detection on top of the realtime results (probabilities in percent, times in seconds)
+event_engine = ViolenceEventEngine(enter_threshold=70, exit_threshold=40, min_duration=2.0, merge_gap=5.0)
+events_hub = EventHub()
+
+# Per-camera probability rollups (1 s to 1 h buckets) and incident events behind GET /history
+HISTORY_DIR = os.environ.get("HISTORY_DIR", "history")
+HISTORY_DEFAULT_POINTS = 500
+HISTORY_MAX_POINTS = 5000
+history_store = HistoryStore(HISTORY_DIR)
 
 # -------------------------
 # FastAPI init
 # -------------------------
-app = FastAPI()
+async def sync_cameras():
+    """Apply the registry to the running pipeline (workers and batch rows)."""
+    loop = asyncio.get_running_loop()
+    # One sync at a time: concurrent CRUD requests must apply their snapshots in order
+    async with camera_sync_lock:
+        await loop.run_in_executor(executor, default_pipeline.set_cameras, camera_registry.list_cameras())
+
+def record_history(result, events, now):
+    history_store.record(result, now=now)
+    history_store.record_events(events, now=now)
+
+async def inference_loop():
+    """
+    The only realtime inference loop: its cost does not depend on how many clients watch.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        # Deadline-aligned ticks: processing time is compensated, overruns skip a tick
+        await realtime_ticker.wait_next()
+        try:
+            # Chạy pipeline trong thread pool để không block server
+            result = await loop.run_in_executor(inference_executor, default_pipeline.run_once)
+            result["timing"]["emitTs"] = round(time.time(), 4)
+            realtime_hub.publish(result)
+            latency_monitor.observe(result)
+            now = time.time()
+            events = event_engine.process(result, now=now)
+            for event in events:
+                events_hub.publish(event)
+            clip_recorder.process_events(events)
+            # Chunk files are created, listed and deleted here: keep that disk I/O off the event loop
+            await loop.run_in_executor(inference_executor, record_history, result, events, now)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[ERROR] Realtime inference failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app):
+    await sync_cameras()
+    inference_task = asyncio.create_task(inference_loop())
+    yield
+    inference_task.cancel()
+    default_pipeline.set_cameras([])
+    if default_pipeline.ingest_mode == "process":
+        # Rings were unlinked by the workers' stop(), the ingest processes still run
+        get_ingest_pool().shutdown()
+    history_store.close()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,18 +158,227 @@ app.add_middleware(
 # Realtime streaming
 # -------------------------
 async def event_generator():
-    loop = asyncio.get_running_loop()
-    while True:
-        # Chạy pipeline trong thread pool để không block server
-        result = await loop.run_in_executor(executor, realtime_pipeline, lst_camera_urls)
+    # Slow clients skip intermediate results instead of queueing them
+    async for result in realtime_hub.subscribe():
         # SSE format
         yield f"data: {json.dumps(result)}\n\n"
-        await asyncio.sleep(1)  # 1s giữa các frame
 
 @app.get("/realtime_stream")
 async def realtime_stream():
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
+async def incident_event_generator():
+    async for event in events_hub.subscribe():
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@app.get("/events_stream")
+async def events_stream():
+    """
+    SSE stream of incident state changes only (incident_start / incident_end).
+    """
+    return StreamingResponse(incident_event_generator(), media_type="text/event-stream")
+
+@app.get("/realtime_stats")
+async def realtime_stats():
+    return JSONResponse({
+        "tick": realtime_ticker.stats(),
+        "viewers": realtime_hub.subscriber_count,
+        "skipped_updates": realtime_hub.skipped_updates,
+        "previews": preview_hub.stats(),
+        "batch": {**default_pipeline.assembler.stats(), "carried_features": default_pipeline.carried_features},
+    })
+
+@app.get("/latency")
+async def latency_stats():
+    """
+    Per-camera latency percentiles (ms) per stage: queue, backbone, tsm, emit and glass_to_result.
+    """
+    return JSONResponse({"cameras": latency_monitor.stats()})
+
+@app.get("/events")
+async def recent_events():
+    return JSONResponse({
+        "active": event_engine.active_incidents(),
+        "events": list(event_engine.recent_events),
+    })
+
+@app.get("/history")
+async def camera_history(camera: int, hours: float = 24, points: int = HISTORY_DEFAULT_POINTS,
+                         start: Optional[float] = None, end: Optional[float] = None):
+    """
+    Probability of a camera over a time range (default: the last `hours`), downsampled to
+    about `points` min / max / mean points, with the incident events of the range.
+    """
+    end = end if end is not None else time.time()
+    start = start if start is not None else end - hours * 3600
+    if not (math.isfinite(start) and math.isfinite(end)) or start >= end or not 1 <= points <= HISTORY_MAX_POINTS:
+        return JSONResponse({"message": f"Need start < end and 1 <= points <= {HISTORY_MAX_POINTS}"},
+                            status_code=400)
+    loop = asyncio.get_running_loop()
+    return JSONResponse(await loop.run_in_executor(executor, history_store.query, camera, start, end, points))
+
+@app.get("/clips")
+async def list_clips():
+    return JSONResponse({"clips": clip_recorder.list_clips(), **clip_recorder.stats()})
+
+@app.get("/clips/{clip_id}")
+async def download_clip(clip_id: str):
+    """
+    Download an incident clip (mp4, or concatenated JPEGs if ffmpeg is not installed).
+    """
+    path, media_type = clip_recorder.clip_file(clip_id)
+    if path is None:
+        return JSONResponse({"message": f"Clip {clip_id} not found"}, status_code=404)
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+class RescoreRequest(BaseModel):
+    cameraId: int
+    start: Optional[float] = None       # unix seconds, default end - 1 hour
+    end: Optional[float] = None         # unix seconds, default now
+    roi: Optional[str] = None           # ROI name, None = the camera's full-frame stream
+    checkpoint: Optional[str] = None    # .pt file in TSM_CHECKPOINT_DIR, None = the live TSM head
+    maxPoints: Optional[int] = 1000
+
+def load_checkpoint(name):
+    if name not in checkpoint_models:
+        checkpoint_models[name] = load_tsm.load_TSM(
+            pt_path=os.path.join(TSM_CHECKPOINT_DIR, name), feature_dim=tsm_model.feature_dim,
+            num_classes=tsm_model.num_classes, n_segment=tsm_model.n_segment)
+    return checkpoint_models[name]
+
+@app.get("/features")
+async def list_feature_streams():
+    if feature_log is None:
+        return JSONResponse({"message": "Feature log is disabled (set FEATURE_LOG_DIR)"}, status_code=404)
+    return JSONResponse({"streams": feature_log.streams(), **feature_log.stats()})
+
+@app.post("/features/rescore")
+async def rescore_features(request: RescoreRequest):
+    """
+    Re-run the TSM head (or another checkpoint) over a camera's logged features, without decoding video.
+    """
+    if feature_log is None:
+        return JSONResponse({"message": "Feature log is disabled (set FEATURE_LOG_DIR)"}, status_code=404)
+    if request.checkpoint is not None:
+        name = request.checkpoint
+        if (os.path.basename(name) != name or not name.endswith(".pt")
+                or not os.path.isfile(os.path.join(TSM_CHECKPOINT_DIR, name))):
+            return JSONResponse({"message": f"Unknown checkpoint '{name}'"}, status_code=400)
+    end = request.end if request.end is not None else time.time()
+    start = request.start if request.start is not None else end - 3600
+
+    def run():
+        head = load_checkpoint(request.checkpoint) if request.checkpoint is not None else tsm_model
+        result = feature_log.rescore(head, request.cameraId, start, end, roi=request.roi,
+                                     max_points=request.maxPoints)
+        return dict(result, checkpoint=request.checkpoint)
+
+    loop = asyncio.get_running_loop()
+    return JSONResponse(await loop.run_in_executor(executor, run))
+
+@app.websocket("/realtime_ws")
+async def realtime_ws(websocket: WebSocket, epsilon: int = WS_DELTA_EPSILON,
+                      keyframe_interval: int = WS_KEYFRAME_INTERVAL):
+    """
+    Same results as /realtime_stream, as compact binary delta frames
+    (format in realtime_handling/binary_protocol.py).
+    """
+    await websocket.accept()
+    encoder = DeltaEncoder(epsilon=epsilon, keyframe_interval=max(keyframe_interval, 1))
+    try:
+        async for result in realtime_hub.subscribe():
+            frame = encoder.encode(result)
+            if frame is not None:
+                await websocket.send_bytes(frame)
+    except WebSocketDisconnect:
+        pass
+
+# -------------------------
+# Camera registry
+# -------------------------
+class CameraConfig(BaseModel):
+    url: str
+    backend: str = "opencv"
+    priority: float = 1.0
+    policy: str = "always_on"  # always_on | on_demand | suspended
+    rois: List[dict] = []      # [{"name", "x", "y", "w", "h"}], fractions of the frame; [] = full frame
+
+class CameraUpdate(BaseModel):
+    url: Optional[str] = None
+    backend: Optional[str] = None
+    priority: Optional[float] = None
+    policy: Optional[str] = None
+    rois: Optional[List[dict]] = None  # [] clears the ROIs
+
+@app.get("/cameras")
+async def list_cameras():
+    return JSONResponse({"cameras": camera_registry.list_cameras()})
+
+@app.get("/cameras/stats")
+async def camera_stats():
+    return JSONResponse({"cameras": default_pipeline.camera_stats()})
+
+@app.get("/cameras/{camera_id}/preview")
+async def camera_preview(camera_id: int):
+    """
+    MJPEG preview of a camera (use as <img src>), encoded once per frame for all viewers.
+    """
+    if default_pipeline.get_worker(camera_id) is None:
+        return JSONResponse({"message": f"Camera {camera_id} not found"}, status_code=404)
+    return StreamingResponse(preview_hub.stream(camera_id),
+                             media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+
+@app.get("/preview")
+async def preview_by_url(url: str):
+    """
+    Same as /cameras/{id}/preview, looked up by source URL (what the frontend knows).
+    """
+    camera_id = default_pipeline.find_camera(url)
+    if camera_id is None:
+        return JSONResponse({"message": f"No running camera with url {url}"}, status_code=404)
+    return StreamingResponse(preview_hub.stream(camera_id),
+                             media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+
+@app.post("/cameras")
+async def add_camera(config: CameraConfig):
+    if config.backend not in CAPTURE_BACKENDS:
+        return JSONResponse({"message": f"Unknown backend '{config.backend}'"}, status_code=400)
+    if config.policy not in ACTIVATION_POLICIES:
+        return JSONResponse({"message": f"Unknown policy '{config.policy}'"}, status_code=400)
+    try:
+        rois = normalize_rois(config.rois)
+    except ValueError as e:
+        return JSONResponse({"message": str(e)}, status_code=400)
+    camera = camera_registry.add(config.url, backend=config.backend, priority=config.priority,
+                                 policy=config.policy, rois=rois)
+    await sync_cameras()
+    return JSONResponse(camera, status_code=201)
+
+@app.patch("/cameras/{camera_id}")
+async def update_camera(camera_id: int, changes: CameraUpdate):
+    changes = {k: v for k, v in changes.model_dump().items() if v is not None}
+    if changes.get("backend", "opencv") not in CAPTURE_BACKENDS:
+        return JSONResponse({"message": f"Unknown backend '{changes['backend']}'"}, status_code=400)
+    if changes.get("policy", "always_on") not in ACTIVATION_POLICIES:
+        return JSONResponse({"message": f"Unknown policy '{changes['policy']}'"}, status_code=400)
+    if "rois" in changes:
+        try:
+            changes["rois"] = normalize_rois(changes["rois"])
+        except ValueError as e:
+            return JSONResponse({"message": str(e)}, status_code=400)
+    camera = camera_registry.update(camera_id, **changes)
+    if camera is None:
+        return JSONResponse({"message": f"Camera {camera_id} not found"}, status_code=404)
+    await sync_cameras()
+    return JSONResponse(camera)
+
+@app.delete("/cameras/{camera_id}")
+async def remove_camera(camera_id: int):
+    if not camera_registry.remove(camera_id):
+        return JSONResponse({"message": f"Camera {camera_id} not found"}, status_code=404)
+    await sync_cameras()
+    return JSONResponse({"message": f"Camera {camera_id} removed"})
+
 # -------------------------
 # -------------------------
 @app.post("/upload_video")
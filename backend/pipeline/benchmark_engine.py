@@ -0,0 +1,169 @@
+"""
+Per-tick allocations and latency jitter of the realtime inference path.
+
+Runs the backbone + streaming TSM step of one realtime tick on synthetic
+224x224 frames (what the capture workers deliver) for every camera, with
+every camera moving, i.e. the worst case of the motion gate. Two paths:
+    - legacy: frames_to_vectors (transform, PIL, torch.stack, model.to().eval()
+      every call) + fancy indexing of the feature cache
+    - engine: RealtimeEngine, all per-tick buffers preallocated and filled in place
+
+Reports per tick:
+    - allocating ops and allocated bytes around the backbone (torch profiler,
+      memory profiling on), and apart the activations allocated inside the
+      ResNet50 forward, which neither path controls
+    - latency p50 / p99 / max and its standard deviation (jitter), profiler off
+
+Example:
+    PYTHONPATH=.:tsm/temporal-shift-module python -m pipeline.benchmark_engine --cameras 4 8 --ticks 40
+"""
+import time
+import argparse
+
+import numpy as np
+import torch
+from torch import nn
+from torch.profiler import profile, record_function, ProfilerActivity
+
+from resnet50.load_resnet50 import load_resnet50_model
+from tsm import load_tsm
+from realtime_handling.frame_to_vector import frames_to_vectors
+from realtime_handling.inference_engine import RealtimeEngine
+from realtime_handling.prediction import predict_realtime_step
+
+
+BACKBONE_SCOPE = "backbone_forward"
+
+
+class LabeledBackbone(nn.Module):
+    """
+    Marks the backbone forward in profiles so its activations can be told apart.
+    """
+    def __init__(self, backbone):
+        super().__init__()
+        self.backbone = backbone
+
+    def forward(self, x):
+        with record_function(BACKBONE_SCOPE):
+            return self.backbone(x)
+
+
+def in_backbone(event):
+    while event is not None:
+        if event.name == BACKBONE_SCOPE:
+            return True
+        event = event.cpu_parent
+    return False
+
+
+def make_tick(mode, num_cameras, resnet50_model, tsm_model, device):
+    """
+    Returns:
+        callable: runs one tick on the next set of synthetic frames
+    """
+    rng = np.random.default_rng(0)
+    frame_pool = [rng.integers(0, 256, (224, 224, 3), dtype=np.uint8) for _ in range(2 * num_cameras)]
+    rows = list(range(num_cameras))
+    camera_ids = [i + 1 for i in rows]
+    state = {"tick": 0, "stream": tsm_model.init_stream_state(num_cameras, device=device)}
+    last_features = torch.zeros(num_cameras, tsm_model.feature_dim, device=device)
+    engine = RealtimeEngine(resnet50_model, device=device, capacity=num_cameras) if mode == "engine" else None
+
+    def tick():
+        offset = (state["tick"] % 2) * num_cameras
+        frames = frame_pool[offset:offset + num_cameras]
+        state["tick"] += 1
+        if engine is None:
+            last_features[rows] = frames_to_vectors(frames, resnet50_model, device=device)
+            features = last_features[rows]
+            _, state["stream"] = predict_realtime_step(tsm_model, features, state["stream"], rows=rows,
+                                                       device=device, camera_ids=camera_ids)
+        else:
+            computed = engine.extract(frames)
+            index = engine.index(rows)
+            with torch.inference_mode():
+                last_features.index_copy_(0, index, computed)
+            features = engine.gather(last_features, index)
+            _, state["stream"] = predict_realtime_step(tsm_model, features, state["stream"], rows=index,
+                                                       device=device, camera_ids=camera_ids)
+        if device == "cuda":
+            torch.cuda.synchronize()
+
+    return tick
+
+
+def count_allocations(tick, ticks):
+    """
+    Returns:
+        tuple: (allocating ops per tick, allocated bytes per tick, backbone activation bytes per tick)
+    """
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+    with profile(activities=activities, profile_memory=True) as prof:
+        for _ in range(ticks):
+            tick()
+    ops, allocated, backbone = 0, 0, 0
+    for event in prof.events():
+        nbytes = max(event.self_cpu_memory_usage, 0) + max(getattr(event, "self_device_memory_usage", 0), 0)
+        if nbytes <= 0:
+            continue
+        if in_backbone(event):
+            backbone += nbytes
+        else:
+            ops += 1
+            allocated += nbytes
+    return ops / ticks, allocated / ticks, backbone / ticks
+
+
+def run_benchmark(mode, num_cameras, resnet50_model, tsm_model, device="cpu", ticks=40, warmup=5, profiled_ticks=5):
+    tick = make_tick(mode, num_cameras, resnet50_model, tsm_model, device)
+    for _ in range(warmup):
+        tick()
+    alloc_ops, alloc_bytes, backbone_bytes = count_allocations(tick, profiled_ticks)
+
+    durations = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        tick()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations = np.array(durations)
+    return {
+        "mode": mode,
+        "cameras": num_cameras,
+        "alloc_ops_per_tick": round(alloc_ops, 1),
+        "alloc_kb_per_tick": round(alloc_bytes / 1024, 1),
+        "backbone_mb_per_tick": round(backbone_bytes / 2 ** 20, 1),
+        "p50_ms": round(float(np.percentile(durations, 50)), 1),
+        "p99_ms": round(float(np.percentile(durations, 99)), 1),
+        "max_ms": round(float(durations.max()), 1),
+        "jitter_ms": round(float(durations.std()), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-tick allocations and jitter of the inference paths")
+    parser.add_argument("--cameras", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--modes", nargs="+", choices=["legacy", "engine"], default=["legacy", "engine"])
+    parser.add_argument("--ticks", type=int, default=40)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    resnet50_model = LabeledBackbone(load_resnet50_model(device=args.device))
+    tsm_model = load_tsm.load_TSM(pt_path="tsm/tsm_feature_epoch_12.pt", feature_dim=2048, num_classes=2,
+                                  n_segment=4).to(args.device)
+
+    results = []
+    for num_cameras in args.cameras:
+        for mode in args.modes:
+            results.append(run_benchmark(mode, num_cameras, resnet50_model, tsm_model, args.device, args.ticks))
+            print(f"[INFO] {results[-1]}")
+
+    columns = list(results[0].keys())
+    print("\n" + " | ".join(columns))
+    for row in results:
+        print(" | ".join(str(row[c]) for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+import pytest
+from torch import nn
+
+import pipeline.realtime_pipeline as realtime_pipeline
+from pipeline.realtime_pipeline import RealtimePipeline
+from realtime_handling.connect_phone_cam import LIVE
+from tsm.tsm_class_definition import TSMFeatureModel
+
+FEATURE_DIM = 16
+
+
+class FakeWorker:
+    """
+    Capture worker without a camera. It records the options it was created with
+    and serves one fixed frame:
+        - at capture_ts, when set (a still source)
+        - otherwise `delay` seconds after tick_start (None = never), the newest
+          frame being stale_age seconds old before that
+    """
+    state = LIVE
+    stale_age = 1.5
+
+    def __init__(self, camera_url, backend="opencv", **options):
+        self.camera_url = camera_url
+        self.backend = backend
+        self.options = options
+        self.frame = np.random.default_rng(len(camera_url)).integers(0, 256, (224, 224, 3), dtype=np.uint8)
+        self.capture_ts = None
+        self.delay = 0.0
+        self.tick_start = time.time()
+
+    def start(self):
+        return self
+
+    def stop(self, timeout=2.0):
+        pass
+
+    def is_live(self):
+        return True
+
+    def peek_latest(self):
+        if self.capture_ts is not None:
+            return self.frame, self.capture_ts
+        now = time.time()
+        if self.delay is None or now - self.tick_start < self.delay:
+            return self.frame, now - self.stale_age
+        return self.frame, now
+
+    read_latest = peek_latest
+
+
+@pytest.fixture
+def fake_worker(monkeypatch):
+    """Every capture worker the pipeline creates (thread or process ingest) is a FakeWorker."""
+    monkeypatch.setattr(realtime_pipeline, "create_capture_worker", FakeWorker)
+    monkeypatch.setattr(realtime_pipeline, "ProcessCaptureWorker", FakeWorker)
+    return FakeWorker
+
+
+@pytest.fixture
+def make_pipeline(fake_worker):
+    """Builds a RealtimePipeline on CPU with a tiny backbone and TSM head instead of the checkpoints."""
+    def make(**kwargs):
+        backbone = nn.Sequential(nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(3, FEATURE_DIM))
+        tsm_model = TSMFeatureModel(feature_dim=FEATURE_DIM, num_classes=2, n_segment=4)
+        return RealtimePipeline(backbone, tsm_model, **{"device": "cpu", "ingest_mode": "thread", **kwargs})
+    return make
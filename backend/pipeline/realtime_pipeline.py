@@ -1,20 +1,517 @@
+import os
 import time
+import threading
+from functools import partial
 
 import cv2
+import torch
 from resnet50.load_resnet50 import load_resnet50_model
 from tsm import load_tsm
 from post_analysis.clean_up import delete_resource
 
-from realtime_handling.frame_to_vector import frames_to_vectors
-from realtime_handling.prediction import predict_realtime
-from realtime_handling.connect_phone_cam import connect_and_stream
+from realtime_handling.inference_engine import RealtimeEngine
+from realtime_handling.prediction import predict_realtime_step
+from realtime_handling.connect_phone_cam import create_capture_worker
+from realtime_handling.shm_ingest import ProcessCaptureWorker
+from realtime_handling.sampling_scheduler import AdaptiveSamplingScheduler
+from realtime_handling.motion import MotionGate
+from realtime_handling.clip_recorder import ClipRecorder
+from realtime_handling.source_pool import SourcePool
+from realtime_handling.activation import ALWAYS_ON, SuspendedWorker, wants_active
+from realtime_handling.batch_assembler import BatchAssembler
+from realtime_handling.roi import ROI_FRAME_SIZE, normalize_rois, roi_rect, crop_roi
+from realtime_handling.feature_log import FeatureLog
+
+device = "cuda" if torch.cuda.is_available() else "cpu"
+
+# Adaptive sampling: total backbone frames/sec shared by all cameras
+INFERENCE_BUDGET_FPS = 8.0
+MIN_CAMERA_RATE = 0.2
+MAX_CAMERA_RATE = 5.0
+
+# Motion gate: reuse the previous feature when the frame barely changed
+MOTION_GATE_THRESHOLD = 2.0
+
+# Batch assembly: a due camera's frame must be at most BATCH_TOLERANCE s old when the tick
+# starts; the tick waits up to BATCH_DEADLINE s for late cameras, then fires without them
+BATCH_TOLERANCE = 0.15
+BATCH_DEADLINE = 0.05
+
+# Ingest mode: "thread" (capture threads in this process) or
+# "process" (decode + resize in a pool of processes, frames shared through shared memory)
+INGEST_MODE = os.environ.get("INGEST_MODE", "thread")
+
+# Incident clips: each camera keeps its last CLIP_PRE_SECONDS of JPEGs in memory
+# (at most CLIP_MAX_BYTES_PER_CAMERA), saved with CLIP_POST_SECONDS after the incident
+CLIP_DIR = "clips"
+CLIP_PRE_SECONDS = 10.0
+CLIP_POST_SECONDS = 5.0
+CLIP_MAX_BYTES_PER_CAMERA = 8 * 1024 * 1024
+CLIP_FPS = 10.0
+
+# ffmpeg cameras (thread ingest): previews and clips use a second, display-size JPEG output
+# of ffmpeg instead of the squashed backbone-size frames
+FFMPEG_DISPLAY_WIDTH = 640
+
+# Feature log: every feature pushed into a TSM window is appended (float16) to
+# FEATURE_LOG_DIR so past footage can be re-scored without decoding it again.
+# Unset = off. Segments rotate at FEATURE_LOG_SEGMENT_BYTES, each stream keeps
+# at most FEATURE_LOG_MAX_BYTES_PER_STREAM.
+FEATURE_LOG_DIR = os.environ.get("FEATURE_LOG_DIR")
+FEATURE_LOG_DTYPE = "float16"
+FEATURE_LOG_SEGMENT_BYTES = 64 * 1024 * 1024
+FEATURE_LOG_MAX_BYTES_PER_STREAM = 2 * 1024 ** 3
+
+TSM_CHECKPOINT = "tsm/tsm_feature_epoch_12.pt"
+
+
+class RealtimePipeline:
+    """
+    Realtime state shared across ticks:
+        - one long-lived capture worker per camera, added and removed at runtime
+        - a streaming TSM state caching the fc1 outputs of each camera's last
+          n_segment frames, so every tick runs the backbone once per new frame
+          and scores the full window at O(1) cost in n_segment
+        - an adaptive sampling scheduler deciding which cameras are worth a
+          backbone pass this tick, from their motion, probability and priority
+        - a motion gate reusing a camera's previous feature on static frames
+        - a RealtimeEngine whose input, feature and index buffers are allocated
+          once per camera count and filled in place every tick
+        - a batch assembler aligning the frames of a tick in time: cameras that
+          miss its deadline carry their last feature forward instead of
+          delaying the batch
+        - optionally a clip recorder fed by the capture workers (thread ingest only,
+          process ingest workers decode in another process)
+        - optionally a feature log keeping every feature pushed into a TSM window
+
+    Cameras with the same URL and backend share one capture worker (SourcePool),
+    and streams reading the same frame share one backbone pass, even when their
+    cameras are due in different ticks.
+
+    A camera can have regions of interest (roi.py). Each ROI is a stream row of
+    its own: its crop goes through the same backbone batch as every other
+    ROI, and it keeps its own TSM window and probability. Cameras without ROIs
+    have one full-frame stream row. Capture, sampling and the motion gate stay
+    per camera; the camera's probability is the highest of its ROIs.
+
+    Each camera has an activation policy (always_on, on_demand, suspended, see
+    activation.py). An inactive camera keeps its batch row but its worker is a
+    SuspendedWorker: no connection, no decoding, never in the backbone batch.
+    """
+    def __init__(self, resnet50_model, tsm_model, device=device,
+                 budget_fps=INFERENCE_BUDGET_FPS, min_rate=MIN_CAMERA_RATE, max_rate=MAX_CAMERA_RATE,
+                 ingest_mode=INGEST_MODE, clip_recorder=None, feature_log=None,
+                 batch_tolerance=BATCH_TOLERANCE, batch_deadline=BATCH_DEADLINE):
+        self.resnet50_model = resnet50_model
+        self.engine = RealtimeEngine(resnet50_model, device=device, feature_dim=tsm_model.feature_dim)
+        self.tsm_model = tsm_model
+        self.device = device
+        self.ingest_mode = ingest_mode
+        self.clip_recorder = clip_recorder
+        self.feature_log = feature_log
+        self.camera_ids = []
+        self.camera_workers = []
+        self.camera_policies = []
+        self.camera_rois = []
+        self.stream_keys = []       # per stream row: (camera_id, roi index)
+        self._camera_streams = []   # per camera row: its stream rows, in ROI order
+        self._stream_frames = []    # per stream row: (worker id, capture ts, rect) of the frame behind its feature
+        self._watchers = {}
+        self.sources = SourcePool(self._create_worker)
+        self.stream_state = tsm_model.init_stream_state(0, device=device)
+        self.scheduler = AdaptiveSamplingScheduler(budget_fps=budget_fps, min_rate=min_rate, max_rate=max_rate)
+        self.motion_gate = MotionGate(threshold=MOTION_GATE_THRESHOLD)
+        self.assembler = BatchAssembler(tolerance=batch_tolerance, deadline=batch_deadline)
+        self.last_features = torch.zeros(0, tsm_model.feature_dim, device=device)
+        self.last_result = None
+        self.frame_capture_ts = {}  # camera_id -> capture time of the newest frame in its window
+        self._tick_capture_ts = {}
+        self.shared_feature_reuses = 0
+        self.carried_features = 0
+        self._lock = threading.Lock()
+
+    def _create_worker(self, source):
+        options = {}
+        if source.frame_size is not None and source.backend != "opencv":
+            # opencv already delivers full resolution frames
+            options["width"], options["height"] = source.frame_size
+        if self.ingest_mode == "process":
+            if source.frame_size is not None:
+                options["frame_shape"] = (source.frame_size[1], source.frame_size[0])
+            return ProcessCaptureWorker(source.camera_url, backend=source.backend, **options).start()
+        if source.backend == "ffmpeg":
+            options["display_width"] = FFMPEG_DISPLAY_WIDTH
+        if self.clip_recorder is not None:
+            def feed(add, data, capture_ts):
+                camera_ids = list(source.camera_ids)
+                if camera_ids:
+                    add(camera_ids, data, capture_ts)
+            if source.backend in ("mjpeg", "ffmpeg"):
+                # The stream is already JPEG (or ffmpeg encodes a display one): buffer the bytes as they are
+                options["on_jpeg"] = partial(feed, self.clip_recorder.add_jpeg)
+            else:
+                options["on_frame"] = partial(feed, self.clip_recorder.add_frame)
+        return create_capture_worker(source.camera_url, backend=source.backend, **options).start()
+
+    def _acquire_worker(self, camera_id, camera_url, backend, active, rois):
+        if not active:
+            return SuspendedWorker(camera_url, backend)
+        # ROIs are cropped from a larger frame than the 224x224 backbone input
+        frame_size = ROI_FRAME_SIZE if rois else None
+        return self.sources.acquire(camera_id, camera_url, backend, frame_size)
+
+    def _release_worker(self, camera_id, worker):
+        """Returns the worker to stop (outside the lock), or None."""
+        if isinstance(worker, SuspendedWorker):
+            return None
+        return self.sources.release(camera_id, worker)
+
+    def _replace_worker(self, i, camera_url, backend, active):
+        """
+        Swap row i to a new source / activity with its history reset. Returns the worker to stop.
+        """
+        camera_id = self.camera_ids[i]
+        self.frame_capture_ts.pop(camera_id, None)
+        stopped = self._release_worker(camera_id, self.camera_workers[i])
+        self.camera_workers[i] = self._acquire_worker(camera_id, camera_url, backend, active, self.camera_rois[i])
+        self.stream_state.reset(self._camera_streams[i])
+        self._mark_log_reset(i)
+        self.scheduler.reset(i)
+        self.motion_gate.reset(i)
+        return stopped
+
+    def _index_streams(self):
+        by_camera = {}
+        for s, (camera_id, k) in enumerate(self.stream_keys):
+            by_camera.setdefault(camera_id, {})[k] = s
+        self._camera_streams = [[streams[k] for k in sorted(streams)]
+                                for streams in (by_camera.get(cid, {}) for cid in self.camera_ids)]
+
+    def _add_streams(self, camera_id, count):
+        """Append count fresh stream rows (one per ROI) for a camera."""
+        self.stream_state.add_rows(count)
+        self.last_features = torch.cat([
+            self.last_features,
+            self.last_features.new_zeros(count, self.tsm_model.feature_dim)
+        ])
+        self.stream_keys.extend((camera_id, k) for k in range(count))
+        self._stream_frames.extend([None] * count)
+        self._index_streams()
+        self._mark_log_reset(self.camera_ids.index(camera_id))
+
+    def _remove_streams(self, streams):
+        drop = set(streams)
+        keep = [s for s in range(len(self.stream_keys)) if s not in drop]
+        self.stream_state.remove_rows(streams)
+        self.last_features = self.last_features[keep]
+        self.stream_keys = [self.stream_keys[s] for s in keep]
+        self._stream_frames = [self._stream_frames[s] for s in keep]
+        self._index_streams()
+
+    def _camera_rects(self, i):
+        return [roi_rect(roi) for roi in self.camera_rois[i]] or [None]
+
+    def set_cameras(self, cameras):
+        """
+        Sync the running cameras with a camera list (e.g. CameraRegistry.list_cameras()).
+
+        Cameras are matched by id: new ids get a capture worker and a fresh batch row,
+        removed ids are torn down, and a camera whose URL, backend or activity changed is
+        restarted with its history reset. A camera whose ROIs changed gets new stream
+        rows. All other cameras keep running untouched.
+
+        Args:
+            cameras (list[dict]): {"id", "url", "backend" (optional), "priority" (optional),
+                                   "policy" (optional, default always_on), "rois" (optional)}
+        """
+        stopped_workers = []
+        with self._lock:
+            wanted = {c["id"]: c for c in cameras}
+
+            removed_rows = [i for i, cid in enumerate(self.camera_ids) if cid not in wanted]
+            removed_streams = [s for i in removed_rows for s in self._camera_streams[i]]
+            for i in reversed(removed_rows):
+                worker = self.camera_workers.pop(i)
+                removed_id = self.camera_ids.pop(i)
+                self.camera_policies.pop(i)
+                self.camera_rois.pop(i)
+                self.frame_capture_ts.pop(removed_id, None)
+                stopped_workers.append(self._release_worker(removed_id, worker))
+                if self.clip_recorder is not None:
+                    self.clip_recorder.remove_camera(removed_id)
+                self.scheduler.remove_camera(i)
+                self.motion_gate.remove_camera(i)
+            if removed_rows:
+                self._remove_streams(removed_streams)
+
+            for camera in cameras:
+                backend = camera.get("backend", "opencv")
+                priority = camera.get("priority", 1.0)
+                policy = camera.get("policy", ALWAYS_ON)
+                rois = normalize_rois(camera.get("rois"))
+                active = wants_active(policy, self._watchers.get(camera["id"], 0))
+                if camera["id"] in self.camera_ids:
+                    i = self.camera_ids.index(camera["id"])
+                    worker = self.camera_workers[i]
+                    self.scheduler.set_priority(i, priority)
+                    self.camera_policies[i] = policy
+                    # Adding the first ROI / removing the last one changes the decode size
+                    resized = bool(rois) != bool(self.camera_rois[i])
+                    if rois != self.camera_rois[i]:
+                        self.camera_rois[i] = rois
+                        self._remove_streams(self._camera_streams[i])
+                        self._add_streams(camera["id"], len(rois) or 1)
+                    if (worker.camera_url == camera["url"] and worker.backend == backend and not resized
+                            and active != isinstance(worker, SuspendedWorker)):
+                        continue
+                    stopped_workers.append(self._replace_worker(i, camera["url"], backend, active))
+                else:
+                    self.camera_ids.append(camera["id"])
+                    self.camera_workers.append(
+                        self._acquire_worker(camera["id"], camera["url"], backend, active, rois))
+                    self.camera_policies.append(policy)
+                    self.camera_rois.append(rois)
+                    self._add_streams(camera["id"], len(rois) or 1)
+                    self.scheduler.add_camera(priority)
+                    self.motion_gate.add_camera()
+            self.engine.reserve(len(self.stream_keys))
+
+        # Joining old capture threads may take a moment: never do it while holding the tick lock
+        for worker in stopped_workers:
+            if worker is not None:
+                worker.stop()
+
+    def set_demand(self, camera_id, watched):
+        """
+        Register a viewer joining (watched=True) or leaving a camera. An on_demand
+        camera is resumed by its first viewer and suspended again after its last one.
+        """
+        stopped = None
+        with self._lock:
+            watchers = max(self._watchers.get(camera_id, 0) + (1 if watched else -1), 0)
+            self._watchers[camera_id] = watchers
+            if camera_id not in self.camera_ids:
+                return
+            i = self.camera_ids.index(camera_id)
+            worker = self.camera_workers[i]
+            active = wants_active(self.camera_policies[i], watchers)
+            if active == isinstance(worker, SuspendedWorker):
+                stopped = self._replace_worker(i, worker.camera_url, worker.backend, active)
+        if stopped is not None:
+            stopped.stop()
+
+    def get_worker(self, camera_id):
+        """Capture worker of a camera id, or None if it is not running."""
+        with self._lock:
+            if camera_id not in self.camera_ids:
+                return None
+            return self.camera_workers[self.camera_ids.index(camera_id)]
+
+    def find_camera(self, camera_url):
+        """Id of the first running camera with this source URL, or None."""
+        with self._lock:
+            for camera_id, worker in zip(self.camera_ids, self.camera_workers):
+                if worker.camera_url == camera_url:
+                    return camera_id
+        return None
+
+    def assemble_batch(self):
+        """
+        Pick the cameras due for a backbone pass and collect a time-aligned frame for them.
+
+        Every live camera is read so its motion level stays current, but only due
+        cameras are waited for. Connecting, stalled, backing-off, dead and suspended
+        cameras are left out entirely.
+
+        Returns:
+            tuple: (lst_frames, rows, carried)
+                lst_frames, rows: fresh frames of the due cameras and their slot index
+                carried: due cameras that missed the deadline and have a previous feature to repeat
+        """
+        live = [i for i, worker in enumerate(self.camera_workers) if worker.is_live()]
+        due = self.scheduler.due(candidates=live)
+        frames, self._tick_capture_ts, stragglers = self.assembler.assemble(self.camera_workers, live, wait_for=due)
+
+        for i, frame in frames.items():
+            motion = self.motion_gate.observe(i, frame)
+            if motion != float("inf"):
+                self.scheduler.update(i, motion=motion)
+
+        rows = [i for i in due if i in frames]
+        filled = self.stream_state.filled.tolist()
+        carried = [i for i in stragglers if all(filled[s] > 0 for s in self._camera_streams[i])]
+        return [frames[i] for i in rows], rows, carried
+
+    def extract_features(self, lst_frames, rows):
+        """
+        Refresh self.last_features for the streams of rows: the ROI crops of every
+        moving frame go through one backbone forward, static frames keep the
+        camera's previous features. Older frames live in the TSM stream state.
+        """
+        filled = self.stream_state.filled.tolist()
+        compute = [k for k, i in enumerate(rows)
+                   if not self.motion_gate.is_static(i) or any(filled[s] == 0 for s in self._camera_streams[i])]
+        if compute:
+            # A frame is identified by its worker and capture time: streams reading the same frame
+            # and crop (shared source, same ROI) share one backbone pass, in this tick or a later one
+            holders = {tag: s for s, tag in enumerate(self._stream_frames) if tag is not None}
+            new_streams, unique, batch_frames, batch_index = [], {}, [], []
+            copy_to, copy_from = [], []
+            for k in compute:
+                i = rows[k]
+                worker_id, capture_ts = id(self.camera_workers[i]), self._tick_capture_ts.get(i)
+                for s, rect in zip(self._camera_streams[i], self._camera_rects(i)):
+                    tag = (worker_id, capture_ts, rect) if capture_ts is not None else None
+                    holder = holders.get(tag)
+                    if holder is not None:
+                        # A sibling (or this stream) already holds the feature of this frame
+                        self.shared_feature_reuses += 1
+                        if holder != s:
+                            copy_to.append(s)
+                            copy_from.append(holder)
+                    else:
+                        if tag is None or tag not in unique:
+                            unique[tag] = len(batch_frames)
+                            batch_frames.append(crop_roi(lst_frames[k], rect))
+                        else:
+                            self.shared_feature_reuses += 1
+                        new_streams.append(s)
+                        batch_index.append(unique[tag])
+                    self._stream_frames[s] = tag
+            with torch.inference_mode():
+                if copy_to:
+                    self.last_features.index_copy_(0, torch.tensor(copy_to, device=self.last_features.device),
+                                                   self.last_features[copy_from])
+            if batch_frames:
+                computed = self.engine.extract(batch_frames)
+                if len(batch_frames) < len(new_streams):
+                    computed = computed[batch_index]
+                with torch.inference_mode():
+                    self.last_features.index_copy_(0, self.engine.index(new_streams), computed)
+            for k in compute:
+                self.motion_gate.mark_computed(rows[k])
+
+    def run_once(self):
+        with self._lock:
+            lst_frames, scored_rows, carried = self.assemble_batch()
+            inference_start = time.time()
+            self.extract_features(lst_frames, scored_rows)
+            # Stragglers repeat their last feature so their window keeps pace with the batch
+            self.carried_features += len(carried)
+            rows = sorted(scored_rows + carried)
+            index = self.engine.index([s for i in rows for s in self._camera_streams[i]])
+            features = self.engine.gather(self.last_features, index)
+            backbone_end = time.time()
+
+            json_result, self.stream_state = predict_realtime_step(
+                self.tsm_model, features, self.stream_state, rows=index, device=self.device
+            )
+            json_result["cameras"] = self._camera_results(json_result["cameras"])
+            # Latency watermarks: each camera carries the capture time of the frame behind its probability
+            json_result["timing"] = {
+                "inferenceStartTs": round(inference_start, 4),
+                "backboneEndTs": round(backbone_end, 4),
+                "inferenceEndTs": round(time.time(), 4),
+            }
+            # Carried rows keep the capture time of the frame behind their repeated feature
+            for i in scored_rows:
+                self.frame_capture_ts[self.camera_ids[i]] = self._tick_capture_ts[i]
+            if self.feature_log is not None:
+                self._log_features(rows, features, inference_start)
+            # Cameras that were not sampled keep their cached window, so their probability is unchanged
+            for i in rows:
+                self.scheduler.update(i, probability=json_result["cameras"][i]["probability"])
+            for camera, worker in zip(json_result["cameras"], self.camera_workers):
+                camera["status"] = worker.state
+                capture_ts = self.frame_capture_ts.get(camera["cameraId"])
+                camera["captureTs"] = round(capture_ts, 4) if capture_ts is not None else None
+            self.last_result = json_result
+            return json_result
+
+    def _log_keys(self, i):
+        """Feature log keys (camera_id, roi name or None) of camera row i's streams."""
+        camera_id, rois = self.camera_ids[i], self.camera_rois[i]
+        return [(camera_id, roi["name"]) for roi in rois] or [(camera_id, None)]
+
+    def _mark_log_reset(self, i):
+        # The logged streams must restart their replay window where the live one was emptied
+        if self.feature_log is not None:
+            self.feature_log.mark_reset(self._log_keys(i))
+
+    def _log_features(self, rows, features, ts):
+        """Append the features just pushed for rows (their streams, in index order) to the feature log."""
+        keys, capture_ts = [], []
+        for i in rows:
+            keys.extend(self._log_keys(i))
+            capture_ts.extend([self.frame_capture_ts.get(self.camera_ids[i])] * len(self._camera_streams[i]))
+        self.feature_log.append(keys, features.cpu().numpy(), ts, capture_ts)
+
+    def _camera_results(self, stream_results):
+        """
+        Per-stream results -> one entry per camera, its probability being the highest
+        of its ROIs (listed under "rois" for cameras that have some).
+
+        A stream whose TSM window never received a feature (connecting, dead or
+        suspended camera, or just reset) has probability None: the model's output
+        on an empty window means nothing.
+        """
+        filled = self.stream_state.filled.tolist()
+        cameras = []
+        for camera_id, rois, streams in zip(self.camera_ids, self.camera_rois, self._camera_streams):
+            probabilities = [stream_results[s]["probability"] if filled[s] > 0 else None for s in streams]
+            scored = [p for p in probabilities if p is not None]
+            camera = {"cameraId": camera_id, "probability": max(scored) if scored else None}
+            if rois:
+                camera["rois"] = [{"name": roi["name"], "probability": p} for roi, p in zip(rois, probabilities)]
+            cameras.append(camera)
+        return cameras
+
+    def camera_stats(self):
+        """
+        Per-camera capture, scheduling and motion gate statistics.
+        """
+        with self._lock:
+            schedules = self.scheduler.stats(self.camera_ids)
+            gates = self.motion_gate.stats(self.camera_ids)
+            return [
+                {"cameraId": cid, "policy": policy, "rois": [roi["name"] for roi in rois],
+                 "capture": worker.stats(), "schedule": schedule, "motion_gate": gate,
+                 "sharedWith": [other for other in self.sources.shared_with(worker) if other != cid]}
+                for cid, policy, rois, worker, schedule, gate
+                in zip(self.camera_ids, self.camera_policies, self.camera_rois, self.camera_workers,
+                       schedules, gates)
+            ]
+
+
+_default_pipeline = None
+_default_pipeline_lock = threading.Lock()
+
+
+def get_default_pipeline():
+    """
+    The server's pipeline, built on first use: importing this module does not
+    load the checkpoints nor create the clip directory.
+    """
+    global _default_pipeline
+    with _default_pipeline_lock:
+        if _default_pipeline is None:
+            resnet50_model = load_resnet50_model(device=None)
+            tsm_model = load_tsm.load_TSM(pt_path=TSM_CHECKPOINT, feature_dim=2048, num_classes=2, n_segment=4)
+            _default_pipeline = RealtimePipeline(
+                resnet50_model, tsm_model,
+                clip_recorder=ClipRecorder(CLIP_DIR, pre_seconds=CLIP_PRE_SECONDS, post_seconds=CLIP_POST_SECONDS,
+                                           max_bytes_per_camera=CLIP_MAX_BYTES_PER_CAMERA, clip_fps=CLIP_FPS),
+                feature_log=FeatureLog(FEATURE_LOG_DIR, feature_dim=tsm_model.feature_dim, dtype=FEATURE_LOG_DTYPE,
+                                       segment_bytes=FEATURE_LOG_SEGMENT_BYTES,
+                                       max_bytes_per_stream=FEATURE_LOG_MAX_BYTES_PER_STREAM)
+                if FEATURE_LOG_DIR else None
+            )
+        return _default_pipeline
 
-resnet50_model = load_resnet50_model(device=None)
-tsm_model = load_tsm.load_TSM(pt_path="tsm/tsm_feature_epoch_12.pt", feature_dim=2048, num_classes=2, n_segment=4)
 
 def realtime_pipeline(lst_camera_urls):
-    lst_frames = [next(connect_and_stream(url))[1] for url in lst_camera_urls] # because the first yield is boolean, not frame
-    features_stack = frames_to_vectors(lst_frames, resnet50_model, device='cuda')
-    json_result = predict_realtime(tsm_model, features_stack, device='cuda')
+    default_pipeline = get_default_pipeline()
+    default_pipeline.set_cameras([{"id": i + 1, "url": url} for i, url in enumerate(lst_camera_urls)])
+    json_result = default_pipeline.run_once()
     print("Realtime prediction result:", json_result)
-    return json_result
\ No newline at end of file
+    return json_result
@@ -0,0 +1,71 @@
+import time
+
+from realtime_handling.batch_assembler import BatchAssembler
+
+TOLERANCE = 0.15
+DEADLINE = 0.05
+
+
+def start_tick(workers):
+    for worker in workers:
+        worker.tick_start = time.time()
+
+
+def test_batch_fires_at_deadline_without_stragglers(fake_worker):
+    on_time, late, stalled = fake_worker("a"), fake_worker("bb"), fake_worker("ccc")
+    late.delay, stalled.delay = DEADLINE / 3, None
+    workers = [on_time, late, stalled]
+    assembler = BatchAssembler(tolerance=TOLERANCE, deadline=DEADLINE)
+
+    start_tick(workers)
+    started = time.time()
+    frames, capture_ts, stragglers = assembler.assemble(workers, [0, 1, 2], wait_for=[0, 1, 2])
+    elapsed = time.time() - started
+
+    # The late camera is waited for, the stalled one is not waited for past the deadline
+    assert sorted(frames) == [0, 1] and stragglers == [2]
+    assert DEADLINE <= elapsed < DEADLINE + 0.04
+    assert assembler.stats()["deadline_hits"] == 1
+
+    # Rows that are read but not waited for keep whatever frame they have
+    frames, _, stragglers = assembler.assemble(workers, [0, 2], wait_for=[0])
+    assert sorted(frames) == [0, 2] and stragglers == []
+
+
+def test_stragglers_carry_their_last_feature(make_pipeline):
+    """
+    A due camera missing the deadline repeats its last feature (its window keeps
+    pace and it keeps a result) instead of being dropped from the tick.
+    """
+    pipeline = make_pipeline(budget_fps=1000, min_rate=1000, max_rate=1000,
+                             batch_tolerance=TOLERANCE, batch_deadline=DEADLINE)
+    pipeline.set_cameras([{"id": 1, "url": "http://one"}, {"id": 2, "url": "http://two"}])
+    workers = pipeline.camera_workers
+
+    start_tick(workers)
+    pipeline.run_once()  # both fresh: fills both windows
+    assert pipeline.stream_state.filled.tolist() == [1, 1]
+
+    workers[1].delay = None
+    for tick in range(3):
+        time.sleep(0.002)
+        start_tick(workers)
+        result = pipeline.run_once()
+        assert [c["cameraId"] for c in result["cameras"]] == [1, 2]
+    assert pipeline.carried_features == 3
+    assert pipeline.stream_state.filled.tolist() == [4, 4]
+
+
+def test_camera_without_a_frame_yet_has_no_probability(make_pipeline):
+    """A camera whose TSM window is still empty reports None, not the model's output on zeros."""
+    pipeline = make_pipeline(budget_fps=1000, min_rate=1000, max_rate=1000,
+                             batch_tolerance=TOLERANCE, batch_deadline=DEADLINE)
+    pipeline.set_cameras([{"id": 1, "url": "http://one"}, {"id": 2, "url": "http://two"}])
+    workers = pipeline.camera_workers
+    workers[1].delay = None
+
+    start_tick(workers)
+    result = pipeline.run_once()
+    assert pipeline.stream_state.filled.tolist() == [1, 0]
+    assert result["cameras"][0]["probability"] is not None
+    assert result["cameras"][1]["probability"] is None
@@ -1,8 +1,13 @@
-from pipeline.realtime_pipeline import realtime_pipeline
+import os
 
-CAMERA_URL = "http://192.168.1.14:8080/video"
+# Point at a phone, or at the local simulator: python -m simulator.stream_simulator
+CAMERA_URL = os.environ.get("CAMERA_URL", "http://192.168.1.14:8080/video")
 NUM_CAMERAS = 8
-lst_camera_urls = [CAMERA_URL for _ in range(NUM_CAMERAS)]
 
-while True:
-    realtime_pipeline(lst_camera_urls=lst_camera_urls)
\ No newline at end of file
+if __name__ == "__main__":
+    # Manual run: python -m pipeline.test_realtime (pytest only imports this file)
+    from pipeline.realtime_pipeline import realtime_pipeline
+
+    lst_camera_urls = [CAMERA_URL for _ in range(NUM_CAMERAS)]
+    while True:
+        realtime_pipeline(lst_camera_urls=lst_camera_urls)
@@ -0,0 +1,32 @@
+import time
+
+import torch
+
+
+def test_duplicate_camera_reuses_sibling_feature_from_earlier_tick(make_pipeline, monkeypatch):
+    """
+    Two cameras on one source due in different ticks: the second one reuses the
+    feature the first computed from the same frame instead of running the backbone.
+    """
+    pipeline = make_pipeline()
+    pipeline.set_cameras([{"id": 1, "url": "http://same"}, {"id": 2, "url": "http://same"}])
+    worker = pipeline.camera_workers[0]
+    assert pipeline.camera_workers[1] is worker
+    worker.capture_ts = time.time()  # a still source
+
+    extracted = []
+    extract = pipeline.engine.extract
+    monkeypatch.setattr(pipeline.engine, "extract", lambda frames: extracted.append(len(frames)) or extract(frames))
+    pipeline._tick_capture_ts = {0: worker.capture_ts, 1: worker.capture_ts}
+
+    pipeline.extract_features([worker.frame], [0])
+    pipeline.extract_features([worker.frame], [1])
+    assert extracted == [1]
+    assert pipeline.shared_feature_reuses == 1
+    assert torch.equal(pipeline.last_features[1], pipeline.last_features[0])
+
+    # A new frame is computed again
+    worker.capture_ts += 0.2
+    pipeline._tick_capture_ts = {1: worker.capture_ts}
+    pipeline.extract_features([worker.frame], [1])
+    assert extracted == [1, 1]
@@ -0,0 +1,23 @@
+import pytest
+
+from realtime_handling.roi import ROI_FRAME_SIZE
+
+ROI = {"name": "door", "x": 0.1, "y": 0.1, "w": 0.5, "h": 0.5}
+
+
+@pytest.mark.parametrize("ingest_mode", ["thread", "process"])
+def test_roi_camera_decodes_at_roi_frame_size(make_pipeline, ingest_mode):
+    """
+    A ROI camera's worker must decode at ROI_FRAME_SIZE (not upscale a 224x224 frame) in both ingest modes.
+    """
+    pipeline = make_pipeline(ingest_mode=ingest_mode)
+
+    for backend in ("mjpeg", "ffmpeg"):
+        worker = pipeline._acquire_worker(1, f"http://cam/{backend}", backend, True, [ROI])
+        assert (worker.options["width"], worker.options["height"]) == ROI_FRAME_SIZE
+        if ingest_mode == "process":
+            assert worker.options["frame_shape"] == (ROI_FRAME_SIZE[1], ROI_FRAME_SIZE[0])
+
+    # Without ROIs the backend keeps its default (backbone-sized) output
+    worker = pipeline._acquire_worker(2, "http://cam/plain", "mjpeg", True, [])
+    assert "width" not in worker.options
@@ -0,0 +1,50 @@
+# Camera activation policies
+ALWAYS_ON = "always_on"    # decoded and scored all the time (alerting)
+ON_DEMAND = "on_demand"    # decoded and scored only while somebody watches its preview
+SUSPENDED = "suspended"    # registered but not running at all
+
+ACTIVATION_POLICIES = [ALWAYS_ON, ON_DEMAND, SUSPENDED]
+
+
+class SuspendedWorker:
+    """
+    Stand-in for the capture worker of a camera that is not running: no thread,
+    no connection, no frames. Keeps the camera's batch row and registry entry
+    alive so resuming only has to open the stream again.
+    """
+    def __init__(self, camera_url, backend="opencv"):
+        self.camera_url = camera_url
+        self.backend = backend
+
+    def start(self):
+        return self
+
+    def stop(self, timeout=2.0):
+        pass
+
+    @property
+    def state(self):
+        return SUSPENDED
+
+    def is_live(self):
+        return False
+
+    def read_latest(self):
+        return None, None
+
+    def peek_latest(self):
+        return None, None
+
+    def stats(self):
+        return {"url": self.camera_url, "backend": self.backend, "state": SUSPENDED}
+
+
+def wants_active(policy, watchers=0):
+    """
+    Whether a camera with this policy should be decoding right now.
+    """
+    if policy == ALWAYS_ON:
+        return True
+    if policy == ON_DEMAND:
+        return watchers > 0
+    return False
@@ -0,0 +1,95 @@
+import time
+
+
+class BatchAssembler:
+    """
+    Collects one time-aligned frame per camera for a backbone batch.
+
+    A frame belongs to the batch when it was captured at most `tolerance`
+    seconds before the tick started. The assembler waits for the cameras it is
+    asked to wait for (the ones due for a backbone pass) until each has such a
+    frame, but never longer than `deadline`: cameras still without one are
+    returned as stragglers and the batch fires without them. A tick therefore
+    costs at most `deadline` of waiting, whatever the slowest camera does.
+
+    Cameras sharing a capture worker are read once and get the same frame.
+
+    Args:
+        tolerance (float): maximum age (s) of a frame at tick start
+        deadline (float): maximum time (s) spent waiting for fresh frames
+        poll_interval (float): sleep between two checks of the pending cameras
+    """
+    def __init__(self, tolerance=0.15, deadline=0.05, poll_interval=0.003):
+        self.tolerance = tolerance
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self.ticks = 0
+        self.waits = 0          # ticks that had to wait for at least one camera
+        self.deadline_hits = 0  # ticks fired at the deadline with stragglers
+        self.stragglers = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def assemble(self, workers, rows, wait_for=()):
+        """
+        Read the newest frame of each camera in rows.
+
+        Args:
+            workers (list): capture workers indexed by row
+            rows (list[int]): live rows to read
+            wait_for (iterable[int]): rows whose frame must be fresh (subset of rows)
+
+        Returns:
+            tuple: (frames, capture_ts, stragglers)
+                frames: {row: frame} for every row with a usable frame (rows of wait_for only if fresh)
+                capture_ts: {row: capture time} for the rows in frames
+                stragglers: rows of wait_for without a fresh frame at the deadline
+        """
+        start = time.time()
+        oldest = start - self.tolerance
+        wait_for = set(wait_for)
+
+        def fresh(capture_ts):
+            return capture_ts is not None and capture_ts >= oldest
+
+        pending = set(wait_for)
+        waited = False
+        while pending:
+            pending = {i for i in pending if not fresh(workers[i].peek_latest()[1])}
+            if not pending or time.time() - start >= self.deadline:
+                break
+            waited = True
+            time.sleep(self.poll_interval)
+        wait = time.time() - start
+
+        frames, capture_ts, shared_reads = {}, {}, {}
+        for i in rows:
+            worker = workers[i]
+            if id(worker) not in shared_reads:
+                shared_reads[id(worker)] = worker.read_latest()
+            frame, ts = shared_reads[id(worker)]
+            if frame is None or (i in wait_for and not fresh(ts)):
+                continue
+            frames[i] = frame
+            capture_ts[i] = ts
+        stragglers = sorted(i for i in wait_for if i not in frames)
+
+        self.ticks += 1
+        self.waits += waited
+        self.deadline_hits += bool(stragglers)
+        self.stragglers += len(stragglers)
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return frames, capture_ts, stragglers
+
+    def stats(self):
+        return {
+            "tolerance": self.tolerance,
+            "deadline": self.deadline,
+            "ticks": self.ticks,
+            "waits": self.waits,
+            "deadline_hits": self.deadline_hits,
+            "stragglers": self.stragglers,
+            "mean_wait_ms": round(1000 * self.total_wait / self.ticks, 2) if self.ticks else None,
+            "max_wait_ms": round(1000 * self.max_wait, 2),
+        }
@@ -0,0 +1,95 @@
+import struct
+from datetime import datetime
+
+# Binary realtime frame (little-endian):
+#   header:  version u8 | flags u8 | result id u32 | timestamp f64 (unix seconds) | count u16
+#   body:    count x camera id u16, then count x probability u8 (0 - 100, 255 = not scored yet)
+# A keyframe (flags & FLAG_KEYFRAME) carries every camera; a delta frame only
+# the cameras whose probability moved by more than epsilon since it was last sent.
+PROTOCOL_VERSION = 1
+FLAG_KEYFRAME = 0x01
+HEADER = struct.Struct("<BBIdH")
+NO_PROBABILITY = 255
+
+
+def encode_frame(result_id, timestamp, cameras, keyframe):
+    """
+    Pack (camera_id, probability) pairs into one binary frame.
+    """
+    count = len(cameras)
+    flags = FLAG_KEYFRAME if keyframe else 0
+    header = HEADER.pack(PROTOCOL_VERSION, flags, result_id & 0xFFFFFFFF, timestamp, count)
+    ids = struct.pack(f"<{count}H", *(cid for cid, _ in cameras))
+    probs = bytes(NO_PROBABILITY if p is None else min(max(int(p), 0), 100) for _, p in cameras)
+    return header + ids + probs
+
+
+def decode_frame(data):
+    """
+    Inverse of encode_frame, for clients and tests.
+
+    Returns:
+        dict: {"id", "timestamp", "keyframe", "cameras": [{"cameraId", "probability"}]}
+    """
+    version, flags, result_id, timestamp, count = HEADER.unpack_from(data, 0)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported realtime frame version {version}")
+    offset = HEADER.size
+    ids = struct.unpack_from(f"<{count}H", data, offset)
+    probs = data[offset + 2 * count: offset + 3 * count]
+    return {
+        "id": result_id,
+        "timestamp": timestamp,
+        "keyframe": bool(flags & FLAG_KEYFRAME),
+        "cameras": [{"cameraId": cid, "probability": None if p == NO_PROBABILITY else p}
+                    for cid, p in zip(ids, probs)],
+    }
+
+
+class DeltaEncoder:
+    """
+    Per-connection encoder turning realtime results into binary delta frames.
+
+    Args:
+        epsilon (int): minimum probability change (percentage points) worth sending
+        keyframe_interval (int): send a full keyframe every N results so clients can resync
+    """
+    def __init__(self, epsilon=2, keyframe_interval=10):
+        self.epsilon = epsilon
+        self.keyframe_interval = keyframe_interval
+        self._sent = {}           # camera id -> last probability sent
+        self._since_keyframe = None
+
+    def _moved(self, probability, sent):
+        if probability is None or sent is None:
+            return probability != sent
+        return abs(probability - sent) > self.epsilon
+
+    def encode(self, result):
+        """
+        Returns:
+            bytes or None: the frame to send, or None when nothing changed enough
+        """
+        current = {c["cameraId"]: c["probability"] for c in result["cameras"]}
+        keyframe = (
+            self._since_keyframe is None
+            or self._since_keyframe + 1 >= self.keyframe_interval
+            or current.keys() != self._sent.keys()  # camera added or removed
+        )
+
+        if keyframe:
+            changed = list(current.items())
+            self._since_keyframe = 0
+        else:
+            changed = [(cid, p) for cid, p in current.items() if self._moved(p, self._sent[cid])]
+            self._since_keyframe += 1
+            if not changed:
+                return None
+
+        if keyframe:
+            self._sent = dict(current)
+        else:
+            self._sent.update(changed)
+
+        timestamp = datetime.fromisoformat(result["timestamp"]).timestamp()
+        return encode_frame(result["id"], timestamp, changed, keyframe)
@@ -0,0 +1,92 @@
+import asyncio
+
+
+class _Subscription:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.seen_version = 0
+
+
+class BroadcastHub:
+    """
+    Fan-out of one producer to many async consumers with latest-value semantics.
+
+    The producer calls publish() once per result. Every subscriber is woken up
+    and reads the newest value; a slow subscriber that misses several publishes
+    only gets the latest one instead of a growing queue, so the producer never
+    waits for (or buffers on behalf of) its viewers.
+
+    Must be used from the event loop thread (use loop.call_soon_threadsafe
+    to publish from another thread).
+    """
+    def __init__(self):
+        self._subscribers = set()
+        self.latest = None
+        self.version = 0
+        self.skipped_updates = 0
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, value):
+        self.latest = value
+        self.version += 1
+        for sub in self._subscribers:
+            sub.event.set()
+
+    async def subscribe(self, send_latest=True):
+        """
+        Async generator yielding published values until the consumer stops iterating.
+
+        Args:
+            send_latest (bool): start with the current value instead of waiting for the next publish
+        """
+        sub = _Subscription()
+        self._subscribers.add(sub)
+        try:
+            if send_latest and self.latest is not None:
+                sub.event.set()
+            while True:
+                await sub.event.wait()
+                sub.event.clear()
+                if sub.seen_version and self.version - sub.seen_version > 1:
+                    self.skipped_updates += self.version - sub.seen_version - 1
+                sub.seen_version = self.version
+                yield self.latest
+        finally:
+            self._subscribers.discard(sub)
+
+
+class EventHub:
+    """
+    Fan-out for rare, must-not-skip messages (e.g. incident events).
+
+    Unlike BroadcastHub every subscriber gets every event, through its own
+    bounded queue. If a subscriber falls max_queue events behind, its oldest
+    pending events are dropped and counted in dropped_events.
+    """
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._queues = set()
+        self.dropped_events = 0
+
+    @property
+    def subscriber_count(self):
+        return len(self._queues)
+
+    def publish(self, event):
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped_events += 1
+            queue.put_nowait(event)
+
+    async def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._queues.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.discard(queue)
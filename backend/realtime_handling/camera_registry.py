@@ -0,0 +1,88 @@
+import os
+import json
+import threading
+
+DEFAULT_BACKEND = "opencv"
+DEFAULT_PRIORITY = 1.0
+DEFAULT_POLICY = "always_on"
+
+
+class CameraRegistry:
+    """
+    Runtime list of cameras, persisted to a JSON file so it survives restarts.
+
+    Each camera is a dict:
+        {"id": 1, "url": "http://192.168.1.14:8080/video", "backend": "opencv", "priority": 1.0,
+         "policy": "always_on"}
+    Ids are never reused, so a removed camera can not be confused with a new one.
+    """
+    def __init__(self, registry_path="cameras.json"):
+        self.registry_path = registry_path
+        self._lock = threading.Lock()
+        self._cameras = []
+        self._next_id = 1
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.registry_path):
+            return
+        with open(self.registry_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            self._cameras = data.get("cameras", [])
+            self._next_id = data.get("next_id", max([c["id"] for c in self._cameras], default=0) + 1)
+        print(f"[INFO] Loaded {len(self._cameras)} cameras from '{self.registry_path}'")
+
+    def _save(self):
+        # Write to a temp file first so a crash never leaves a half-written registry
+        tmp_path = f"{self.registry_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"next_id": self._next_id, "cameras": self._cameras}, f, indent=4)
+        os.replace(tmp_path, self.registry_path)
+
+    def list_cameras(self):
+        with self._lock:
+            return [dict(c) for c in self._cameras]
+
+    def get(self, camera_id):
+        with self._lock:
+            for c in self._cameras:
+                if c["id"] == camera_id:
+                    return dict(c)
+        return None
+
+    def add(self, url, backend=DEFAULT_BACKEND, priority=DEFAULT_PRIORITY, policy=DEFAULT_POLICY, **options):
+        """
+        Register a new camera and return it (with its assigned id).
+        """
+        with self._lock:
+            camera = {"id": self._next_id, "url": url, "backend": backend, "priority": priority,
+                      "policy": policy, **options}
+            self._next_id += 1
+            self._cameras.append(camera)
+            self._save()
+        return dict(camera)
+
+    def update(self, camera_id, **changes):
+        """
+        Change fields of a camera. Returns the updated camera, or None if the id is unknown.
+        """
+        with self._lock:
+            for c in self._cameras:
+                if c["id"] == camera_id:
+                    c.update({k: v for k, v in changes.items() if k != "id"})
+                    self._save()
+                    return dict(c)
+        return None
+
+    def remove(self, camera_id):
+        """
+        Unregister a camera. Returns True if it existed.
+        """
+        with self._lock:
+            remaining = [c for c in self._cameras if c["id"] != camera_id]
+            if len(remaining) == len(self._cameras):
+                return False
+            self._cameras = remaining
+            self._save()
+        return True
@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import queue
+import shutil
+import threading
+import subprocess
+from collections import deque
+
+import cv2
+
+from realtime_handling.connect_phone_cam import ffmpeg_path
+
+
+class JpegRingBuffer:
+    """
+    The last few seconds of one camera as compressed JPEG bytes.
+
+    Bounded twice: frames older than max_seconds and, whatever the frame size,
+    anything beyond max_bytes are evicted oldest first.
+    """
+    def __init__(self, max_seconds=10.0, max_bytes=8 * 1024 * 1024):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.frames = deque()  # (capture_ts, jpeg bytes)
+        self.total_bytes = 0
+
+    def append(self, capture_ts, jpeg):
+        self.frames.append((capture_ts, jpeg))
+        self.total_bytes += len(jpeg)
+        while self.frames and (self.total_bytes > self.max_bytes
+                               or capture_ts - self.frames[0][0] > self.max_seconds):
+            _, old = self.frames.popleft()
+            self.total_bytes -= len(old)
+
+    def snapshot(self):
+        return list(self.frames)
+
+
+class _ClipWriter:
+    """
+    Streams one incident clip to disk as concatenated JPEGs (.mjpeg), plus a
+    .json sidecar with the clip metadata and per-frame timestamps.
+
+    write() only queues the bytes: the file is opened and written by the
+    writer's own thread, so callers (the event loop, capture threads holding
+    the recorder lock) never wait on the disk.
+    """
+    def __init__(self, clip_dir, clip_id, camera_id, incident_id, started_at):
+        self.clip_id = clip_id
+        self.mjpeg_path = os.path.join(clip_dir, f"{clip_id}.mjpeg")
+        self.meta_path = os.path.join(clip_dir, f"{clip_id}.json")
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, name=f"clip-{clip_id}", daemon=True)
+        self._thread.start()
+        self.meta = {
+            "clipId": clip_id,
+            "cameraId": camera_id,
+            "incidentId": incident_id,
+            "startedAt": started_at,
+            "endedAt": None,
+            "frames": 0,
+            "bytes": 0,
+            "format": "mjpeg",
+        }
+        self.timestamps = []
+        self.stop_at = None  # set once the incident ended: now + post_seconds
+
+    def _drain(self):
+        with open(self.mjpeg_path, "wb") as f:
+            while True:
+                jpeg = self._queue.get()
+                if jpeg is None:
+                    return
+                f.write(jpeg)
+
+    def write(self, capture_ts, jpeg):
+        self._queue.put(jpeg)
+        self.timestamps.append(round(capture_ts, 3))
+        self.meta["frames"] += 1
+        self.meta["bytes"] += len(jpeg)
+
+    def close(self):
+        # Blocks until the queued frames are on disk: call from a finalize thread
+        self._queue.put(None)
+        self._thread.join()
+        self.meta["endedAt"] = self.timestamps[-1] if self.timestamps else self.meta["startedAt"]
+        self._save_meta()
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.meta, timestamps=self.timestamps), f)
+        os.replace(tmp_path, self.meta_path)
+
+
+class ClipRecorder:
+    """
+    Incident clips without continuous recording.
+
+    Every camera keeps a JpegRingBuffer of its last pre_seconds of JPEG bytes
+    (bounded by max_bytes_per_camera). When an incident starts, the ring is
+    flushed into a new clip file and the camera's next frames are appended to
+    it until post_seconds after the incident ended (or max_clip_seconds).
+    Finished clips are converted to MP4 by ffmpeg when it is available.
+
+    Frames come from the capture workers:
+        add_jpeg(): raw JPEG bytes (MJPEG backend, nothing to encode)
+        add_frame(): decoded frames, JPEG-encoded here at most clip_fps times per second
+    """
+    def __init__(self, clip_dir="clips", pre_seconds=10.0, post_seconds=5.0,
+                 max_bytes_per_camera=8 * 1024 * 1024, clip_fps=10.0, max_clip_seconds=120.0,
+                 jpeg_quality=70):
+        self.clip_dir = clip_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_bytes_per_camera = max_bytes_per_camera
+        self.clip_fps = clip_fps
+        self.max_clip_seconds = max_clip_seconds
+        self.jpeg_quality = jpeg_quality
+        os.makedirs(clip_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._rings = {}
+        self._last_ts = {}
+        self._writers = {}
+
+    def _ring(self, camera_id):
+        ring = self._rings.get(camera_id)
+        if ring is None:
+            ring = self._rings[camera_id] = JpegRingBuffer(self.pre_seconds, self.max_bytes_per_camera)
+        return ring
+
+    def _due(self, camera_id, capture_ts):
+        """Rate limit to clip_fps, so clips and rings do not depend on the camera's frame rate."""
+        last = self._last_ts.get(camera_id)
+        if last is not None and self.clip_fps and capture_ts - last < 1.0 / self.clip_fps:
+            return False
+        self._last_ts[camera_id] = capture_ts
+        return True
+
+    def _store(self, camera_ids, jpeg, capture_ts):
+        # Called with the lock held
+        for camera_id in camera_ids:
+            self._ring(camera_id).append(capture_ts, jpeg)
+            writer = self._writers.get(camera_id)
+            if writer is not None:
+                writer.write(capture_ts, jpeg)
+                self._check_finished(camera_id, writer, capture_ts)
+
+    def add_jpeg(self, camera_ids, jpeg, capture_ts):
+        """
+        Args:
+            camera_ids (list): logical cameras fed by the source this frame comes from
+        """
+        with self._lock:
+            if not self._due(camera_ids[0], capture_ts):
+                return
+            self._store(camera_ids, jpeg, capture_ts)
+
+    def add_frame(self, camera_ids, frame, capture_ts):
+        with self._lock:
+            if not self._due(camera_ids[0], capture_ts):
+                return
+        # Encoded once, whatever the number of cameras sharing the source
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return
+        with self._lock:
+            self._store(camera_ids, encoded.tobytes(), capture_ts)
+
+    def remove_camera(self, camera_id):
+        with self._lock:
+            self._rings.pop(camera_id, None)
+            self._last_ts.pop(camera_id, None)
+            writer = self._writers.pop(camera_id, None)
+        if writer is not None:
+            self._finalize_async(writer)
+
+    def process_events(self, events, now=None):
+        """
+        Start / schedule the end of clips from incident events (see ViolenceEventEngine),
+        and close clips whose camera stopped sending frames. Call once per realtime tick.
+        """
+        now = time.time() if now is None else now
+        finished = []
+        with self._lock:
+            for event in events:
+                camera_id = event["cameraId"]
+                if event["type"] == "incident_start" and camera_id not in self._writers:
+                    clip_id = f"{int(now)}_cam{camera_id}_incident{event['incidentId']}"
+                    writer = _ClipWriter(self.clip_dir, clip_id, camera_id, event["incidentId"], now)
+                    for capture_ts, jpeg in self._ring(camera_id).snapshot():
+                        writer.write(capture_ts, jpeg)
+                    self._writers[camera_id] = writer
+                    print(f"[INFO] Recording clip {clip_id}")
+                elif event["type"] == "incident_end" and camera_id in self._writers:
+                    self._writers[camera_id].stop_at = now + self.post_seconds
+
+            for camera_id, writer in list(self._writers.items()):
+                if self._is_finished(writer, now):
+                    finished.append(self._writers.pop(camera_id))
+        for writer in finished:
+            self._finalize_async(writer)
+
+    def _is_finished(self, writer, now):
+        return ((writer.stop_at is not None and now >= writer.stop_at)
+                or now - writer.meta["startedAt"] >= self.max_clip_seconds)
+
+    def _check_finished(self, camera_id, writer, capture_ts):
+        # Called with the lock held from the capture threads
+        if self._is_finished(writer, capture_ts):
+            del self._writers[camera_id]
+            self._finalize_async(writer)
+
+    def _finalize_async(self, writer):
+        # The mp4 conversion takes a while: never run it on the event loop or a capture thread
+        threading.Thread(target=self._finalize, args=(writer,), daemon=True).start()
+
+    def _finalize(self, writer):
+        writer.close()
+        print(f"[INFO] Saved clip {writer.clip_id} ({writer.meta['frames']} frames)")
+        if shutil.which(ffmpeg_path) and writer.meta["frames"] > 1:
+            self._convert_to_mp4(writer)
+
+    def _convert_to_mp4(self, writer):
+        duration = writer.timestamps[-1] - writer.timestamps[0]
+        fps = (len(writer.timestamps) - 1) / duration if duration > 0 else self.clip_fps
+        mp4_path = os.path.join(self.clip_dir, f"{writer.clip_id}.mp4")
+        command = [
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "mjpeg", "-framerate", f"{fps:.3f}", "-i", writer.mjpeg_path,
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+            mp4_path,
+        ]
+        if subprocess.run(command).returncode != 0:
+            print(f"[WARN] Could not convert clip {writer.clip_id} to mp4, keeping mjpeg")
+            return
+        os.remove(writer.mjpeg_path)
+        writer.meta["format"] = "mp4"
+        writer._save_meta()
+
+    def list_clips(self):
+        """
+        Metadata of the saved clips, newest first (recording clips are not listed yet).
+        """
+        clips = []
+        for name in os.listdir(self.clip_dir):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.clip_dir, name), encoding="utf-8") as f:
+                meta = json.load(f)
+            meta.pop("timestamps", None)
+            clips.append(meta)
+        return sorted(clips, key=lambda c: c["startedAt"], reverse=True)
+
+    def clip_file(self, clip_id):
+        """
+        Returns:
+            tuple: (path, media_type) of a saved clip, or (None, None) if unknown
+        """
+        for clip in self.list_clips():
+            if clip["clipId"] == clip_id:
+                if clip["format"] == "mp4":
+                    return os.path.join(self.clip_dir, f"{clip_id}.mp4"), "video/mp4"
+                return os.path.join(self.clip_dir, f"{clip_id}.mjpeg"), "video/x-motion-jpeg"
+        return None, None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "buffered_bytes": {cid: ring.total_bytes for cid, ring in self._rings.items()},
+                "recording": [w.clip_id for w in self._writers.values()],
+            }
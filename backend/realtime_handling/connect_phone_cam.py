@@ -1,7 +1,21 @@
+import os
 import cv2
 import time
+import select
+import threading
+import subprocess
+import urllib.request
 import numpy as np
 
+ffmpeg_path = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+
+# Camera health states
+CONNECTING = "connecting"  # opening the stream
+LIVE = "live"              # frames are flowing
+STALLED = "stalled"        # stream open but no frame for stall_timeout seconds
+BACKOFF = "backoff"        # waiting before the next reconnect attempt
+DEAD = "dead"              # too many failed attempts in a row, still retried at max backoff
+
 
 def connect_and_stream(camera_url):
     cap = cv2.VideoCapture(camera_url, cv2.CAP_FFMPEG)
@@ -13,4 +27,672 @@ def connect_and_stream(camera_url):
         ret, frame = cap.read()
         yield (ret, frame)
         if not ret:
-            time.sleep(0.1)
\ No newline at end of file
+            time.sleep(0.1)
+
+
+class CameraCaptureWorker:
+    """
+    Long-lived capture worker for one camera.
+
+    A background thread keeps a single cv2.VideoCapture open and decodes
+    continuously into a "latest frame" slot. Consumers only ever read the
+    newest frame, so the realtime pipeline never waits on the network and
+    never opens a new decoder per tick.
+
+    Counters:
+        decoded_frames: frames successfully decoded from the stream
+        dropped_frames: frames overwritten before any consumer read them
+        stale_reads: reads refused because the newest frame was too old
+        reconnects: streams reopened after a drop
+
+    Health is tracked as a state machine:
+        connecting -> live <-> stalled -> backoff -> connecting ...
+    Each failed attempt doubles the backoff delay (up to backoff_max). After
+    dead_after_failures failures in a row the camera is reported dead, but is
+    still retried in the background so it comes back on its own.
+
+    Subclasses only change how a stream is opened, read and closed
+    (_open / _read / _close).
+    """
+    backend = "opencv"
+
+    def __init__(self, camera_url, max_frame_age=2.0, max_read_failures=50, stall_timeout=3.0,
+                 backoff_initial=0.5, backoff_max=30.0, dead_after_failures=6, open_timeout=5.0,
+                 on_frame=None, on_jpeg=None):
+        self.camera_url = camera_url
+        self.on_frame = on_frame  # optional callback(frame, capture_ts), called from the capture thread
+        self.on_jpeg = on_jpeg    # optional callback(jpeg_bytes, capture_ts), only backends that receive JPEGs call it
+        self.max_frame_age = max_frame_age
+        self.max_read_failures = max_read_failures
+        self.stall_timeout = stall_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.dead_after_failures = dead_after_failures
+        self.open_timeout = open_timeout
+
+        self._state = CONNECTING
+        self._connect_failures = 0
+        self._next_retry_ts = None
+        self._ever_live = False
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._frame = None
+        self._frame_ts = None
+        self._frame_id = 0
+        self._consumed_id = 0
+
+        self.decoded_frames = 0
+        self.dropped_frames = 0
+        self.stale_reads = 0
+        self.reconnects = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"capture-{self.camera_url}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _open(self):
+        """Open the stream. Returns a handle, or None if the camera is unreachable."""
+        timeout_ms = int(self.open_timeout * 1000)
+        cap = cv2.VideoCapture(self.camera_url, cv2.CAP_FFMPEG, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms,
+        ])
+        if not cap.isOpened():
+            cap.release()
+            return None
+        # Keep the decoder queue as short as possible, we only want the newest frame
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def _read(self, handle):
+        """Decode the next frame. Returns a BGR np.ndarray, or None on failure."""
+        ret, frame = handle.read()
+        return frame if ret else None
+
+    def _close(self, handle):
+        handle.release()
+
+    def _is_open(self, handle):
+        """False once the stream is known to be gone, so it is reopened without waiting for more read failures."""
+        return True
+
+    def _set_state(self, state):
+        with self._lock:
+            self._state = state
+
+    def _backoff(self):
+        """
+        Wait before the next connection attempt, doubling the delay after every failure.
+        """
+        with self._lock:
+            self._connect_failures += 1
+            delay = min(self.backoff_initial * 2 ** (self._connect_failures - 1), self.backoff_max)
+            self._state = DEAD if self._connect_failures >= self.dead_after_failures else BACKOFF
+            self._next_retry_ts = time.time() + delay
+        self._stop_event.wait(delay)
+
+    def _run(self):
+        handle = None
+        failures = 0
+        try:
+            while not self._stop_event.is_set():
+                if handle is None:
+                    self._set_state(CONNECTING)
+                    handle = self._open()
+                    if handle is None:
+                        self._backoff()
+                        continue
+                    failures = 0
+                    if self._ever_live:
+                        self.reconnects += 1
+
+                frame = self._read(handle)
+                if frame is None:
+                    failures += 1
+                    self._set_state(STALLED)
+                    if failures >= self.max_read_failures or not self._is_open(handle):
+                        # The stream is gone (EOF, dead decoder): reopen it after a backoff
+                        self._close(handle)
+                        handle = None
+                        self._backoff()
+                    else:
+                        self._stop_event.wait(0.1)
+                    continue
+
+                failures = 0
+                self._publish(frame, time.time())
+        finally:
+            if handle is not None:
+                self._close(handle)
+
+    def _publish(self, frame, capture_ts):
+        with self._lock:
+            self._state = LIVE
+            self._ever_live = True
+            self._connect_failures = 0
+            self._next_retry_ts = None
+            if self._frame_id > self._consumed_id:
+                self.dropped_frames += 1
+            self._frame = frame
+            self._frame_ts = capture_ts
+            self._frame_id += 1
+            self.decoded_frames += 1
+        if self.on_frame is not None:
+            self.on_frame(frame, capture_ts)
+
+    @property
+    def state(self):
+        """
+        Current health state. A live stream that has not delivered a frame for
+        stall_timeout seconds (e.g. blocked inside a network read) is reported as stalled.
+        """
+        with self._lock:
+            if self._state == LIVE and time.time() - self._frame_ts > self.stall_timeout:
+                return STALLED
+            return self._state
+
+    def is_live(self):
+        return self.state == LIVE
+
+    def read_latest(self):
+        """
+        Return the newest decoded frame without blocking.
+
+        Returns:
+            tuple: (frame, capture_ts). (None, None) if nothing was decoded yet
+                   or the newest frame is older than max_frame_age seconds.
+        """
+        with self._lock:
+            if self._frame is None:
+                return None, None
+            if time.time() - self._frame_ts > self.max_frame_age:
+                self.stale_reads += 1
+                return None, None
+            self._consumed_id = self._frame_id
+            return self._frame, self._frame_ts
+
+    def peek_latest(self):
+        """
+        Newest frame for side consumers (previews, recorders): same as read_latest()
+        but does not mark the frame as consumed or count stale reads.
+        """
+        with self._lock:
+            return self._frame, self._frame_ts
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            return {
+                "url": self.camera_url,
+                "backend": self.backend,
+                "state": state,
+                "decoded_frames": self.decoded_frames,
+                "dropped_frames": self.dropped_frames,
+                "stale_reads": self.stale_reads,
+                "reconnects": self.reconnects,
+                "connect_failures": self._connect_failures,
+                "next_retry_ts": self._next_retry_ts,
+                "last_capture_ts": self._frame_ts,
+            }
+
+
+class FFmpegPipeCaptureWorker(CameraCaptureWorker):
+    """
+    Capture worker that lets ffmpeg do the downscaling.
+
+    ffmpeg decodes the stream with a fps + scale filter graph and writes fixed-size
+    rawvideo frames to stdout, which are read straight into a numpy array
+    (no intermediate bytes copy, no PIL resize of 1080p frames in Python).
+    Every frame gets its own array: consumers (motion gate, clip recorder,
+    previews) may keep a published frame as long as they like.
+
+    A silent source cannot block the worker: ffmpeg gives up on network I/O after
+    open_timeout (-rw_timeout) and a frame that is not complete within
+    stall_timeout kills ffmpeg, so the stream goes through backoff and is reopened.
+
+    The rawvideo frames are squashed to width x height, too small and distorted
+    to look at. With display_width set, the same ffmpeg also encodes the stream
+    as JPEGs of that width (aspect ratio kept, never upscaled) on a second pipe:
+    they go to on_jpeg (clip recorder) and peek_latest_jpeg() (previews), like
+    the JPEGs of the MJPEG backend.
+
+    Args:
+        width, height (int): output frame size (224x224 = ResNet50 input, resize becomes a no-op)
+        fps (float, optional): output frame rate. None = keep the source rate.
+        pix_fmt (str): 'bgr24' (what frames_to_vectors expects) or 'rgb24'
+        display_width (int, optional): width of the display JPEGs. None = no display output.
+        display_quality (int): ffmpeg -q:v of the display JPEGs (2 = best, 31 = worst)
+    """
+    backend = "ffmpeg"
+
+    def __init__(self, camera_url, width=224, height=224, fps=None, pix_fmt="bgr24", display_width=None,
+                 display_quality=5, **kwargs):
+        super().__init__(camera_url, **kwargs)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.display_width = display_width
+        self.display_quality = display_quality
+        self._proc = None
+        self._display_thread = None
+        self._jpeg_lock = threading.Lock()
+        self._latest_jpeg = None
+        self._latest_jpeg_ts = None
+
+    def _command(self, display_fd=None):
+        filters = [f"scale={self.width}:{self.height}"]
+        if self.fps:
+            filters.insert(0, f"fps={self.fps}")
+        command = [
+            ffmpeg_path,
+            "-loglevel", "error",
+            "-fflags", "nobuffer",
+            "-flags", "low_delay",
+            "-rw_timeout", str(int(self.open_timeout * 1e6)),
+            "-i", self.camera_url,
+            "-an",
+            "-map", "0:v",
+            "-vf", ",".join(filters),
+            "-f", "rawvideo",
+            "-pix_fmt", self.pix_fmt,
+            "pipe:1",
+        ]
+        if display_fd is not None:
+            display_filters = [f"scale=w=min(iw\\,{self.display_width}):h=-2"]
+            if self.fps:
+                display_filters.insert(0, f"fps={self.fps}")
+            command += [
+                "-map", "0:v",
+                "-vf", ",".join(display_filters),
+                "-q:v", str(self.display_quality),
+                "-f", "mjpeg",
+                f"pipe:{display_fd}",
+            ]
+        return command
+
+    def _open(self):
+        display_read = display_write = None
+        if self.display_width:
+            display_read, display_write = os.pipe()
+        try:
+            proc = subprocess.Popen(self._command(display_write), stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, bufsize=0,
+                                    pass_fds=(display_write,) if display_write is not None else ())
+        except OSError as e:
+            print(f"[ERROR] Cannot start ffmpeg for {self.camera_url}: {e}")
+            if display_read is not None:
+                os.close(display_read)
+                os.close(display_write)
+            return None
+        self._proc = proc
+        if display_read is not None:
+            # Only ffmpeg keeps the write end: the reader gets EOF when it exits
+            os.close(display_write)
+            self._display_thread = threading.Thread(
+                target=self._receive_display, args=(os.fdopen(display_read, "rb"),),
+                name=f"ffmpeg-display-{self.camera_url}", daemon=True
+            )
+            self._display_thread.start()
+        return proc
+
+    def _receive_display(self, pipe):
+        reader = _StreamReader(pipe)
+        with pipe:
+            while True:
+                try:
+                    jpeg = reader.read_jpeg()
+                except (EOFError, OSError, ValueError):
+                    return
+                received_ts = time.time()
+                if self.on_jpeg is not None:
+                    self.on_jpeg(jpeg, received_ts)
+                with self._jpeg_lock:
+                    self._latest_jpeg, self._latest_jpeg_ts = jpeg, received_ts
+
+    def peek_latest_jpeg(self):
+        """Newest display JPEG (None without display_width). Returns (jpeg, capture_ts)."""
+        with self._jpeg_lock:
+            return self._latest_jpeg, self._latest_jpeg_ts
+
+    def _read(self, proc):
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        view = memoryview(frame).cast("B")
+        filled = 0
+        deadline = time.time() + self.stall_timeout
+        while filled < len(view):
+            ready, _, _ = select.select([proc.stdout], [], [], max(deadline - time.time(), 0))
+            if not ready:
+                # No complete frame in time: a partial frame cannot be resynced, restart ffmpeg
+                proc.kill()
+                return None
+            n = proc.stdout.readinto(view[filled:])
+            if not n:
+                return None
+            filled += n
+        return frame
+
+    def _is_open(self, proc):
+        return proc.poll() is None
+
+    def _close(self, proc):
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        if proc.stdout is not None:
+            proc.stdout.close()
+        if self._display_thread is not None:
+            self._display_thread.join(timeout=1.0)
+            self._display_thread = None
+        self._proc = None
+
+    def stop(self, timeout=2.0):
+        # Unblock a read in progress right away instead of waiting for its timeout
+        self._stop_event.set()
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+        super().stop(timeout)
+
+
+# cv2.imdecode flags for JPEG decoding with DCT scaling, largest reduction first
+REDUCED_DECODE_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+    (1, cv2.IMREAD_COLOR),
+]
+
+
+def jpeg_size(jpeg):
+    """
+    Read (width, height) from the SOF marker of a JPEG without decoding it.
+    Returns None if no SOF marker is found.
+    """
+    i = 2
+    n = len(jpeg)
+    while i + 9 < n:
+        if jpeg[i] != 0xFF:
+            i += 1
+            continue
+        marker = jpeg[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            i += 1 if marker == 0xFF else 2
+            continue
+        # SOF0..SOF15, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = (jpeg[i + 5] << 8) | jpeg[i + 6]
+            width = (jpeg[i + 7] << 8) | jpeg[i + 8]
+            return width, height
+        i += 2 + ((jpeg[i + 2] << 8) | jpeg[i + 3])
+    return None
+
+
+class _StreamReader:
+    """
+    Small buffered reader over an HTTP response (or a pipe) for splitting an MJPEG stream.
+    """
+    def __init__(self, response, chunk_size=65536):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+
+    def _fill(self):
+        chunk = self.response.read1(self.chunk_size)
+        if not chunk:
+            raise EOFError("stream closed")
+        self.buffer += chunk
+
+    def readline(self):
+        while True:
+            end = self.buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(self.buffer[:end + 1])
+                del self.buffer[:end + 1]
+                return line
+            self._fill()
+
+    def read_exact(self, size):
+        while len(self.buffer) < size:
+            self._fill()
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def read_jpeg(self):
+        """Skip to the next SOI marker and return everything up to and including EOI."""
+        while True:
+            start = self.buffer.find(b"\xff\xd8")
+            if start >= 0:
+                del self.buffer[:start]
+                break
+            del self.buffer[:max(len(self.buffer) - 1, 0)]
+            self._fill()
+        searched = 2
+        while True:
+            end = self.buffer.find(b"\xff\xd9", searched)
+            if end >= 0:
+                return self.read_exact(end + 2)
+            searched = max(len(self.buffer) - 1, 2)
+            self._fill()
+
+
+class MJPEGCaptureWorker(CameraCaptureWorker):
+    """
+    Capture worker that splits the multipart MJPEG HTTP stream itself (IP Webcam's /video).
+
+    A network thread only cuts the stream into JPEG byte strings and keeps the
+    newest one in a single-slot mailbox. The capture thread decodes whatever is
+    newest, so when decoding falls behind, the frames in between are dropped
+    without ever being decoded (counted in skipped_frames).
+
+    Decoding uses libjpeg DCT scaling (IMREAD_REDUCED_COLOR_2/4/8): a 1280x720
+    JPEG is decoded straight to 320x180 instead of full size (about 6x less CPU),
+    then resized to width x height. Streams without multipart framing
+    (concatenated JPEGs) are split on the SOI / EOI markers. Every frame is a new
+    array, so consumers may keep a published frame as long as they like.
+
+    Args:
+        width, height (int): output frame size
+        min_decode_coverage (float): the largest DCT scale is used whose output is still at least
+            this fraction of width x height (0.75: a 1280x720 JPEG is decoded at 1/4 = 320x180
+            for a 224x224 output, the small upscale is invisible after the squash resize)
+        max_decode_fps (float, optional): decode at most this many frames per second, None = as fast as they come
+    """
+    backend = "mjpeg"
+
+    def __init__(self, camera_url, width=224, height=224, min_decode_coverage=0.75, max_decode_fps=None,
+                 **kwargs):
+        super().__init__(camera_url, **kwargs)
+        self.width = width
+        self.height = height
+        self.min_decode_coverage = min_decode_coverage
+        self.max_decode_fps = max_decode_fps
+
+        self._jpeg_cond = threading.Condition()
+        self._pending_jpeg = None
+        self._pending_ts = None
+        self._latest_jpeg = None
+        self._latest_jpeg_ts = None
+        self._decoding_ts = None
+        self._last_decode = 0.0
+        self._decode_flag = None
+        self.decode_scale = None
+
+        self.received_frames = 0
+        self.skipped_frames = 0
+        self.corrupt_frames = 0
+
+    def _open(self):
+        try:
+            response = urllib.request.urlopen(self.camera_url, timeout=self.open_timeout)
+        except (OSError, ValueError):
+            return None
+
+        content_type = response.headers.get("Content-Type", "")
+        boundary = None
+        if "multipart" in content_type and "boundary=" in content_type:
+            boundary = content_type.split("boundary=", 1)[1].split(";")[0].strip().strip('"')
+            if boundary.startswith("--"):
+                boundary = boundary[2:]
+
+        handle = {"response": response, "alive": True}
+        handle["thread"] = threading.Thread(
+            target=self._receive, args=(handle, boundary), name=f"mjpeg-{self.camera_url}", daemon=True
+        )
+        handle["thread"].start()
+        return handle
+
+    def _next_part(self, reader, boundary):
+        """
+        Return the JPEG bytes of the next multipart part (or the next JPEG if boundary is None).
+        """
+        if boundary is None:
+            return reader.read_jpeg()
+
+        line = reader.readline()
+        while not line.startswith(b"--"):
+            line = reader.readline()
+        length = None
+        while True:
+            line = reader.readline().strip()
+            if not line:
+                break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value.strip())
+        if length is None:
+            return reader.read_jpeg()
+        return reader.read_exact(length)
+
+    def _receive(self, handle, boundary):
+        reader = _StreamReader(handle["response"])
+        try:
+            while handle["alive"] and not self._stop_event.is_set():
+                jpeg = self._next_part(reader, boundary)
+                received_ts = time.time()
+                if self.on_jpeg is not None:
+                    self.on_jpeg(jpeg, received_ts)
+                with self._jpeg_cond:
+                    self.received_frames += 1
+                    if self._pending_jpeg is not None:
+                        self.skipped_frames += 1
+                    self._pending_jpeg = jpeg
+                    self._pending_ts = received_ts
+                    self._latest_jpeg, self._latest_jpeg_ts = jpeg, received_ts
+                    self._jpeg_cond.notify()
+        except (OSError, EOFError, ValueError):
+            pass
+        finally:
+            handle["alive"] = False
+            with self._jpeg_cond:
+                self._jpeg_cond.notify()
+
+    def peek_latest_jpeg(self):
+        """Newest received JPEG bytes, decoded or not. Returns (jpeg, capture_ts)."""
+        with self._jpeg_cond:
+            return self._latest_jpeg, self._latest_jpeg_ts
+
+    def _is_open(self, handle):
+        return handle["alive"] or self._pending_jpeg is not None
+
+    def _choose_decode_flag(self, jpeg):
+        size = jpeg_size(jpeg)
+        if size is None:
+            return cv2.IMREAD_COLOR
+        width, height = size
+        for scale, flag in REDUCED_DECODE_FLAGS:
+            if (width // scale >= self.width * self.min_decode_coverage
+                    and height // scale >= self.height * self.min_decode_coverage):
+                self.decode_scale = scale
+                return flag
+        self.decode_scale = 1
+        return cv2.IMREAD_COLOR
+
+    def _read(self, handle):
+        if self.max_decode_fps:
+            wait = self._last_decode + 1.0 / self.max_decode_fps - time.time()
+            if wait > 0:
+                self._stop_event.wait(wait)
+
+        with self._jpeg_cond:
+            if self._pending_jpeg is None and handle["alive"]:
+                self._jpeg_cond.wait(self.stall_timeout)
+            jpeg, self._pending_jpeg = self._pending_jpeg, None
+            self._decoding_ts = self._pending_ts
+        if jpeg is None:
+            return None
+
+        if self._decode_flag is None:
+            self._decode_flag = self._choose_decode_flag(jpeg)
+        self._last_decode = time.time()
+        decoded = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), self._decode_flag)
+        if decoded is None:
+            self.corrupt_frames += 1
+            return None
+
+        if decoded.shape[:2] == (self.height, self.width):
+            return decoded
+        return cv2.resize(decoded, (self.width, self.height), interpolation=cv2.INTER_AREA)
+
+    def _publish(self, frame, capture_ts):
+        # Timestamp the frame when its bytes arrived, not when decoding finished
+        super()._publish(frame, self._decoding_ts or capture_ts)
+
+    def _close(self, handle):
+        handle["alive"] = False
+        try:
+            handle["response"].close()
+        except OSError:
+            pass
+        handle["thread"].join(timeout=1.0)
+        self._decode_flag = None
+        with self._jpeg_cond:
+            self._pending_jpeg = None
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            "received_frames": self.received_frames,
+            "skipped_frames": self.skipped_frames,
+            "corrupt_frames": self.corrupt_frames,
+            "decode_scale": self.decode_scale,
+        })
+        return stats
+
+
+CAPTURE_BACKENDS = {
+    CameraCaptureWorker.backend: CameraCaptureWorker,
+    FFmpegPipeCaptureWorker.backend: FFmpegPipeCaptureWorker,
+    MJPEGCaptureWorker.backend: MJPEGCaptureWorker,
+}
+
+def create_capture_worker(camera_url, backend="opencv", **kwargs):
+    """
+    Build a capture worker for one camera with the chosen ingest backend.
+
+    Args:
+        backend (str): 'opencv' (cv2.VideoCapture, full resolution) or
+                       'ffmpeg' (rawvideo pipe, downscaled by ffmpeg) or
+                       'mjpeg' (own multipart MJPEG parser, DCT-scaled JPEG decode)
+    """
+    try:
+        worker_cls = CAPTURE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown capture backend '{backend}', expected one of {list(CAPTURE_BACKENDS)}")
+    return worker_cls(camera_url, **kwargs)
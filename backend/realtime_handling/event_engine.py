@@ -0,0 +1,160 @@
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+IDLE = "idle"          # below the enter threshold
+PENDING = "pending"    # above the enter threshold, waiting for min_duration
+ACTIVE = "active"      # incident in progress
+COOLING = "cooling"    # below the exit threshold, waiting merge_gap before closing
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone(timedelta(hours=7))).replace(microsecond=0).isoformat()
+
+
+class _CameraTrack:
+    def __init__(self, median_window):
+        self.history = deque(maxlen=median_window)
+        self.smoothed = None
+        self.state = IDLE
+        self.since = None        # when the current state was entered
+        self.incident_id = None
+        self.started_at = None
+        self.peak = 0
+
+
+class ViolenceEventEngine:
+    """
+    Turn per-tick camera probabilities into rare incident events.
+
+    Runs incrementally on every realtime result (like process_output in
+    online_demo/main.py, but for violence probabilities):
+        1. median over the last median_window probabilities removes single-tick spikes
+        2. EMA (ema_alpha) smooths what is left
+        3. hysteresis: an incident starts above enter_threshold and only ends below exit_threshold
+        4. the smoothed probability must stay above enter_threshold for min_duration seconds
+        5. an incident that drops and comes back within merge_gap seconds stays the same incident
+
+    Only state changes are emitted: "incident_start" and "incident_end".
+    A camera that is not live (or disappeared) counts as below the exit threshold.
+    """
+    def __init__(self, enter_threshold=70, exit_threshold=40, min_duration=2.0, merge_gap=5.0,
+                 median_window=3, ema_alpha=0.5, max_recent_events=200):
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.min_duration = min_duration
+        self.merge_gap = merge_gap
+        self.median_window = median_window
+        self.ema_alpha = ema_alpha
+
+        self.tracks = {}
+        self.recent_events = deque(maxlen=max_recent_events)
+        self._next_event_id = 1
+        self._next_incident_id = 1
+
+    def _smooth(self, track, probability):
+        track.history.append(probability)
+        median = sorted(track.history)[len(track.history) // 2]
+        if track.smoothed is None:
+            track.smoothed = float(median)
+        else:
+            track.smoothed = (1 - self.ema_alpha) * track.smoothed + self.ema_alpha * median
+        return track.smoothed
+
+    def _emit(self, event_type, camera_id, track, now):
+        event = {
+            "eventId": self._next_event_id,
+            "type": event_type,
+            "cameraId": camera_id,
+            "incidentId": track.incident_id,
+            "time": _iso(now),
+            "startedAt": _iso(track.started_at),
+            "endedAt": _iso(track.since) if event_type == "incident_end" else None,
+            "peakProbability": track.peak,
+            "smoothedProbability": round(track.smoothed or 0.0, 1),
+        }
+        self._next_event_id += 1
+        self.recent_events.append(event)
+        return event
+
+    def _advance(self, camera_id, track, level, now):
+        """
+        Move one camera's state machine. Returns the emitted event or None.
+        """
+        if track.state == IDLE:
+            if level >= self.enter_threshold:
+                track.state, track.since = PENDING, now
+                if self.min_duration <= 0:
+                    return self._advance(camera_id, track, level, now)
+
+        elif track.state == PENDING:
+            # Must stay above enter_threshold the whole time (hysteresis only applies once active)
+            if level < self.enter_threshold:
+                track.state, track.since = IDLE, now
+            elif now - track.since >= self.min_duration:
+                track.state = ACTIVE
+                track.started_at = track.since
+                track.incident_id = self._next_incident_id
+                self._next_incident_id += 1
+                track.peak = max(track.peak, int(level))
+                return self._emit("incident_start", camera_id, track, now)
+
+        elif track.state == ACTIVE:
+            track.peak = max(track.peak, int(level))
+            if level < self.exit_threshold:
+                track.state, track.since = COOLING, now
+
+        elif track.state == COOLING:
+            if level >= self.enter_threshold:
+                # Came back before merge_gap: same incident
+                track.state = ACTIVE
+                track.peak = max(track.peak, int(level))
+            elif now - track.since >= self.merge_gap:
+                event = self._emit("incident_end", camera_id, track, now)
+                track.state, track.incident_id, track.started_at, track.peak = IDLE, None, None, 0
+                return event
+        return None
+
+    def process(self, result, now=None):
+        """
+        Feed one realtime result.
+
+        Args:
+            result (dict): output of the realtime pipeline
+            now (float, optional): unix time of the result (default: time.time())
+
+        Returns:
+            list[dict]: events emitted by this result (usually empty)
+        """
+        now = time.time() if now is None else now
+        events = []
+        seen = set()
+        for camera in result["cameras"]:
+            camera_id = camera["cameraId"]
+            seen.add(camera_id)
+            track = self.tracks.setdefault(camera_id, _CameraTrack(self.median_window))
+            if camera["probability"] is None:
+                # Nothing scored yet (empty TSM window): no evidence either way, keep the state
+                continue
+            if camera.get("status", "live") == "live":
+                level = self._smooth(track, camera["probability"])
+            else:
+                level = 0.0
+            event = self._advance(camera_id, track, level, now)
+            if event is not None:
+                events.append(event)
+
+        # Removed cameras: close their incident right away
+        for camera_id in [cid for cid in self.tracks if cid not in seen]:
+            track = self.tracks.pop(camera_id)
+            if track.state in (ACTIVE, COOLING):
+                if track.state == ACTIVE:
+                    track.since = now
+                events.append(self._emit("incident_end", camera_id, track, now))
+        return events
+
+    def active_incidents(self):
+        return [
+            {"cameraId": cid, "incidentId": t.incident_id, "startedAt": _iso(t.started_at), "peakProbability": t.peak}
+            for cid, t in self.tracks.items() if t.state in (ACTIVE, COOLING)
+        ]
@@ -0,0 +1,356 @@
+import os
+import time
+import struct
+import threading
+
+import numpy as np
+import torch
+
+from realtime_handling.roi import roi_slug
+
+# Segment file: a header, then fixed-size records appended in time order
+#   header:  magic "FLOG" | version u16 | feature bits u16 (16 or 32) | feature_dim u32 | flags u32
+#   record:  ts f8 (tick time, unix seconds) | capture_ts f8 (NaN if unknown) | feature (feature_dim floats)
+MAGIC = b"FLOG"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+SEGMENT_SUFFIX = ".flog"
+# The live TSM window of the stream was empty before the first record of this segment
+# (new stream, reset on a source change, server restart): replay restarts there
+FLAG_RESET = 1
+# Appends are buffered: a stream's file is flushed when full, every flush_interval seconds,
+# on rotation, and before its records are read
+WRITE_BUFFER_BYTES = 256 * 1024
+# Records re-scored per TSM replay call, bounds the memory of a rescore
+REPLAY_BLOCK = 4096
+
+
+def record_dtype(feature_dim, dtype="float16"):
+    return np.dtype([("ts", "<f8"), ("capture_ts", "<f8"), ("feature", np.dtype(dtype).newbyteorder("<"), (feature_dim,))])
+
+
+def stream_dirname(camera_id, roi=None):
+    """Directory of one stream: cam<id> for the full frame, cam<id>_<roi> for a ROI."""
+    if roi is None:
+        return f"cam{camera_id}"
+    return f"cam{camera_id}_" + roi_slug(roi)
+
+
+def probabilities(logits):
+    """Violence probability (0 - 100) from TSM logits, like build_realtime_result."""
+    if logits.shape[-1] == 1:
+        return torch.sigmoid(logits).squeeze(-1) * 100
+    return torch.softmax(logits, dim=-1)[:, 1] * 100
+
+
+class _Segment:
+    def __init__(self, path, first_ts, last_ts, count, reset=False):
+        self.path = path
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.count = count
+        self.reset = reset
+
+
+class _StreamLog:
+    def __init__(self, path):
+        self.path = path
+        self.segments = []
+        self.file = None
+        self.file_bytes = 0
+        self.reset_pending = False
+
+
+class FeatureLog:
+    """
+    Append-only log of the backbone features pushed into each stream's TSM window,
+    so past footage can be re-scored (by the live TSM head or another checkpoint)
+    without decoding video again.
+
+    Each stream (camera, or camera ROI) has a directory of segment files of
+    fixed-size records in time order: a segment is memory-mapped for reading and
+    a time range is found by binary search on its timestamps. The current
+    segment is rotated once it reaches segment_bytes, and the oldest segments
+    are deleted to keep a stream under max_bytes_per_stream.
+
+    Whenever the live TSM window of a stream starts empty (first append of a
+    stream in this process, or mark_reset()), a new segment flagged as a reset
+    is started, so rescore() restarts its window at the same records as the
+    realtime loop did.
+
+    Features are stored as float16 by default (4 KB per 2048-d feature, precise
+    enough for the TSM head), float32 on request. Appends are buffered and
+    flushed every flush_interval seconds, so a crash loses at most that much.
+
+    Args:
+        log_dir (str): root directory of the log
+        feature_dim (int): feature size
+        dtype (str): 'float16' or 'float32'
+        segment_bytes (int): size at which a segment is closed and a new one started
+        max_bytes_per_stream (int): retention per stream, oldest segments dropped first
+        flush_interval (float): seconds between flushes of the open segments
+    """
+    def __init__(self, log_dir="feature_log", feature_dim=2048, dtype="float16",
+                 segment_bytes=64 * 1024 * 1024, max_bytes_per_stream=2 * 1024 ** 3, flush_interval=1.0):
+        if dtype not in ("float16", "float32"):
+            raise ValueError(f"Unsupported feature log dtype '{dtype}'")
+        self.log_dir = log_dir
+        self.feature_dim = feature_dim
+        self.dtype = dtype
+        self.record_dtype = record_dtype(feature_dim, dtype)
+        self.segment_bytes = segment_bytes
+        self.max_bytes_per_stream = max_bytes_per_stream
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._streams = {}
+        self.appended_records = 0
+        self.deleted_segments = 0
+        os.makedirs(log_dir, exist_ok=True)
+        self._scan()
+
+    # ---------- segments ----------
+    def _header(self, flags=0):
+        return HEADER.pack(MAGIC, VERSION, np.dtype(self.dtype).itemsize * 8, self.feature_dim, flags)
+
+    @staticmethod
+    def _flags(path):
+        with open(path, "rb") as f:
+            return HEADER.unpack(f.read(HEADER.size))[4]
+
+    def _open_segment(self, path):
+        """
+        Memory-map the complete records of a segment. Returns None if it is not a readable segment.
+        """
+        size = os.path.getsize(path)
+        if size < HEADER.size:
+            return None
+        with open(path, "rb") as f:
+            magic, version, bits, feature_dim, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or feature_dim != self.feature_dim:
+            return None
+        dtype = record_dtype(feature_dim, "float16" if bits == 16 else "float32")
+        count = (size - HEADER.size) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+
+    def _scan(self):
+        for name in sorted(os.listdir(self.log_dir)):
+            stream_path = os.path.join(self.log_dir, name)
+            if not os.path.isdir(stream_path):
+                continue
+            stream = self._streams[name] = _StreamLog(stream_path)
+            for segment_name in sorted(os.listdir(stream_path)):
+                if not segment_name.endswith(SEGMENT_SUFFIX):
+                    continue
+                path = os.path.join(stream_path, segment_name)
+                records = self._open_segment(path)
+                if records is None or len(records) == 0:
+                    continue
+                stream.segments.append(_Segment(path, float(records["ts"][0]), float(records["ts"][-1]),
+                                                len(records), reset=bool(self._flags(path) & FLAG_RESET)))
+        if self._streams:
+            print(f"[INFO] Feature log: {len(self._streams)} streams in '{self.log_dir}'")
+
+    def _stream(self, name):
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = _StreamLog(os.path.join(self.log_dir, name))
+            os.makedirs(stream.path, exist_ok=True)
+        return stream
+
+    def _rotate(self, stream, ts):
+        # No open file yet: nothing of this stream was pushed since the server started
+        reset = stream.file is None or stream.reset_pending
+        if stream.file is not None:
+            stream.file.close()
+        path = os.path.join(stream.path, f"{int(ts * 1000):015d}{SEGMENT_SUFFIX}")
+        stream.file = open(path, "ab", buffering=WRITE_BUFFER_BYTES)
+        stream.file.write(self._header(FLAG_RESET if reset else 0))
+        stream.file_bytes = HEADER.size
+        stream.reset_pending = False
+        stream.segments.append(_Segment(path, ts, ts, 0, reset=reset))
+
+        # Retention: drop the oldest closed segments
+        total = sum(os.path.getsize(s.path) for s in stream.segments[:-1]) + stream.file_bytes
+        while len(stream.segments) > 1 and total > self.max_bytes_per_stream:
+            oldest = stream.segments.pop(0)
+            total -= os.path.getsize(oldest.path)
+            os.remove(oldest.path)
+            self.deleted_segments += 1
+
+    # ---------- writing ----------
+    def append(self, keys, features, ts, capture_ts=None):
+        """
+        Append one feature per stream.
+
+        Args:
+            keys (list[tuple]): (camera_id, roi name or None) of each row
+            features (array-like): (len(keys), feature_dim) features, e.g. a CPU tensor
+            ts (float): tick time
+            capture_ts (list[float], optional): capture time of the frame behind each row
+        """
+        if not keys:
+            return
+        records = np.empty(len(keys), dtype=self.record_dtype)
+        records["ts"] = ts
+        records["capture_ts"] = [np.nan if c is None else c for c in capture_ts] if capture_ts else np.nan
+        records["feature"] = np.asarray(features)
+        with self._lock:
+            for (camera_id, roi), record in zip(keys, records):
+                stream = self._stream(stream_dirname(camera_id, roi))
+                if (stream.file is None or stream.reset_pending
+                        or stream.file_bytes + self.record_dtype.itemsize > self.segment_bytes):
+                    self._rotate(stream, ts)
+                stream.file.write(record.tobytes())
+                stream.file_bytes += self.record_dtype.itemsize
+                segment = stream.segments[-1]
+                segment.last_ts = ts
+                segment.count += 1
+            self.appended_records += len(keys)
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
+                self._last_flush = now
+                for stream in self._streams.values():
+                    if stream.file is not None:
+                        stream.file.flush()
+
+    def mark_reset(self, keys):
+        """
+        Record that the live TSM windows of these streams were emptied: their next
+        record starts a new window.
+
+        Args:
+            keys (list[tuple]): (camera_id, roi name or None) of the streams
+        """
+        with self._lock:
+            for camera_id, roi in keys:
+                stream = self._streams.get(stream_dirname(camera_id, roi))
+                if stream is not None:
+                    stream.reset_pending = True
+
+    def close(self):
+        with self._lock:
+            for stream in self._streams.values():
+                if stream.file is not None:
+                    stream.file.close()
+                    stream.file = None
+
+    # ---------- reading ----------
+    def read(self, camera_id, start, end, roi=None, context=0):
+        """
+        Records of a stream with start <= ts <= end, plus up to `context` records
+        right before start (to warm up a temporal window).
+
+        Returns:
+            np.ndarray: structured records (ts, capture_ts, feature), oldest first
+        """
+        parts = [records for records, _ in self._slices(camera_id, start, end, roi, context)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=self.record_dtype)
+
+    def _slices(self, camera_id, start, end, roi=None, context=0):
+        """
+        Same records as read(), yielded as slices of the memory-mapped segments
+        (nothing is copied) with a flag telling whether the live window restarted
+        at the first record of the slice.
+        """
+        with self._lock:
+            stream = self._streams.get(stream_dirname(camera_id, roi))
+            if stream is None:
+                return
+            if stream.file is not None:
+                stream.file.flush()
+            segments = list(stream.segments)
+
+        before = []  # (records, reset) right before start, context records at most
+        for segment in segments:
+            if segment.count == 0 or segment.first_ts > end:
+                continue
+            if segment.last_ts < start and context == 0:
+                continue
+            records = self._open_segment(segment.path)
+            if records is None:
+                continue
+            lo = int(np.searchsorted(records["ts"], start, side="left"))
+            hi = int(np.searchsorted(records["ts"], end, side="right"))
+            if context and lo > 0:
+                first = max(lo - context, 0)
+                before.append((records[first:lo], segment.reset and first == 0))
+                excess = sum(len(r) for r, _ in before) - context
+                while excess >= len(before[0][0]):
+                    excess -= len(before.pop(0)[0])
+                if excess > 0:
+                    before[0] = (before[0][0][excess:], False)
+            if hi > lo:
+                yield from before
+                before = []
+                yield records[lo:hi], segment.reset and lo == 0
+
+    def rescore(self, tsm_model, camera_id, start, end, roi=None, max_points=None):
+        """
+        Re-run a TSM head over the logged features of [start, end].
+
+        Each point is the probability the head gives the window ending at that
+        record, as the realtime loop scored it: the window is warmed up with the
+        records before start and restarts where the live window was reset.
+
+        Args:
+            tsm_model (TSMFeatureModel): head to use (the live one or another checkpoint)
+            max_points (int, optional): keep the highest probability per time bucket
+                when there are more records than this
+
+        Returns:
+            dict: {"cameraId", "roi", "records", "elapsedMs", "points": [{"ts", "probability"}]}
+        """
+        started = time.time()
+        warmup = tsm_model.n_segment - 1
+        # The last `warmup` features of the current run of records: the window of
+        # the next block (a run restarts where the live window was reset)
+        context = None
+        ts, probs = [], []
+        tsm_model.eval()
+        with torch.inference_mode():
+            for records, reset in self._slices(camera_id, start, end, roi=roi, context=warmup):
+                for a in range(0, len(records), REPLAY_BLOCK):
+                    block = records[a:a + REPLAY_BLOCK]
+                    features = torch.from_numpy(np.array(block["feature"]))
+                    if context is not None and not (reset and a == 0):
+                        features = torch.cat([context, features])
+                    logits = tsm_model.replay(features)[len(features) - len(block):]
+                    context = features[len(features) - warmup:]
+                    scored = block["ts"] >= start
+                    ts.append(np.asarray(block["ts"][scored]))
+                    probs.append(probabilities(logits).cpu().numpy()[scored])
+        ts = np.concatenate(ts) if ts else np.zeros(0)
+        probs = np.concatenate(probs) if probs else np.zeros(0, dtype=np.float32)
+        count = len(ts)
+
+        if max_points and len(ts) > max_points:
+            buckets = np.minimum(((ts - ts[0]) / max(ts[-1] - ts[0], 1e-9) * max_points).astype(int), max_points - 1)
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            peak = np.maximum.reduceat(probs, starts)
+            ts = ts[starts]
+            probs = peak
+
+        return {
+            "cameraId": camera_id,
+            "roi": roi,
+            "records": count,
+            "elapsedMs": round((time.time() - started) * 1000, 1),
+            "points": [{"ts": round(float(t), 3), "probability": round(float(p), 1)} for t, p in zip(ts, probs)],
+        }
+
+    def streams(self):
+        with self._lock:
+            return [
+                {"stream": name, "segments": len(stream.segments),
+                 "records": sum(s.count for s in stream.segments),
+                 "firstTs": stream.segments[0].first_ts if stream.segments else None,
+                 "lastTs": stream.segments[-1].last_ts if stream.segments else None}
+                for name, stream in self._streams.items()
+            ]
+
+    def stats(self):
+        return {"dir": self.log_dir, "dtype": self.dtype, "appended_records": self.appended_records,
+                "deleted_segments": self.deleted_segments}
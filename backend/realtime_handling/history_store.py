@@ -0,0 +1,294 @@
+import os
+import time
+import struct
+import threading
+
+import numpy as np
+
+# Rollup chunk file: a header, then one column after the other (columnar, not records)
+#   header:  magic "HIST" | version u16 | reserved u16 | resolution s u32 | buckets u32 | padding to 64 bytes
+#   columns: min f4[buckets] | max f4[buckets] | sum f8[buckets] | count u4[buckets]
+# Bucket k of chunk c covers [(c * buckets + k) * resolution, + resolution) in unix seconds;
+# count 0 = no sample (min / max are then meaningless)
+MAGIC = b"HIST"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+HEADER_BYTES = 64
+CHUNK_SUFFIX = ".hist"
+COLUMNS = (("min", np.dtype("<f4")), ("max", np.dtype("<f4")), ("sum", np.dtype("<f8")), ("count", np.dtype("<u4")))
+
+# Event file of a camera: fixed-size records appended in time order
+EVENT_DTYPE = np.dtype([("ts", "<f8"), ("incident_id", "<u4"), ("type", "u1"), ("peak", "u1")])
+EVENT_TYPES = ("incident_start", "incident_end")
+EVENTS_FILE = "events.log"
+
+
+def chunk_bytes(buckets):
+    return HEADER_BYTES + sum(dtype.itemsize for _, dtype in COLUMNS) * buckets
+
+
+def map_chunk(path, resolution, buckets, mode="r"):
+    """
+    Memory-map a rollup chunk and return its columns as arrays, or None if the
+    file is missing, incomplete or written with another layout.
+    """
+    size = chunk_bytes(buckets)
+    if mode == "r":
+        try:
+            if os.path.getsize(path) != size:
+                return None
+            data = np.memmap(path, dtype=np.uint8, mode="r", shape=(size,))
+        except (FileNotFoundError, ValueError):
+            return None
+        magic, version, _, file_resolution, file_buckets = HEADER.unpack(data[:HEADER.size].tobytes())
+        if magic != MAGIC or version != VERSION or (file_resolution, file_buckets) != (resolution, buckets):
+            return None
+    else:
+        # New chunks are created zero-filled (sparse), i.e. every bucket empty
+        mode = "r+" if os.path.exists(path) and os.path.getsize(path) == size else "w+"
+        data = np.memmap(path, dtype=np.uint8, mode=mode, shape=(size,))
+        if mode == "w+":
+            data[:HEADER.size] = np.frombuffer(HEADER.pack(MAGIC, VERSION, 0, resolution, buckets), dtype=np.uint8)
+    columns, offset = {"mmap": data}, HEADER_BYTES
+    for name, dtype in COLUMNS:
+        columns[name] = data[offset:offset + dtype.itemsize * buckets].view(dtype)
+        offset += dtype.itemsize * buckets
+    return columns
+
+
+class HistoryStore:
+    """
+    Embedded time-series store of the realtime probabilities and incident events,
+    so a dashboard can draw a camera's past instead of starting blank.
+
+    Every sample updates min / max / sum / count rollups at each resolution
+    (seconds), kept per camera in fixed-size chunk files of buckets_per_chunk
+    buckets that are memory-mapped and laid out column by column. A bucket is
+    addressed from its timestamp directly, so a query reads one contiguous
+    slice per chunk of the coarsest resolution that still gives the requested
+    number of points: its cost depends on the number of points, not on the
+    length of the range (and never exceeds reading the chunks that exist).
+
+    Args:
+        store_dir (str): root directory (one cam<id> directory per camera)
+        resolutions (tuple[int]): rollup bucket sizes in seconds, finest first
+        buckets_per_chunk (int): buckets per chunk file (3600 = 1 hour of 1 s buckets, 72 KB)
+        keep_chunks (int): chunks kept per camera and resolution, oldest deleted first
+            (168 = 7 days of 1 s buckets, 70 days of 10 s buckets, ...)
+    """
+    def __init__(self, store_dir="history", resolutions=(1, 10, 60, 600, 3600), buckets_per_chunk=3600,
+                 keep_chunks=168):
+        self.store_dir = store_dir
+        self.resolutions = tuple(sorted(int(r) for r in resolutions))
+        self.buckets_per_chunk = buckets_per_chunk
+        self.keep_chunks = keep_chunks
+        self._lock = threading.Lock()
+        # (camera_id, resolution) -> (chunk index, columns) of the chunk being written
+        self._open_chunks = {}
+        self._event_files = {}
+        self.recorded_samples = 0
+        self.recorded_events = 0
+        self.deleted_chunks = 0
+        os.makedirs(store_dir, exist_ok=True)
+
+    # ---------- paths ----------
+    def _level_dir(self, camera_id, resolution):
+        return os.path.join(self.store_dir, f"cam{camera_id}", f"{resolution}s")
+
+    def _chunk_path(self, camera_id, resolution, chunk):
+        return os.path.join(self._level_dir(camera_id, resolution), f"{chunk:012d}{CHUNK_SUFFIX}")
+
+    def _chunks(self, camera_id, resolution):
+        try:
+            names = os.listdir(self._level_dir(camera_id, resolution))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-len(CHUNK_SUFFIX)]) for name in names if name.endswith(CHUNK_SUFFIX))
+
+    def cameras(self):
+        return sorted(int(name[3:]) for name in os.listdir(self.store_dir)
+                      if name.startswith("cam") and name[3:].isdigit())
+
+    # ---------- writing ----------
+    def _writable_chunk(self, camera_id, resolution, chunk):
+        key = (camera_id, resolution)
+        current = self._open_chunks.get(key)
+        if current is not None and current[0] == chunk:
+            return current[1]
+        if current is not None:
+            current[1]["mmap"].flush()
+        os.makedirs(self._level_dir(camera_id, resolution), exist_ok=True)
+        columns = map_chunk(self._chunk_path(camera_id, resolution, chunk), resolution, self.buckets_per_chunk,
+                            mode="w+")
+        self._open_chunks[key] = (chunk, columns)
+
+        # Retention: drop the oldest chunks of this camera and resolution
+        chunks = self._chunks(camera_id, resolution)
+        for old in chunks[:max(len(chunks) - self.keep_chunks, 0)]:
+            os.remove(self._chunk_path(camera_id, resolution, old))
+            self.deleted_chunks += 1
+        return columns
+
+    def record(self, result, now=None):
+        """
+        Add the probability of every live, scored camera of a realtime result to all rollups.
+
+        Args:
+            result (dict): output of the realtime pipeline
+            now (float, optional): unix time of the result (default: time.time())
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for camera in result["cameras"]:
+                if camera.get("status", "live") != "live" or camera["probability"] is None:
+                    continue
+                probability = float(camera["probability"])
+                for resolution in self.resolutions:
+                    bucket = int(now // resolution)
+                    chunk, offset = divmod(bucket, self.buckets_per_chunk)
+                    columns = self._writable_chunk(camera["cameraId"], resolution, chunk)
+                    if columns["count"][offset] == 0:
+                        columns["min"][offset] = columns["max"][offset] = probability
+                    else:
+                        columns["min"][offset] = min(columns["min"][offset], probability)
+                        columns["max"][offset] = max(columns["max"][offset], probability)
+                    columns["sum"][offset] += probability
+                    columns["count"][offset] += 1
+                self.recorded_samples += 1
+
+    def record_events(self, events, now=None):
+        """
+        Append incident events (output of ViolenceEventEngine.process) to their camera's event file.
+        """
+        if not events:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            for event in events:
+                camera_id = event["cameraId"]
+                record = np.zeros(1, dtype=EVENT_DTYPE)
+                record["ts"] = now
+                record["incident_id"] = event.get("incidentId") or 0
+                record["type"] = EVENT_TYPES.index(event["type"])
+                record["peak"] = min(max(int(event.get("peakProbability") or 0), 0), 255)
+                f = self._event_files.get(camera_id)
+                if f is None:
+                    os.makedirs(os.path.join(self.store_dir, f"cam{camera_id}"), exist_ok=True)
+                    f = self._event_files[camera_id] = open(
+                        os.path.join(self.store_dir, f"cam{camera_id}", EVENTS_FILE), "ab")
+                f.write(record.tobytes())
+                f.flush()
+                self.recorded_events += 1
+
+    def flush(self):
+        with self._lock:
+            for _, columns in self._open_chunks.values():
+                columns["mmap"].flush()
+
+    def close(self):
+        with self._lock:
+            for _, columns in self._open_chunks.values():
+                columns["mmap"].flush()
+            self._open_chunks.clear()
+            for f in self._event_files.values():
+                f.close()
+            self._event_files.clear()
+
+    # ---------- reading ----------
+    def _read_buckets(self, camera_id, resolution, first, last, chunks):
+        """
+        Columns of the global buckets first..last (inclusive) from the given existing
+        chunks; buckets of other chunks read as empty.
+        """
+        n = max(last - first + 1, 0)
+        out = {name: np.zeros(n, dtype=dtype) for name, dtype in COLUMNS}
+        for chunk in chunks:
+            if not first // self.buckets_per_chunk <= chunk <= last // self.buckets_per_chunk:
+                continue
+            chunk_first = chunk * self.buckets_per_chunk
+            lo, hi = max(first, chunk_first), min(last, chunk_first + self.buckets_per_chunk - 1)
+            columns = map_chunk(self._chunk_path(camera_id, resolution, chunk), resolution, self.buckets_per_chunk)
+            if columns is None:
+                continue
+            for name, _ in COLUMNS:
+                out[name][lo - first:hi - first + 1] = columns[name][lo - chunk_first:hi - chunk_first + 1]
+        return out
+
+    def pick_resolution(self, span, points):
+        """Coarsest resolution with at least `points` buckets in `span` seconds (the finest one otherwise)."""
+        fitting = [r for r in self.resolutions if r <= span / max(points, 1)]
+        return fitting[-1] if fitting else self.resolutions[0]
+
+    def events(self, camera_id, start, end):
+        path = os.path.join(self.store_dir, f"cam{camera_id}", EVENTS_FILE)
+        try:
+            count = os.path.getsize(path) // EVENT_DTYPE.itemsize
+        except FileNotFoundError:
+            return []
+        if count == 0:
+            return []
+        records = np.memmap(path, dtype=EVENT_DTYPE, mode="r", shape=(count,))
+        lo = int(np.searchsorted(records["ts"], start, side="left"))
+        hi = int(np.searchsorted(records["ts"], end, side="right"))
+        return [
+            {"ts": round(float(r["ts"]), 3), "type": EVENT_TYPES[r["type"]], "incidentId": int(r["incident_id"]),
+             "peakProbability": int(r["peak"])}
+            for r in records[lo:hi]
+        ]
+
+    def query(self, camera_id, start, end, points=500):
+        """
+        About `points` min / max / mean points of a camera's probability over [start, end], plus its events.
+
+        Points are aligned on multiples of their width, so polling the same range
+        returns stable points; buckets without samples are left out.
+
+        Returns:
+            dict: {"cameraId", "start", "end", "resolution", "step", "elapsedMs",
+                   "points": [{"ts", "min", "max", "mean", "samples"}], "events": [...]}
+        """
+        started = time.time()
+        points = max(int(points), 1)
+        resolution = self.pick_resolution(end - start, points)
+        first, last = int(start // resolution), int(end // resolution)
+        group = max(-(-(last - first + 1) // points), 1)
+        first = first // group * group
+        last = (last // group + 1) * group - 1
+        # Only read what was stored: a range far beyond the retention costs no more than the stored chunks
+        chunks = self._chunks(camera_id, resolution)
+        if chunks:
+            first = max(first, chunks[0] * self.buckets_per_chunk // group * group)
+            last = min(last, (((chunks[-1] + 1) * self.buckets_per_chunk - 1) // group + 1) * group - 1)
+        if not chunks or first > last:
+            first, last = 0, -1
+        buckets = self._read_buckets(camera_id, resolution, first, last, chunks)
+
+        count = buckets["count"].reshape(-1, group)
+        filled = count > 0
+        samples = count.sum(axis=1)
+        mins = np.where(filled, buckets["min"].reshape(-1, group), np.inf).min(axis=1)
+        maxs = np.where(filled, buckets["max"].reshape(-1, group), -np.inf).max(axis=1)
+        sums = buckets["sum"].reshape(-1, group).sum(axis=1)
+        keep = np.flatnonzero(samples)
+        ts = (first + keep * group) * resolution
+        means = sums[keep] / samples[keep]
+
+        return {
+            "cameraId": camera_id,
+            "start": start,
+            "end": end,
+            "resolution": resolution,
+            "step": resolution * group,
+            "points": [
+                {"ts": int(t), "min": round(float(lo), 1), "max": round(float(hi), 1), "mean": round(float(m), 1),
+                 "samples": int(s)}
+                for t, lo, hi, m, s in zip(ts, mins[keep], maxs[keep], means, samples[keep])
+            ],
+            "events": self.events(camera_id, start, end),
+            "elapsedMs": round((time.time() - started) * 1000, 2),
+        }
+
+    def stats(self):
+        return {"dir": self.store_dir, "resolutions": list(self.resolutions),
+                "recorded_samples": self.recorded_samples, "recorded_events": self.recorded_events,
+                "deleted_chunks": self.deleted_chunks}
@@ -0,0 +1,123 @@
+import cv2
+import numpy as np
+import torch
+
+# Same normalization as get_preprocess_transform (frame_to_vector.py)
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+class RealtimeEngine:
+    """
+    Steady-state ResNet50 feature extraction for the realtime loop.
+
+    frames_to_vectors is convenient for one-off batches but rebuilds its transform,
+    goes through PIL, stacks fresh tensors and moves the model on every call.
+    The engine does the per-tick work into buffers allocated once per camera count:
+        - host frame batch (uint8 HWC, pinned on CUDA): frames are copied or resized into it
+        - input batch (float NCHW on device): BGR -> RGB, scaling and ImageNet
+          normalization are done in place as one multiply-add
+        - feature batch and gather buffer (N, feature_dim on device)
+        - row index buffer
+    Buffers only grow (reserve), so removing a camera never reallocates them.
+    The tensors returned by extract / gather are views of these buffers: they stay
+    valid until the next call.
+
+    Frames that are not frame_size are resized with cv2 (INTER_AREA), which differs
+    slightly from the PIL bilinear resize of frames_to_vectors. Capture workers
+    already deliver 224x224 frames, so the resize is normally skipped.
+
+    Args:
+        resnet50_model (nn.Module): truncated ResNet50 from load_resnet50_model
+        device (str or torch.device): 'cuda' or 'cpu'
+        frame_size (tuple): (width, height) of the backbone input
+        feature_dim (int): backbone output size
+        capacity (int): initial number of frames per batch
+    """
+    def __init__(self, resnet50_model, device="cpu", frame_size=(224, 224), feature_dim=2048, capacity=1):
+        self.device = torch.device(device)
+        self.model = resnet50_model.to(self.device).eval()
+        self.width, self.height = frame_size
+        self.feature_dim = feature_dim
+
+        # (pixel / 255 - mean) / std = pixel * scale + shift, per RGB channel
+        mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+        std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+        self.scale = (1.0 / (255.0 * std)).to(self.device)
+        self.shift = (-mean / std).to(self.device)
+
+        self.capacity = 0
+        self.reallocations = 0
+        self.reserve(capacity)
+
+    def reserve(self, num_frames):
+        """
+        Make room for batches of num_frames frames. No-op if the buffers are already large enough.
+        """
+        if num_frames <= self.capacity:
+            return
+        pin = self.device.type == "cuda"
+        self._host = torch.empty((num_frames, self.height, self.width, 3), dtype=torch.uint8, pin_memory=pin)
+        self._host_np = self._host.numpy()
+        # On CPU the host batch is the upload buffer; on CUDA it is copied over in one transfer
+        self._upload = self._host if not pin else torch.empty_like(self._host, device=self.device)
+        self._input = torch.empty((num_frames, 3, self.height, self.width), device=self.device)
+        self._features = torch.empty((num_frames, self.feature_dim), device=self.device)
+        self._gathered = torch.empty((num_frames, self.feature_dim), device=self.device)
+        self._index_host = torch.empty(num_frames, dtype=torch.long, pin_memory=pin)
+        self._index_np = self._index_host.numpy()
+        self._index = self._index_host if not pin else torch.empty_like(self._index_host, device=self.device)
+        self.capacity = num_frames
+        self.reallocations += 1
+
+    def extract(self, frames):
+        """
+        Backbone features of a list of BGR frames.
+
+        Returns:
+            torch.Tensor: (len(frames), feature_dim) view of the feature buffer
+        """
+        n = len(frames)
+        self.reserve(n)
+        if n == 0:
+            return self._features[:0]
+        for k, frame in enumerate(frames):
+            if frame.shape[0] == self.height and frame.shape[1] == self.width:
+                np.copyto(self._host_np[k], frame)
+            else:
+                cv2.resize(frame, (self.width, self.height), dst=self._host_np[k], interpolation=cv2.INTER_AREA)
+
+        upload, batch, features = self._upload[:n], self._input[:n], self._features[:n]
+        with torch.inference_mode():
+            if self._upload is not self._host:
+                upload.copy_(self._host[:n], non_blocking=True)
+            for c in range(3):
+                # BGR -> RGB while converting to float
+                batch[:, c].copy_(upload[..., 2 - c])
+            batch.mul_(self.scale).add_(self.shift)
+            features.copy_(self.model(batch).view(n, -1))
+        return features
+
+    def index(self, rows):
+        """
+        Row indices as a long tensor on the device (view of the index buffer).
+        """
+        n = len(rows)
+        self.reserve(n)
+        self._index_np[:n] = rows
+        if self._index is not self._index_host:
+            # Blocking: the host buffer is rewritten by the next call
+            self._index[:n].copy_(self._index_host[:n])
+        return self._index[:n]
+
+    def gather(self, source, index):
+        """
+        source[index] written into the gather buffer.
+        """
+        gathered = self._gathered[:index.numel()]
+        with torch.inference_mode():
+            torch.index_select(source, 0, index, out=gathered)
+        return gathered
+
+    def stats(self):
+        return {"device": str(self.device), "capacity": self.capacity, "reallocations": self.reallocations}
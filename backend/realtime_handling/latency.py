@@ -0,0 +1,107 @@
+import threading
+
+# Histogram bucket upper bounds in milliseconds: 1 ms .. ~60 s, about 12% apart
+BUCKET_BOUNDS_MS = [round(1.125 ** k, 2) for k in range(0, 95)]
+
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced latency histogram (constant memory, O(log n) per sample).
+    Percentiles are interpolated inside a bucket, so they are precise to ~12%.
+    """
+    def __init__(self, bounds_ms=BUCKET_BOUNDS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)  # last bucket: above the largest bound
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms):
+        value_ms = max(value_ms, 0.0)
+        lo, hi = 0, len(self.bounds_ms)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.bounds_ms[mid] < value_ms:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.counts[lo] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, q):
+        if self.count == 0:
+            return None
+        target = q / 100 * self.count
+        seen = 0
+        for k, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                lower = self.bounds_ms[k - 1] if k > 0 else 0.0
+                upper = self.bounds_ms[k] if k < len(self.bounds_ms) else self.max_ms
+                return min(lower + (upper - lower) * (target - seen) / n, self.max_ms)
+            seen += n
+        return self.max_ms
+
+    def stats(self):
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1),
+            "p50_ms": round(self.percentile(50), 1),
+            "p90_ms": round(self.percentile(90), 1),
+            "p99_ms": round(self.percentile(99), 1),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+# Stages between the watermarks carried by a realtime result
+STAGES = {
+    "queue": ("captureTs", "inferenceStartTs"),         # frame waiting for a tick (+ sampling)
+    "backbone": ("inferenceStartTs", "backboneEndTs"),  # preprocessing + ResNet50
+    "tsm": ("backboneEndTs", "inferenceEndTs"),         # streaming TSM head
+    "emit": ("inferenceEndTs", "emitTs"),               # result building, events, serialization
+    "glass_to_result": ("captureTs", "emitTs"),         # end to end
+}
+
+
+class LatencyMonitor:
+    """
+    Per-camera latency histograms built from the timestamps of realtime results.
+
+    A camera is only measured on the ticks where it was scored on a new frame
+    (its captureTs changed): between samples its probability is just repeated,
+    and how often that happens is the sampling scheduler's business.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self._last_capture = {}
+
+    def observe(self, result):
+        timing = result.get("timing", {})
+        with self._lock:
+            present = {camera["cameraId"] for camera in result["cameras"]}
+            for camera_id in [cid for cid in self.histograms if cid not in present]:
+                del self.histograms[camera_id]
+                self._last_capture.pop(camera_id, None)
+
+            for camera in result["cameras"]:
+                camera_id = camera["cameraId"]
+                capture_ts = camera.get("captureTs")
+                if capture_ts is None or self._last_capture.get(camera_id) == capture_ts:
+                    continue
+                self._last_capture[camera_id] = capture_ts
+                stamps = dict(timing, captureTs=capture_ts)
+                histograms = self.histograms.setdefault(camera_id, {s: LatencyHistogram() for s in STAGES})
+                for stage, (start, end) in STAGES.items():
+                    if stamps.get(start) is not None and stamps.get(end) is not None:
+                        histograms[stage].observe((stamps[end] - stamps[start]) * 1000)
+
+    def stats(self):
+        with self._lock:
+            return {
+                camera_id: {stage: h.stats() for stage, h in histograms.items()}
+                for camera_id, histograms in self.histograms.items()
+            }
@@ -0,0 +1,100 @@
+import cv2
+
+
+def downsample_gray(frame, size=(32, 32)):
+    """
+    Shrink a BGR frame to a tiny grayscale thumbnail for cheap motion checks.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def frame_difference_energy(prev_small, small):
+    """
+    Mean absolute difference (0 - 255) between two thumbnails from downsample_gray.
+    """
+    if prev_small is None or prev_small.shape != small.shape:
+        return float("inf")
+    return float(cv2.absdiff(prev_small, small).mean())
+
+
+class MotionGate:
+    """
+    Cheap per-camera gate in front of the backbone.
+
+    Each frame is reduced to a tiny grayscale thumbnail. If it barely differs
+    from the thumbnail of the last frame that went through ResNet50, the camera's
+    previous feature vector can be reused instead of running the backbone.
+    A camera is forced through the backbone after max_reuse consecutive hits so
+    slow changes (lighting, someone standing still) are not missed forever.
+
+    Args:
+        threshold (float): frame difference energy (0 - 255) below which a frame is static
+        max_reuse (int): maximum consecutive reuses of the same feature
+        size (tuple): thumbnail size
+    """
+    def __init__(self, threshold=2.0, max_reuse=30, size=(32, 32)):
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.size = size
+        self.cameras = []
+
+    def add_camera(self):
+        self.cameras.append(self._new_camera())
+
+    def remove_camera(self, index):
+        del self.cameras[index]
+
+    def reset(self, index):
+        self.cameras[index] = self._new_camera()
+
+    @staticmethod
+    def _new_camera():
+        return {"current": None, "reference": None,
+                "reuse_streak": 0, "checks": 0, "hits": 0}
+
+    def observe(self, index, frame):
+        """
+        Register the newest frame of a camera.
+
+        Returns:
+            float: frame difference energy against the previous observed frame (inf for the first one)
+        """
+        cam = self.cameras[index]
+        small = downsample_gray(frame, self.size)
+        motion = frame_difference_energy(cam["current"], small)
+        cam["current"] = small
+        return motion
+
+    def is_static(self, index):
+        """
+        True when the last observed frame can reuse the previous feature vector.
+        """
+        cam = self.cameras[index]
+        cam["checks"] += 1
+        score = frame_difference_energy(cam["reference"], cam["current"])
+        if score < self.threshold and cam["reuse_streak"] < self.max_reuse:
+            cam["reuse_streak"] += 1
+            cam["hits"] += 1
+            return True
+        return False
+
+    def mark_computed(self, index):
+        """
+        The last observed frame went through the backbone: it becomes the new reference.
+        """
+        cam = self.cameras[index]
+        cam["reference"] = cam["current"]
+        cam["reuse_streak"] = 0
+
+    def stats(self, camera_ids=None):
+        camera_ids = camera_ids or [i + 1 for i in range(len(self.cameras))]
+        return [
+            {
+                "cameraId": camera_ids[i],
+                "checks": cam["checks"],
+                "hits": cam["hits"],
+                "hit_rate": round(cam["hits"] / cam["checks"], 3) if cam["checks"] else 0.0,
+            }
+            for i, cam in enumerate(self.cameras)
+        ]
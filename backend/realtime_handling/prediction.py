@@ -16,17 +16,13 @@ def predict_realtime(tsm_model, feature_stack, device='cuda'):
     
     Args:
         tsm_model (torch.nn.Module): Initialized TSM model
-        feature_stack (torch.Tensor): Tensor of shape (num_cameras, feature_dim)
+        feature_stack (torch.Tensor): Tensor of shape (num_cameras, feature_dim) or
+            (num_cameras, T, feature_dim) when a temporal window is available
         device (str): 'cuda' or 'cpu'
         
     Returns:
         dict: Dictionary in JSON format with per-camera probabilities
     """
-    global global_counter
-    global_counter += 1
-
-    vn_time = datetime.now(timezone(timedelta(hours=7)))
-
     # Move features to device
     feature_stack = feature_stack.to(device)
 
@@ -43,6 +39,41 @@ def predict_realtime(tsm_model, feature_stack, device='cuda'):
 
         outputs = tsm_model(feature_stack)  # (num_cameras, num_classes) or (num_cameras, 1)
 
+    return build_realtime_result(outputs)
+
+
+def predict_realtime_step(tsm_model, new_features, stream_state, rows=None, device='cuda', camera_ids=None):
+    """
+    Streaming variant of predict_realtime: push only the newest feature of each
+    camera into the cached TSM state and score every camera's window in O(1) of T.
+
+    Args:
+        tsm_model (torch.nn.Module): Initialized TSM model
+        new_features (torch.Tensor): Tensor of shape (len(rows), feature_dim)
+        stream_state (TSMStreamState): State from tsm_model.init_stream_state(num_cameras)
+        rows (list[int], optional): Cameras that produced a new feature. None = all.
+        device (str): 'cuda' or 'cpu'
+        camera_ids (list[int], optional): cameraId of each row. None = 1..num_cameras
+
+    Returns:
+        tuple: (result dict like predict_realtime, updated stream_state)
+    """
+    tsm_model.eval()
+    with torch.inference_mode():
+        outputs, stream_state = tsm_model.step(new_features.to(device), stream_state, rows=rows)
+    return build_realtime_result(outputs, camera_ids), stream_state
+
+
+def build_realtime_result(outputs, camera_ids=None):
+    """
+    Convert TSM logits (num_cameras, num_classes) into the realtime JSON result.
+    """
+    global global_counter
+    global_counter += 1
+
+    vn_time = datetime.now(timezone(timedelta(hours=7)))
+
+    with torch.no_grad():
         # Convert logits to probabilities
         if outputs.shape[-1] == 1:
             probs = torch.sigmoid(outputs).squeeze() * 100  # probability in percentage
@@ -53,8 +84,9 @@ def predict_realtime(tsm_model, feature_stack, device='cuda'):
         probs = probs.cpu().int().tolist()
 
     # Build list of cameras
+    camera_ids = camera_ids or [i + 1 for i in range(len(probs))]
     cameras_list = [
-        {"cameraId": i + 1, "probability": probs[i]}
+        {"cameraId": camera_ids[i], "probability": probs[i]}
         for i in range(len(probs))
     ]
 
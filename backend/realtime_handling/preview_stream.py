@@ -0,0 +1,140 @@
+import asyncio
+
+import cv2
+import numpy as np
+
+from realtime_handling.broadcast import BroadcastHub
+from realtime_handling.connect_phone_cam import jpeg_size, REDUCED_DECODE_FLAGS
+
+BOUNDARY = "frame"
+
+
+def encode_preview(frame, max_width=640, quality=70):
+    """
+    Downscale a BGR frame to at most max_width (keeping the aspect ratio) and JPEG-encode it.
+    """
+    height, width = frame.shape[:2]
+    if width > max_width:
+        frame = cv2.resize(frame, (max_width, round(height * max_width / width)), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes() if ok else None
+
+
+def reencode_jpeg(jpeg, max_width=640, quality=70):
+    """
+    Source JPEG to preview JPEG. Small enough sources are passed through untouched,
+    larger ones are decoded with DCT scaling close to max_width before encoding.
+    """
+    size = jpeg_size(jpeg)
+    if size is not None and size[0] <= max_width:
+        return jpeg
+    flag = cv2.IMREAD_COLOR
+    if size is not None:
+        for scale, reduced_flag in REDUCED_DECODE_FLAGS:
+            if size[0] // scale >= max_width:
+                flag = reduced_flag
+                break
+    frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), flag)
+    return encode_preview(frame, max_width, quality) if frame is not None else None
+
+
+class _CameraPreview:
+    """
+    One preview encoder per camera, running only while somebody watches.
+    Encoded JPEGs go through a BroadcastHub, so every viewer gets the same bytes
+    and slow viewers skip frames instead of slowing the encoder down.
+    """
+    def __init__(self):
+        self.hub = BroadcastHub()
+        self.task = None
+        self.encoded_frames = 0
+
+
+class PreviewHub:
+    """
+    Re-serves cameras as MJPEG from the frames their capture workers already
+    decoded, so the browser never opens its own connection to a phone: each
+    source is pulled once by the backend, and each preview frame is encoded once
+    no matter how many viewers there are.
+
+    Args:
+        get_worker (callable): camera_id -> capture worker, or None if the camera is gone
+        on_watch (callable, optional): (camera_id, watched) called in a thread when a camera gets
+            its first viewer / loses its last one (used to resume on_demand cameras)
+        max_width (int): preview width (height follows the source aspect ratio)
+        fps (float): preview frame rate
+    """
+    def __init__(self, get_worker, on_watch=None, max_width=640, fps=10.0, quality=70):
+        self.get_worker = get_worker
+        self.on_watch = on_watch
+        self.max_width = max_width
+        self.fps = fps
+        self.quality = quality
+        self._previews = {}
+
+    def _encode_latest(self, worker, last_ts):
+        """
+        Returns:
+            tuple: (jpeg bytes or None if there is no newer frame, capture_ts)
+        """
+        peek_jpeg = getattr(worker, "peek_latest_jpeg", None)
+        jpeg, capture_ts = peek_jpeg() if peek_jpeg is not None else (None, None)
+        if jpeg is not None:
+            if capture_ts == last_ts:
+                return None, last_ts
+            return reencode_jpeg(jpeg, self.max_width, self.quality), capture_ts
+
+        # No JPEG from the worker (yet): encode its decoded frame
+        frame, capture_ts = worker.peek_latest()
+        if frame is None or capture_ts == last_ts:
+            return None, last_ts
+        return encode_preview(frame, self.max_width, self.quality), capture_ts
+
+    async def _run(self, camera_id, preview):
+        loop = asyncio.get_running_loop()
+        last_ts = None
+        if self.on_watch is not None:
+            await loop.run_in_executor(None, self.on_watch, camera_id, True)
+        try:
+            while preview.hub.subscriber_count > 0:
+                worker = self.get_worker(camera_id)
+                if worker is None:
+                    preview.hub.publish(None)  # camera removed: end every viewer's stream
+                    break
+                # cv2 releases the GIL while encoding: keep it off the event loop
+                jpeg, last_ts = await loop.run_in_executor(None, self._encode_latest, worker, last_ts)
+                if jpeg is not None:
+                    preview.encoded_frames += 1
+                    preview.hub.publish(jpeg)
+                    await asyncio.sleep(1.0 / self.fps)
+                else:
+                    # Nothing new yet (e.g. a camera that is just resuming): poll again soon
+                    await asyncio.sleep(min(1.0 / self.fps, 0.02))
+        finally:
+            preview.task = None
+            if self.on_watch is not None:
+                # Stopping a worker joins its thread: do not wait for it here
+                loop.run_in_executor(None, self.on_watch, camera_id, False)
+
+    async def stream(self, camera_id):
+        """
+        Async generator of multipart MJPEG chunks for one viewer.
+        """
+        preview = self._previews.setdefault(camera_id, _CameraPreview())
+        if preview.task is None:
+            # Starts running after this viewer subscribed below
+            preview.task = asyncio.create_task(self._run(camera_id, preview))
+        async for jpeg in preview.hub.subscribe(send_latest=False):
+            if jpeg is None:
+                return
+            yield (
+                f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                + jpeg + b"\r\n"
+            )
+
+    def stats(self):
+        return {
+            camera_id: {"viewers": p.hub.subscriber_count, "encoded_frames": p.encoded_frames,
+                        "skipped_frames": p.hub.skipped_updates}
+            for camera_id, p in self._previews.items()
+        }
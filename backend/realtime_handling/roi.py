@@ -0,0 +1,71 @@
+# Regions of interest: rectangles of a camera frame scored on their own.
+#
+# A ROI is {"name": str, "x": float, "y": float, "w": float, "h": float} with
+# coordinates as fractions of the frame (0 - 1), so it does not depend on the
+# resolution a capture worker decodes at. A camera without ROIs is scored on
+# its full frame, as one implicit ROI.
+
+import re
+
+# Capture output size (width, height) of cameras with ROIs: crops are cut from
+# this frame instead of the 224x224 squash, so a small region keeps its detail
+ROI_FRAME_SIZE = (960, 540)
+MAX_ROIS_PER_CAMERA = 8
+
+
+def normalize_rois(rois):
+    """
+    Validate a ROI list and fill in default names.
+
+    Returns:
+        list[dict]: ROIs with float coordinates clipped to the frame
+
+    Raises:
+        ValueError: malformed, empty or too many rectangles
+    """
+    if not rois:
+        return []
+    if len(rois) > MAX_ROIS_PER_CAMERA:
+        raise ValueError(f"At most {MAX_ROIS_PER_CAMERA} ROIs per camera")
+    normalized = []
+    for k, roi in enumerate(rois):
+        try:
+            x, y, w, h = (float(roi[key]) for key in ("x", "y", "w", "h"))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"ROI {k} needs numeric x, y, w, h")
+        x, y = min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+        w, h = min(w, 1.0 - x), min(h, 1.0 - y)
+        if w <= 0 or h <= 0:
+            raise ValueError(f"ROI {k} is empty")
+        normalized.append({"name": str(roi.get("name") or f"roi{k + 1}"), "x": x, "y": y, "w": w, "h": h})
+    # Names also key the ROI's feature log directory: they must differ once reduced to a slug
+    slugs = [roi_slug(roi["name"]) for roi in normalized]
+    if len(set(slugs)) != len(slugs):
+        raise ValueError("ROI names must be unique per camera (characters other than A-Z, a-z, 0-9, _ and - "
+                         "count as '_')")
+    return normalized
+
+
+def roi_slug(name):
+    """File-system safe form of a ROI name."""
+    return re.sub(r"[^A-Za-z0-9_-]", "_", name)
+
+
+def roi_rect(roi):
+    """Hashable (x, y, w, h) of a ROI, None for the full frame."""
+    if roi is None:
+        return None
+    return roi["x"], roi["y"], roi["w"], roi["h"]
+
+
+def crop_roi(frame, rect):
+    """
+    View of the frame inside rect (no copy). rect None = the whole frame.
+    """
+    if rect is None:
+        return frame
+    height, width = frame.shape[:2]
+    x, y, w, h = rect
+    x0, y0 = int(x * width), int(y * height)
+    x1, y1 = max(int(round((x + w) * width)), x0 + 1), max(int(round((y + h) * height)), y0 + 1)
+    return frame[y0:y1, x0:x1]
@@ -0,0 +1,153 @@
+import time
+
+
+class _CameraSchedule:
+    def __init__(self, priority=1.0):
+        self.priority = priority
+        self.probability = 0.0  # EMA of violence probability (0 - 1)
+        self.motion = 0.0       # EMA of normalized motion level (0 - 1)
+        self.rate = 0.0         # assigned sampling rate (frames/sec)
+        self.next_due = 0.0
+        self.sampled_frames = 0
+
+
+class AdaptiveSamplingScheduler:
+    """
+    Assign each camera a sampling rate from its recent violence probability,
+    its motion level and a configured priority, within a global inference budget.
+
+    Every camera gets at least min_rate (budget permitting). The rest of the
+    budget goes to the most active cameras, weighted by priority, up to max_rate.
+    Quiet cameras therefore fall back to min_rate while hot cameras go to max_rate.
+
+    Args:
+        budget_fps (float): total backbone frames/sec shared by all cameras
+        min_rate (float): rate of a completely quiet camera
+        max_rate (float): rate of a fully active camera
+        motion_full_scale (float): frame difference energy treated as full motion
+        smoothing (float): EMA factor for probability and motion (0 - 1, higher = faster)
+    """
+    def __init__(self, budget_fps=8.0, min_rate=0.2, max_rate=5.0, motion_full_scale=12.0, smoothing=0.5):
+        self.budget_fps = budget_fps
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.motion_full_scale = motion_full_scale
+        self.smoothing = smoothing
+        self.cameras = []
+
+    def add_camera(self, priority=1.0):
+        self.cameras.append(_CameraSchedule(float(priority)))
+
+    def remove_camera(self, index):
+        del self.cameras[index]
+
+    def set_priority(self, index, priority):
+        self.cameras[index].priority = float(priority)
+
+    def reset(self, index):
+        self.cameras[index] = _CameraSchedule(self.cameras[index].priority)
+
+    def update(self, index, probability=None, motion=None):
+        """
+        Feed the latest observations of one camera.
+
+        Args:
+            probability (float, optional): violence probability in percent (0 - 100)
+            motion (float, optional): frame difference energy from motion.frame_difference_energy
+        """
+        cam = self.cameras[index]
+        a = self.smoothing
+        if probability is not None:
+            cam.probability = (1 - a) * cam.probability + a * min(max(probability / 100.0, 0.0), 1.0)
+        if motion is not None:
+            level = min(motion / self.motion_full_scale, 1.0)
+            cam.motion = (1 - a) * cam.motion + a * level
+
+    def activity(self, index):
+        cam = self.cameras[index]
+        return max(cam.probability, cam.motion)
+
+    def allocate(self, candidates=None):
+        """
+        Recompute the sampling rate of every camera. Only candidates share the
+        budget: the others (suspended, connecting, dead) get rate 0.
+
+        Args:
+            candidates (list[int], optional): cameras that can be sampled. None = all.
+
+        Returns:
+            list[float]: frames/sec per camera
+        """
+        rates = [0.0] * len(self.cameras)
+        candidates = range(len(self.cameras)) if candidates is None else list(candidates)
+        n = len(candidates)
+        if n == 0:
+            for cam in self.cameras:
+                cam.rate = 0.0
+            return rates
+
+        base = min(self.min_rate, self.budget_fps / n)
+        desired = {i: base + (self.max_rate - base) * self.activity(i) for i in candidates}
+        if sum(desired.values()) <= self.budget_fps:
+            rates = [desired.get(i, 0.0) for i in range(len(self.cameras))]
+        else:
+            # Water-filling: share the budget above the floor by priority * activity
+            for i in candidates:
+                rates[i] = base
+            remaining = self.budget_fps - base * n
+            open_idx = [i for i in candidates if desired[i] > base]
+            while remaining > 1e-6 and open_idx:
+                weights = {i: self.cameras[i].priority * max(self.activity(i), 1e-3) for i in open_idx}
+                total = sum(weights.values())
+                if total <= 0:
+                    break
+                spent = 0.0
+                for i in open_idx:
+                    extra = min(remaining * weights[i] / total, desired[i] - rates[i])
+                    rates[i] += extra
+                    spent += extra
+                remaining -= spent
+                open_idx = [i for i in open_idx if desired[i] - rates[i] > 1e-6]
+
+        for cam, rate in zip(self.cameras, rates):
+            cam.rate = rate
+        return rates
+
+    def due(self, candidates=None, now=None):
+        """
+        Return the cameras that should be sampled now and book their next slot.
+
+        Args:
+            candidates (list[int], optional): cameras that currently have a frame. None = all.
+            now (float, optional): current time.monotonic()
+        """
+        now = time.monotonic() if now is None else now
+        if candidates is None:
+            candidates = range(len(self.cameras))
+        self.allocate(candidates)
+
+        selected = []
+        for i in candidates:
+            cam = self.cameras[i]
+            if cam.rate <= 0 or now < cam.next_due:
+                continue
+            period = 1.0 / cam.rate
+            # Never build up a burst of missed slots
+            cam.next_due = cam.next_due + period if now - cam.next_due < period else now + period
+            cam.sampled_frames += 1
+            selected.append(i)
+        return selected
+
+    def stats(self, camera_ids=None):
+        camera_ids = camera_ids or [i + 1 for i in range(len(self.cameras))]
+        return [
+            {
+                "cameraId": camera_ids[i],
+                "priority": cam.priority,
+                "rate": round(cam.rate, 3),
+                "probability": round(cam.probability, 3),
+                "motion": round(cam.motion, 3),
+                "sampled_frames": cam.sampled_frames,
+            }
+            for i, cam in enumerate(self.cameras)
+        ]
@@ -0,0 +1,286 @@
+import os
+import time
+import queue
+import uuid
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from realtime_handling.connect_phone_cam import (
+    create_capture_worker, CONNECTING, LIVE, STALLED, BACKOFF, DEAD
+)
+
+STATE_CODES = [CONNECTING, LIVE, STALLED, BACKOFF, DEAD]
+
+# Header fields (int64) at the start of every shared block
+LATEST_SLOT, LATEST_SEQ, DECODED, STATE, RECONNECTS, CONNECT_FAILURES = range(6)
+HEADER_LEN = 8
+
+
+class SharedFrameRing:
+    """
+    Ring of num_slots fixed-size BGR frames in one multiprocessing.shared_memory block.
+
+    Layout: int64 header | int64 seq per slot | float64 capture_ts per slot | uint8 frames.
+    The writer (ingest process) resizes straight into the next slot, the reader
+    (inference process) gets a numpy view of the newest slot: no pickling, no copy.
+    A slot's seq is -1 while it is being written, so readers never take a torn frame.
+    """
+    def __init__(self, shape=(224, 224), num_slots=8, name=None, create=True):
+        self.height, self.width = shape
+        self.num_slots = num_slots
+        frame_bytes = self.height * self.width * 3
+        size = 8 * HEADER_LEN + 16 * num_slots + frame_bytes * num_slots
+
+        # Ingest processes are spawned and share the parent's resource tracker,
+        # so attaching here does not make the block disappear when a child exits
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self.shm.name
+
+        buf = self.shm.buf
+        offset = 0
+        self.header = np.ndarray((HEADER_LEN,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * HEADER_LEN
+        self.slot_seq = np.ndarray((num_slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * num_slots
+        self.slot_ts = np.ndarray((num_slots,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += 8 * num_slots
+        self.frames = np.ndarray((num_slots, self.height, self.width, 3), dtype=np.uint8, buffer=buf, offset=offset)
+
+        if create:
+            self.header[:] = 0
+            self.header[LATEST_SLOT] = -1
+            self.slot_seq[:] = 0
+
+    # ---- writer side (ingest process) ----
+    def write(self, frame, capture_ts):
+        seq = int(self.header[LATEST_SEQ]) + 1
+        slot = seq % self.num_slots
+        self.slot_seq[slot] = -1
+        target = self.frames[slot]
+        if frame.shape[:2] != (self.height, self.width):
+            cv2.resize(frame, (self.width, self.height), dst=target, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(target, frame)
+        self.slot_ts[slot] = capture_ts
+        self.slot_seq[slot] = seq
+        self.header[LATEST_SLOT] = slot
+        self.header[LATEST_SEQ] = seq
+        self.header[DECODED] += 1
+
+    def publish_health(self, worker):
+        stats = worker.stats()
+        self.header[STATE] = STATE_CODES.index(stats["state"])
+        self.header[RECONNECTS] = stats["reconnects"]
+        self.header[CONNECT_FAILURES] = stats["connect_failures"]
+
+    # ---- reader side (inference process) ----
+    def read_latest(self):
+        """
+        Returns:
+            tuple: (frame view, capture_ts, seq), or (None, None, 0) if no complete frame yet
+        """
+        slot = int(self.header[LATEST_SLOT])
+        if slot < 0:
+            return None, None, 0
+        seq = int(self.slot_seq[slot])
+        if seq <= 0:
+            return None, None, 0
+        return self.frames[slot], float(self.slot_ts[slot]), seq
+
+    def close(self):
+        # Drop our numpy views first, the buffer can not be released while they exist
+        self.header = self.slot_seq = self.slot_ts = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A consumer still holds a frame view; the mapping goes away with it
+            pass
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _ingest_process_main(commands, stop_event):
+    """
+    Body of one ingest process: hosts capture workers for several cameras and
+    writes their frames into the shared rings it was told about.
+    """
+    cameras = {}
+    while not stop_event.is_set():
+        try:
+            command = commands.get(timeout=0.2)
+        except queue.Empty:
+            command = None
+
+        if command is not None:
+            op, key = command[0], command[1]
+            if op == "add":
+                url, backend, ring_name, shape, num_slots, worker_kwargs = command[2:]
+                ring = SharedFrameRing(shape, num_slots, name=ring_name, create=False)
+                worker = create_capture_worker(url, backend=backend, on_frame=ring.write, **worker_kwargs)
+                cameras[key] = (worker.start(), ring)
+            elif op == "remove" and key in cameras:
+                worker, ring = cameras.pop(key)
+                worker.stop()
+                ring.close()
+
+        for worker, ring in cameras.values():
+            ring.publish_health(worker)
+
+    for worker, ring in cameras.values():
+        worker.stop()
+        ring.close()
+
+
+class ProcessIngestPool:
+    """
+    Pool of ingest processes. Each camera is placed on the least loaded process,
+    so decode and resize scale across cores instead of sharing one GIL.
+    """
+    def __init__(self, num_processes=None):
+        self.num_processes = num_processes or max(1, (os.cpu_count() or 2) // 2)
+        self._ctx = mp.get_context("spawn")  # never fork a process that already runs torch / capture threads
+        self._lock = threading.Lock()
+        self._processes = []
+        self._loads = []
+
+    def _ensure_started(self):
+        if self._processes:
+            return
+        for _ in range(self.num_processes):
+            commands = self._ctx.Queue()
+            stop_event = self._ctx.Event()
+            proc = self._ctx.Process(target=_ingest_process_main, args=(commands, stop_event), daemon=True)
+            proc.start()
+            self._processes.append((proc, commands, stop_event))
+            self._loads.append(0)
+        print(f"[INFO] Started {self.num_processes} ingest processes")
+
+    def add_camera(self, key, camera_url, backend, ring, worker_kwargs):
+        with self._lock:
+            self._ensure_started()
+            index = self._loads.index(min(self._loads))
+            self._loads[index] += 1
+            shape = (ring.height, ring.width)
+            self._processes[index][1].put(("add", key, camera_url, backend, ring.name, shape, ring.num_slots, worker_kwargs))
+            return index
+
+    def remove_camera(self, index, key):
+        with self._lock:
+            self._loads[index] -= 1
+            self._processes[index][1].put(("remove", key))
+
+    def shutdown(self, timeout=2.0):
+        with self._lock:
+            for proc, _, stop_event in self._processes:
+                stop_event.set()
+            for proc, _, _ in self._processes:
+                proc.join(timeout=timeout)
+                if proc.is_alive():
+                    proc.terminate()
+            self._processes, self._loads = [], []
+
+
+_default_pool = None
+
+def get_ingest_pool():
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = ProcessIngestPool()
+    return _default_pool
+
+
+class ProcessCaptureWorker:
+    """
+    Drop-in replacement for CameraCaptureWorker whose decoding and resizing run in
+    an ingest pool process. Frames arrive through a SharedFrameRing already at
+    frame_shape, and read_latest() returns a zero-copy view of the newest slot,
+    valid until num_slots - 1 newer frames were written.
+    """
+    def __init__(self, camera_url, backend="opencv", pool=None, frame_shape=(224, 224), num_slots=8,
+                 max_frame_age=2.0, stall_timeout=3.0, **worker_kwargs):
+        self.camera_url = camera_url
+        self.backend = backend
+        self.pool = pool
+        self.frame_shape = frame_shape
+        self.num_slots = num_slots
+        self.max_frame_age = max_frame_age
+        self.stall_timeout = stall_timeout
+        self.worker_kwargs = dict(worker_kwargs, max_frame_age=max_frame_age, stall_timeout=stall_timeout)
+
+        self.ring = None
+        self._key = uuid.uuid4().hex
+        self._process_index = None
+        self._consumed_seq = 0
+        self.dropped_frames = 0
+        self.stale_reads = 0
+
+    def start(self):
+        if self.ring is not None:
+            return self
+        self.pool = self.pool or get_ingest_pool()
+        self.ring = SharedFrameRing(self.frame_shape, self.num_slots, create=True)
+        self._process_index = self.pool.add_camera(self._key, self.camera_url, self.backend,
+                                                   self.ring, self.worker_kwargs)
+        return self
+
+    def stop(self, timeout=2.0):
+        if self.ring is None:
+            return
+        self.pool.remove_camera(self._process_index, self._key)
+        ring, self.ring = self.ring, None
+        ring.close()
+        ring.unlink()
+
+    @property
+    def state(self):
+        if self.ring is None:
+            return DEAD
+        state = STATE_CODES[int(self.ring.header[STATE])]
+        _, capture_ts, _ = self.ring.read_latest()
+        if state == LIVE and (capture_ts is None or time.time() - capture_ts > self.stall_timeout):
+            return STALLED
+        return state
+
+    def is_live(self):
+        return self.state == LIVE
+
+    def read_latest(self):
+        if self.ring is None:
+            return None, None
+        frame, capture_ts, seq = self.ring.read_latest()
+        if frame is None:
+            return None, None
+        if time.time() - capture_ts > self.max_frame_age:
+            self.stale_reads += 1
+            return None, None
+        if self._consumed_seq and seq - self._consumed_seq > 1:
+            self.dropped_frames += seq - self._consumed_seq - 1
+        self._consumed_seq = seq
+        return frame, capture_ts
+
+    def peek_latest(self):
+        if self.ring is None:
+            return None, None
+        frame, capture_ts, _ = self.ring.read_latest()
+        return frame, capture_ts
+
+    def stats(self):
+        header = self.ring.header if self.ring is not None else np.zeros(HEADER_LEN, dtype=np.int64)
+        _, capture_ts, _ = self.ring.read_latest() if self.ring is not None else (None, None, 0)
+        return {
+            "url": self.camera_url,
+            "backend": self.backend,
+            "ingest": "process",
+            "state": self.state,
+            "decoded_frames": int(header[DECODED]),
+            "dropped_frames": self.dropped_frames,
+            "stale_reads": self.stale_reads,
+            "reconnects": int(header[RECONNECTS]),
+            "connect_failures": int(header[CONNECT_FAILURES]),
+            "last_capture_ts": capture_ts,
+        }
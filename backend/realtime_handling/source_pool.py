@@ -0,0 +1,65 @@
+class SharedSource:
+    """
+    One physical stream (url + backend, decoded at frame_size) and the logical cameras reading it.
+    """
+    def __init__(self, camera_url, backend, frame_size=None):
+        self.camera_url = camera_url
+        self.backend = backend
+        self.frame_size = frame_size  # (width, height), None = the backend's default
+        self.camera_ids = []
+        self.worker = None
+
+
+class SourcePool:
+    """
+    Deduplicates physical sources: logical cameras with the same URL, backend and
+    decode size share one capture worker (one connection, one decoder, one frame buffer).
+
+    The worker is created for the first camera of a source and stopped when
+    the last one is released.
+
+    Args:
+        create_worker (callable): SharedSource -> started capture worker
+    """
+    def __init__(self, create_worker):
+        self.create_worker = create_worker
+        self.sources = {}
+
+    def acquire(self, camera_id, camera_url, backend, frame_size=None):
+        """
+        Returns:
+            capture worker serving camera_id (shared if the source is already open)
+        """
+        key = (camera_url, backend, frame_size)
+        source = self.sources.get(key)
+        if source is None:
+            source = self.sources[key] = SharedSource(camera_url, backend, frame_size)
+            source.camera_ids.append(camera_id)
+            source.worker = self.create_worker(source)
+        else:
+            source.camera_ids.append(camera_id)
+        return source.worker
+
+    def _find(self, worker):
+        for key, source in self.sources.items():
+            if source.worker is worker:
+                return key, source
+        return None, None
+
+    def release(self, camera_id, worker):
+        """
+        Returns:
+            the worker to stop if camera_id was the source's last camera, else None
+        """
+        key, source = self._find(worker)
+        if source is None or camera_id not in source.camera_ids:
+            return None
+        source.camera_ids.remove(camera_id)
+        if source.camera_ids:
+            return None
+        del self.sources[key]
+        return source.worker
+
+    def shared_with(self, worker):
+        _, source = self._find(worker)
+        return list(source.camera_ids) if source is not None else []
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+
+from realtime_handling import connect_phone_cam
+from realtime_handling.connect_phone_cam import FFmpegPipeCaptureWorker, LIVE
+
+WIDTH, HEIGHT = 8, 4
+
+# Stand-in for ffmpeg: writes a few frames, then goes silent like a dead network source
+SILENT_SOURCE = f"""#!{sys.executable}
+import sys, time
+for k in range(3):
+    sys.stdout.buffer.write(bytes([k]) * {WIDTH * HEIGHT * 3})
+    sys.stdout.flush()
+time.sleep(60)
+"""
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_silent_ffmpeg_source_is_restarted(tmp_path, monkeypatch):
+    """
+    A source that stops sending must not block the worker: ffmpeg is killed after
+    stall_timeout, the stream is reopened, and stop() returns right away.
+    """
+    fake = tmp_path / "ffmpeg"
+    fake.write_text(SILENT_SOURCE)
+    os.chmod(fake, 0o755)
+    monkeypatch.setattr(connect_phone_cam, "ffmpeg_path", str(fake))
+
+    published = []
+    worker = FFmpegPipeCaptureWorker("http://silent", width=WIDTH, height=HEIGHT, stall_timeout=0.3,
+                                     backoff_initial=0.05, on_frame=lambda frame, ts: published.append(frame))
+    worker.start()
+    try:
+        assert wait_for(lambda: worker.state == LIVE)
+        assert wait_for(lambda: worker.reconnects >= 1)
+        # Every published frame is its own array, still holding its own content
+        assert [int(f[0, 0, 0]) for f in published[:3]] == [0, 1, 2]
+    finally:
+        started = time.time()
+        proc = worker._proc
+        worker.stop()
+        assert time.time() - started < 1.0
+        assert proc is None or proc.poll() is not None
+
+
+def test_ffmpeg_display_jpegs_are_kept_apart_from_backbone_frames(tmp_path, monkeypatch):
+    """
+    With display_width, the JPEGs ffmpeg writes on its second pipe reach on_jpeg
+    and peek_latest_jpeg() whole, next to the small rawvideo frames.
+    """
+    jpeg = b"\xff\xd8" + b"display" * 50 + b"\xff\xd9"
+    fake = tmp_path / "ffmpeg"
+    fake.write_text(f"""#!{sys.executable}
+import os, sys, time
+display_fd = int(sys.argv[-1].split(":")[1])
+for k in range(3):
+    sys.stdout.buffer.write(bytes([k]) * {WIDTH * HEIGHT * 3})
+    sys.stdout.flush()
+    os.write(display_fd, {jpeg!r})
+time.sleep(60)
+""")
+    os.chmod(fake, 0o755)
+    monkeypatch.setattr(connect_phone_cam, "ffmpeg_path", str(fake))
+
+    received = []
+    worker = FFmpegPipeCaptureWorker("http://display", width=WIDTH, height=HEIGHT, display_width=640,
+                                     on_jpeg=lambda data, ts: received.append(data))
+    assert worker._command(display_fd=5)[-1] == "pipe:5"
+    worker.start()
+    try:
+        assert wait_for(lambda: len(received) == 3)
+        assert received == [jpeg] * 3
+        assert worker.peek_latest_jpeg()[0] == jpeg
+        assert worker.read_latest()[0].shape == (HEIGHT, WIDTH, 3)
+    finally:
+        worker.stop()
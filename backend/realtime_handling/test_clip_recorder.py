@@ -0,0 +1,37 @@
+import json
+import os
+
+from realtime_handling import clip_recorder as clip_recorder_module
+from realtime_handling.clip_recorder import ClipRecorder
+
+START = 1_000_000.0
+
+
+def test_clip_has_pre_and_post_frames(tmp_path, monkeypatch):
+    """
+    A clip holds the ring (pre_seconds) and the frames until post_seconds after the
+    incident ended, in order, although its file is written by another thread.
+    """
+    monkeypatch.setattr(clip_recorder_module, "ffmpeg_path", str(tmp_path / "no-ffmpeg"))
+    recorder = ClipRecorder(str(tmp_path), pre_seconds=2.0, post_seconds=1.0, clip_fps=10.0)
+    finalized = []
+    monkeypatch.setattr(recorder, "_finalize_async", lambda writer: finalized.append(writer))
+
+    def feed(start, count):
+        for k in range(count):
+            recorder.add_jpeg([1], b"\xff\xd8" + bytes([k % 256]) + b"\xff\xd9", start + k * 0.1)
+
+    feed(START, 30)  # 3 s, the ring keeps the last 2 s
+    recorder.process_events([{"type": "incident_start", "cameraId": 1, "incidentId": 4}], now=START + 3.0)
+    feed(START + 3.0, 10)
+    recorder.process_events([{"type": "incident_end", "cameraId": 1, "incidentId": 4}], now=START + 4.0)
+    feed(START + 4.0, 15)  # past stop_at: the capture side closes the clip
+
+    assert len(finalized) == 1
+    writer = finalized[0]
+    recorder._finalize(writer)
+    with open(writer.meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["timestamps"] == sorted(meta["timestamps"])
+    assert meta["timestamps"][0] >= START + 0.75 and meta["timestamps"][-1] >= START + 5.0
+    assert os.path.getsize(writer.mjpeg_path) == meta["bytes"] == 5 * meta["frames"]
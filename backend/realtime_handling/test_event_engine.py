@@ -0,0 +1,66 @@
+from realtime_handling.event_engine import ViolenceEventEngine, IDLE, ACTIVE
+
+START = 1_000_000.0
+
+
+def run(engine, levels, camera_id=1, step=0.5, start=START):
+    """Feed one probability per tick; returns the emitted events."""
+    events = []
+    for k, level in enumerate(levels):
+        result = {"cameras": [{"cameraId": camera_id, "probability": level, "status": "live"}]}
+        events += engine.process(result, now=start + k * step)
+    return events
+
+
+def make_engine(**kwargs):
+    # No smoothing, so levels reach the state machine as given
+    return ViolenceEventEngine(**{"enter_threshold": 70, "exit_threshold": 40, "min_duration": 2.0,
+                                  "merge_gap": 5.0, "median_window": 1, "ema_alpha": 1.0, **kwargs})
+
+
+def test_spike_then_middle_level_does_not_start():
+    """A level between the thresholds after one spike must not open an incident."""
+    engine = make_engine()
+    assert run(engine, [75] + [55] * 8) == []
+    assert engine.tracks[1].state == IDLE
+
+
+def test_min_duration():
+    engine = make_engine()
+    assert run(engine, [80] * 4) == []  # 1.5 s above enter_threshold
+    events = run(engine, [80], start=START + 2.0)
+    assert [e["type"] for e in events] == ["incident_start"]
+
+
+def test_hysteresis_keeps_incident_between_thresholds():
+    engine = make_engine()
+    events = run(engine, [80] * 5 + [55] * 40)
+    assert [e["type"] for e in events] == ["incident_start"]
+    assert engine.tracks[1].state == ACTIVE
+
+
+def test_merge_gap():
+    engine = make_engine()
+    # Drops below exit for 3 s (< merge_gap) and comes back: one incident
+    events = run(engine, [80] * 5 + [10] * 6 + [90] * 4)
+    assert [e["type"] for e in events] == ["incident_start"]
+    # Stays below exit for merge_gap: the incident ends, with the peak kept
+    events = run(engine, [10] * 12, start=START + 10)
+    assert [(e["type"], e["incidentId"], e["peakProbability"]) for e in events] == [("incident_end", 1, 90)]
+
+
+def test_removed_camera_closes_incident():
+    engine = make_engine()
+    run(engine, [80] * 5)
+    events = engine.process({"cameras": []}, now=START + 5)
+    assert [e["type"] for e in events] == ["incident_end"]
+
+
+def test_unscored_ticks_leave_the_state_alone():
+    """None (empty TSM window) is no evidence: it neither opens, ends nor smooths an incident."""
+    engine = make_engine()
+    assert run(engine, [None] * 10) == []
+    assert engine.tracks[1].state == IDLE
+    run(engine, [80] * 5)
+    assert run(engine, [None] * 30, start=START + 3) == []
+    assert engine.tracks[1].state == ACTIVE
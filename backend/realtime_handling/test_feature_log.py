@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pytest
+import torch
+
+import realtime_handling.feature_log as feature_log
+from realtime_handling.feature_log import FeatureLog
+from realtime_handling.roi import normalize_rois
+from tsm.tsm_class_definition import TSMFeatureModel
+
+FEATURE_DIM = 16
+N_SEGMENT = 4
+NUM_TICKS = 40
+
+
+def test_rescore_matches_streaming_step(tmp_path):
+    """
+    Features appended to the log and re-scored over a time range must give the
+    probabilities the streaming step produced live, across segment rotations.
+    """
+    torch.manual_seed(0)
+    model = TSMFeatureModel(feature_dim=FEATURE_DIM, num_classes=2, n_segment=N_SEGMENT).eval()
+    log = FeatureLog(str(tmp_path), feature_dim=FEATURE_DIM, dtype="float32", segment_bytes=400)
+    state = model.init_stream_state(1)
+
+    live = []
+    with torch.no_grad():
+        for tick in range(NUM_TICKS):
+            feature = torch.randn(1, FEATURE_DIM)
+            log.append([(3, None)], feature.numpy(), ts=1000.0 + tick)
+            logits, state = model.step(feature, state)
+            live.append(float(torch.softmax(logits, dim=-1)[0, 1] * 100))
+
+    result = log.rescore(model, 3, start=1010.0, end=1029.0)
+    assert result["records"] == 20
+    assert len({s.path for s in log._streams["cam3"].segments}) > 1
+    rescored = [p["probability"] for p in result["points"]]
+    assert np.allclose(rescored, np.round(live[10:30], 1), atol=0.11)
+
+    # A reopened log finds the same records
+    log.close()
+    assert len(FeatureLog(str(tmp_path), feature_dim=FEATURE_DIM, dtype="float32").read(3, 1000.0, 1039.0)) == NUM_TICKS
+
+
+@pytest.mark.parametrize("replay_block", [feature_log.REPLAY_BLOCK, 3])
+def test_rescore_restarts_at_live_resets(tmp_path, monkeypatch, replay_block):
+    """
+    Where the live window was emptied (source change, server restart), re-scoring
+    must restart its window at the same record instead of unfolding over the gap,
+    whatever the blocks the records are replayed in.
+    """
+    monkeypatch.setattr(feature_log, "REPLAY_BLOCK", replay_block)
+    torch.manual_seed(0)
+    model = TSMFeatureModel(feature_dim=FEATURE_DIM, num_classes=2, n_segment=N_SEGMENT).eval()
+    log = FeatureLog(str(tmp_path), feature_dim=FEATURE_DIM, dtype="float32")
+    state = model.init_stream_state(1)
+
+    live = []
+    with torch.no_grad():
+        for tick in range(NUM_TICKS):
+            if tick == 15:
+                state.reset([0])
+                log.mark_reset([(3, "door")])
+            elif tick == 25:
+                # Server restart: a new log, and a fresh live window
+                log.close()
+                log = FeatureLog(str(tmp_path), feature_dim=FEATURE_DIM, dtype="float32")
+                state = model.init_stream_state(1)
+            feature = torch.randn(1, FEATURE_DIM)
+            log.append([(3, "door")], feature.numpy(), ts=1000.0 + tick)
+            logits, state = model.step(feature, state)
+            live.append(float(torch.softmax(logits, dim=-1)[0, 1] * 100))
+
+    result = log.rescore(model, 3, start=1012.0, end=1039.0, roi="door")
+    rescored = [p["probability"] for p in result["points"]]
+    assert np.allclose(rescored, np.round(live[12:], 1), atol=0.11)
+
+
+def test_appends_are_buffered_but_readable(tmp_path):
+    log = FeatureLog(str(tmp_path), feature_dim=FEATURE_DIM, dtype="float32", flush_interval=3600)
+    for tick in range(5):
+        log.append([(1, None)], np.ones((1, FEATURE_DIM), dtype=np.float32), ts=1000.0 + tick)
+    segment = log._streams["cam1"].segments[-1].path
+    assert os.path.getsize(segment) < 5 * log.record_dtype.itemsize
+    # Reading flushes the stream first
+    assert len(log.read(1, 1000.0, 1004.0)) == 5
+
+
+def test_roi_names_must_map_to_distinct_streams():
+    with pytest.raises(ValueError):
+        normalize_rois([{"name": "a b", "x": 0, "y": 0, "w": 0.5, "h": 0.5},
+                        {"name": "a_b", "x": 0.5, "y": 0, "w": 0.5, "h": 0.5}])
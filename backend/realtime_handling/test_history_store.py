@@ -0,0 +1,82 @@
+import numpy as np
+
+from realtime_handling.history_store import HistoryStore
+
+START = 1_000_000.0
+DURATION = 2 * 3600
+
+
+def fill(store, rng):
+    """Two hours of 2 Hz results for cameras 1 and 2; camera 2 goes offline for the second hour."""
+    ts = START + np.arange(0, DURATION, 0.5)
+    probs = rng.uniform(0, 100, size=len(ts))
+    for t, p in zip(ts, probs):
+        cameras = [{"cameraId": 1, "probability": float(p), "status": "live"},
+                   {"cameraId": 2, "probability": 50.0, "status": "live" if t < START + 3600 else "connecting"}]
+        store.record({"cameras": cameras}, now=t)
+    return ts, probs
+
+
+def test_query_matches_raw_samples(tmp_path):
+    """
+    Rollups read back from any resolution, across chunk files, must give the
+    min / max / mean of the raw samples of each point.
+    """
+    store = HistoryStore(str(tmp_path), resolutions=(1, 10, 60), buckets_per_chunk=100)
+    ts, probs = fill(store, np.random.default_rng(0))
+
+    for start, end, points in [(START, START + DURATION, 120), (START + 600, START + 1800, 500),
+                               (START + 30, START + 150, 1000)]:
+        result = store.query(1, start, end, points=points)
+        assert result["resolution"] == store.pick_resolution(end - start, points)
+        assert len(result["points"]) <= points + 1
+        for point in result["points"]:
+            mask = (ts >= point["ts"]) & (ts < point["ts"] + result["step"])
+            assert point["samples"] == mask.sum()
+            assert abs(point["min"] - probs[mask].min()) < 0.06
+            assert abs(point["max"] - probs[mask].max()) < 0.06
+            assert abs(point["mean"] - probs[mask].mean()) < 0.06
+
+    # Offline time is a gap, not zeros
+    offline = store.query(2, START, START + DURATION, points=120)
+    assert offline["points"][-1]["ts"] < START + 3600
+    assert all(p["mean"] == 50.0 for p in offline["points"])
+
+
+def test_events_and_reopen(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.record({"cameras": [{"cameraId": 3, "probability": 80.0}]}, now=START)
+    store.record_events([{"type": "incident_start", "cameraId": 3, "incidentId": 7, "peakProbability": 80}],
+                        now=START)
+    store.record_events([{"type": "incident_end", "cameraId": 3, "incidentId": 7, "peakProbability": 93}],
+                        now=START + 60)
+    store.close()
+
+    reopened = HistoryStore(str(tmp_path))
+    result = reopened.query(3, START - 3600, START + 3600, points=500)
+    assert [p["mean"] for p in result["points"]] == [80.0]
+    assert [(e["type"], e["incidentId"], e["peakProbability"]) for e in result["events"]] == [
+        ("incident_start", 7, 80), ("incident_end", 7, 93)]
+    assert reopened.events(3, START + 1, START + 3600)[0]["type"] == "incident_end"
+    assert reopened.cameras() == [3]
+
+
+def test_retention_drops_oldest_chunks(tmp_path):
+    store = HistoryStore(str(tmp_path), resolutions=(1,), buckets_per_chunk=10, keep_chunks=3)
+    for t in range(100):
+        store.record({"cameras": [{"cameraId": 1, "probability": 10.0}]}, now=START + t)
+    assert store._chunks(1, 1) == [int(START) // 10 + k for k in (7, 8, 9)]
+    assert store.query(1, START, START + 100, points=100)["points"][0]["ts"] == START + 70
+
+
+def test_huge_range_only_reads_stored_chunks(tmp_path):
+    """A range far longer than the stored data costs no more than the stored chunks."""
+    store = HistoryStore(str(tmp_path), resolutions=(1, 3600), buckets_per_chunk=100)
+    for t in range(0, 7200, 10):
+        store.record({"cameras": [{"cameraId": 1, "probability": 30.0}]}, now=START + t)
+    year = 365 * 86400
+    result = store.query(1, START - 2000 * year, START + 2000 * year, points=500)
+    assert result["resolution"] == 3600
+    assert len(result["points"]) == 1
+    assert result["points"][0]["samples"] == 720 and result["points"][0]["mean"] == 30.0
+    assert store.query(2, START - 2000 * year, START, points=500)["points"] == []
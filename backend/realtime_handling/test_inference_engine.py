@@ -0,0 +1,35 @@
+import numpy as np
+import torch
+from torch import nn
+
+from realtime_handling.frame_to_vector import frames_to_vectors
+from realtime_handling.inference_engine import RealtimeEngine
+
+NUM_FRAMES = 3
+POOL = 4
+
+
+def test_extract_matches_frames_to_vectors():
+    """
+    RealtimeEngine must feed the backbone the same normalized RGB batch as
+    frames_to_vectors, and reuse its buffers across calls.
+    """
+    # Small stand-in backbone: pooled pixels keep the check sensitive to channel order and normalization
+    backbone = nn.Sequential(nn.AdaptiveAvgPool2d(POOL), nn.Flatten())
+    engine = RealtimeEngine(backbone, device="cpu", feature_dim=3 * POOL * POOL, capacity=NUM_FRAMES)
+    rng = np.random.default_rng(0)
+
+    for _ in range(2):
+        frames = [rng.integers(0, 256, (224, 224, 3), dtype=np.uint8) for _ in range(NUM_FRAMES)]
+        expected = frames_to_vectors(frames, backbone, device="cpu")
+        features = engine.extract(frames)
+        assert torch.allclose(features, expected, atol=1e-5)
+
+    index = engine.index([2, 0])
+    assert torch.equal(engine.gather(features, index), features[[2, 0]])
+    assert engine.reallocations == 1
+
+
+if __name__ == "__main__":
+    test_extract_matches_frames_to_vectors()
+    print("RealtimeEngine parity OK")
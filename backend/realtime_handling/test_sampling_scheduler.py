@@ -0,0 +1,40 @@
+from realtime_handling.sampling_scheduler import AdaptiveSamplingScheduler
+
+NUM_IDLE = 40
+NUM_HOT = 4
+
+
+def test_inactive_cameras_take_no_budget():
+    """
+    Suspended / dead cameras (not candidates) must not dilute the budget of the live ones.
+    """
+    scheduler = AdaptiveSamplingScheduler(budget_fps=8.0, min_rate=0.2, max_rate=5.0)
+    for _ in range(NUM_IDLE + NUM_HOT):
+        scheduler.add_camera()
+    hot = list(range(NUM_IDLE, NUM_IDLE + NUM_HOT))
+    for i in hot:
+        scheduler.update(i, probability=100, motion=100)
+
+    rates = scheduler.allocate(candidates=hot)
+    assert all(abs(rates[i] - 2.0) < 1e-6 for i in hot)
+    assert all(rate == 0.0 for rate in rates[:NUM_IDLE])
+
+    alone = AdaptiveSamplingScheduler(budget_fps=8.0, min_rate=0.2, max_rate=5.0)
+    for _ in hot:
+        alone.add_camera()
+        alone.update(len(alone.cameras) - 1, probability=100, motion=100)
+    assert [round(r, 6) for r in alone.allocate()] == [round(rates[i], 6) for i in hot]
+
+    # due() shares the budget among its candidates only
+    assert scheduler.due(candidates=hot, now=0.0) == hot
+    assert sum(cam.rate for cam in scheduler.cameras) <= 8.0 + 1e-6
+
+
+def test_budget_floor_and_cap_with_all_cameras():
+    scheduler = AdaptiveSamplingScheduler(budget_fps=8.0, min_rate=0.2, max_rate=5.0)
+    for _ in range(3):
+        scheduler.add_camera()
+    scheduler.update(0, probability=100)
+    rates = scheduler.allocate()
+    assert rates[1] == rates[2] == 0.2
+    assert rates[0] <= 5.0 and sum(rates) <= 8.0 + 1e-6
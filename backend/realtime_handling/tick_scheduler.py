@@ -0,0 +1,88 @@
+import time
+import asyncio
+import math
+from collections import deque
+
+
+class TickScheduler:
+    """
+    Fixed-rate tick clock for the realtime loop.
+
+    Ticks are aligned to a grid of period = 1 / rate_hz seconds, so processing
+    time is compensated instead of added to the period (no drift). When a tick
+    overruns its deadline, the missed grid slots are skipped rather than run
+    back-to-back, so a slow tick never builds a backlog.
+
+    Usage:
+        ticker = TickScheduler(5)
+        while True:
+            await ticker.wait_next()
+            ... one tick of work ...
+    """
+    def __init__(self, rate_hz=5.0, stats_window=10.0):
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.stats_window = stats_window
+
+        self._next = None
+        self._tick_start = None
+        self._tick_times = deque()
+        self.ticks = 0
+        self.deadline_misses = 0
+        self.skipped_ticks = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def _delay_until_next(self):
+        """
+        Book the next tick and return how long to sleep before it.
+        """
+        now = time.monotonic()
+        if self._next is None:
+            self._next = now
+        if self._tick_start is not None:
+            self.last_duration = now - self._tick_start
+            self.max_duration = max(self.max_duration, self.last_duration)
+
+        if now > self._next:
+            # The previous tick ran past the start of this one: skip to the next grid slot
+            missed = math.floor((now - self._next) / self.period) + 1
+            if self._tick_start is not None:
+                self.deadline_misses += 1
+                self.skipped_ticks += missed
+                self._next += missed * self.period
+            else:
+                self._next = now
+
+        delay = max(self._next - now, 0.0)
+        self._tick_start = self._next
+        self._next += self.period
+        return delay
+
+    def _record_tick(self):
+        now = time.monotonic()
+        self.ticks += 1
+        self._tick_times.append(now)
+        while self._tick_times and now - self._tick_times[0] > self.stats_window:
+            self._tick_times.popleft()
+
+    async def wait_next(self):
+        await asyncio.sleep(self._delay_until_next())
+        self._record_tick()
+
+    def achieved_rate(self):
+        if len(self._tick_times) < 2:
+            return 0.0
+        span = self._tick_times[-1] - self._tick_times[0]
+        return (len(self._tick_times) - 1) / span if span > 0 else 0.0
+
+    def stats(self):
+        return {
+            "target_rate": self.rate_hz,
+            "achieved_rate": round(self.achieved_rate(), 3),
+            "ticks": self.ticks,
+            "deadline_misses": self.deadline_misses,
+            "skipped_ticks": self.skipped_ticks,
+            "last_tick_duration": round(self.last_duration, 4),
+            "max_tick_duration": round(self.max_duration, 4),
+        }
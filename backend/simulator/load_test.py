@@ -0,0 +1,106 @@
+"""
+Ingest load test against the local stream simulator.
+
+For every camera count, starts a simulator with that many cameras, opens one
+capture worker per camera (same code path as RealtimePipeline) and reports:
+    - decoded fps (total and slowest camera) against what the simulator offers
+    - read age: now - capture_ts of the frame read_latest() returns, sampled like the realtime loop
+    - dropped frames, stale reads and reconnects
+    - CPU used by this process (simulator + thread ingest; process ingest runs elsewhere)
+
+Example:
+    python -m simulator.load_test --cameras 8 32 64 --fps 15 --duration 20
+    python -m simulator.load_test --cameras 32 --ingest process --backend ffmpeg
+"""
+import time
+import argparse
+
+import numpy as np
+
+from simulator.stream_simulator import SimulatorServer
+from realtime_handling.connect_phone_cam import create_capture_worker
+
+
+def run_load_test(num_cameras, fps=15.0, width=1280, height=720, duration=20.0, warmup=3.0,
+                  backend="opencv", ingest="thread", sample_hz=5.0, fault_rate=0.0, port=0):
+    """
+    Run one load test point.
+
+    Returns:
+        dict: summary metrics for this camera count
+    """
+    server = SimulatorServer(num_cameras, fps, width, height, fault_rate=fault_rate, port=port).start()
+    if ingest == "process":
+        from realtime_handling.shm_ingest import ProcessCaptureWorker
+        workers = [ProcessCaptureWorker(url, backend=backend).start() for url in server.camera_urls()]
+    else:
+        workers = [create_capture_worker(url, backend=backend).start() for url in server.camera_urls()]
+
+    try:
+        time.sleep(warmup)
+        start_decoded = [w.stats()["decoded_frames"] for w in workers]
+        ages = []
+        live_samples = 0
+        start_cpu = time.process_time()
+        start = time.time()
+        while time.time() - start < duration:
+            for worker in workers:
+                frame, capture_ts = worker.read_latest()
+                if frame is not None:
+                    ages.append(time.time() - capture_ts)
+                    live_samples += 1
+            time.sleep(1.0 / sample_hz)
+        elapsed = time.time() - start
+        cpu = time.process_time() - start_cpu
+
+        stats = [w.stats() for w in workers]
+    finally:
+        for worker in workers:
+            worker.stop()
+        server.stop()
+
+    per_camera_fps = [(s["decoded_frames"] - d0) / elapsed for s, d0 in zip(stats, start_decoded)]
+    ages_ms = np.array(ages) * 1000 if ages else np.zeros(1)
+    return {
+        "cameras": num_cameras,
+        "offered_fps": fps * num_cameras,
+        "decoded_fps": round(sum(per_camera_fps), 1),
+        "min_camera_fps": round(min(per_camera_fps), 1),
+        "live_read_ratio": round(live_samples / max(1, len(workers) * int(duration * sample_hz)), 3),
+        "read_age_p50_ms": round(float(np.percentile(ages_ms, 50)), 1),
+        "read_age_p99_ms": round(float(np.percentile(ages_ms, 99)), 1),
+        "dropped_frames": sum(s["dropped_frames"] for s in stats),
+        "stale_reads": sum(s["stale_reads"] for s in stats),
+        "reconnects": sum(s["reconnects"] for s in stats),
+        "cpu_percent": round(100 * cpu / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ingest throughput and latency against simulated cameras")
+    parser.add_argument("--cameras", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--backend", default="opencv")
+    parser.add_argument("--ingest", choices=["thread", "process"], default="thread")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="random faults per camera per minute")
+    args = parser.parse_args()
+
+    results = []
+    for num_cameras in args.cameras:
+        print(f"[INFO] Load test: {num_cameras} cameras, {args.width}x{args.height} @ {args.fps} fps, "
+              f"backend={args.backend}, ingest={args.ingest}")
+        results.append(run_load_test(num_cameras, args.fps, args.width, args.height, args.duration,
+                                     backend=args.backend, ingest=args.ingest, fault_rate=args.fault_rate))
+        print(f"[INFO] {results[-1]}")
+
+    columns = list(results[0].keys())
+    print("\n" + " | ".join(columns))
+    for row in results:
+        print(" | ".join(str(row[c]) for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Local multi-camera stream simulator for load testing the realtime path.
+
+Serves N cameras over plain HTTP, each like the IP Webcam app:
+    /cam/<i>/video   multipart MJPEG (what the phones serve on /video)
+    /cam/<i>/raw     raw concatenated JPEG stream (no multipart framing)
+    /cam/<i>/fault   POST ?type=stall|disconnect|corrupt&duration=<sec> to inject a fault
+    /stats           per-camera frames sent, clients and faults
+
+Frames come from a local video file (looped) or are synthetic, and are JPEG
+encoded once at startup, so serving 64 cameras costs almost no CPU on the
+simulator side. Each MJPEG part carries an X-Timestamp header with the unix
+time the frame was sent.
+
+Example:
+    python -m simulator.stream_simulator --cameras 32 --fps 15 --width 1280 --height 720
+    -> camera URLs: http://127.0.0.1:8090/cam/0/video ... /cam/31/video
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import cv2
+import numpy as np
+
+BOUNDARY = "frame"
+
+
+def synthetic_frames(num_frames, width, height):
+    """
+    A bright square moving across a dark gradient, with a frame counter.
+    """
+    base = np.tile(np.linspace(20, 90, width, dtype=np.uint8), (height, 1))
+    frames = []
+    size = max(height // 5, 8)
+    for i in range(num_frames):
+        frame = cv2.cvtColor(base, cv2.COLOR_GRAY2BGR)
+        x = int((width - size) * (0.5 + 0.5 * np.sin(2 * np.pi * i / num_frames)))
+        y = int((height - size) * (0.5 + 0.5 * np.cos(2 * np.pi * i / num_frames)))
+        cv2.rectangle(frame, (x, y), (x + size, y + size), (40, 200, 240), -1)
+        cv2.putText(frame, str(i), (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        frames.append(frame)
+    return frames
+
+
+def video_frames(video_path, num_frames, width, height):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < num_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+    cap.release()
+    if not frames:
+        raise RuntimeError(f"[ERROR] No frame could be read from {video_path}")
+    return frames
+
+
+def encode_jpegs(frames, quality=80):
+    return [cv2.imencode(".jpg", f, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes() for f in frames]
+
+
+class SimulatedCamera:
+    """
+    One simulated camera: a looped clip advanced by the server clock, plus injected faults.
+    """
+    def __init__(self, index, jpegs):
+        self.index = index
+        self.jpegs = jpegs
+        self.position = random.randrange(len(jpegs))  # cameras do not all show the same frame
+        self.frame_seq = 0
+        self.condition = threading.Condition()
+
+        self.stalled_until = 0.0
+        self.disconnected_until = 0.0
+        self.corrupt_until = 0.0
+        self.frames_sent = 0
+        self.clients = 0
+        self.faults = {"stall": 0, "disconnect": 0, "corrupt": 0}
+
+    def advance(self):
+        with self.condition:
+            self.position = (self.position + 1) % len(self.jpegs)
+            self.frame_seq += 1
+            self.condition.notify_all()
+
+    def inject(self, fault, duration):
+        until = time.time() + duration
+        if fault == "stall":
+            self.stalled_until = until
+        elif fault == "disconnect":
+            self.disconnected_until = until
+        elif fault == "corrupt":
+            self.corrupt_until = until
+        else:
+            raise ValueError(f"Unknown fault '{fault}'")
+        self.faults[fault] += 1
+
+    def is_disconnected(self):
+        return time.time() < self.disconnected_until
+
+    def next_jpeg(self, last_seq, timeout=1.0):
+        """
+        Wait for a frame newer than last_seq. Returns (seq, jpeg bytes) or (last_seq, None).
+        """
+        with self.condition:
+            if self.frame_seq == last_seq:
+                self.condition.wait(timeout)
+            if self.frame_seq == last_seq or time.time() < self.stalled_until:
+                return last_seq, None
+            jpeg = self.jpegs[self.position]
+            seq = self.frame_seq
+
+        if time.time() < self.corrupt_until:
+            # Keep the JPEG markers but scramble the entropy-coded data
+            cut = len(jpeg) // 3
+            jpeg = jpeg[:cut] + bytes(random.getrandbits(8) for _ in range(64)) + jpeg[2 * cut:]
+        return seq, jpeg
+
+
+class SimulatorServer:
+    """
+    Owns the cameras, the frame clock and the HTTP server.
+
+    Args:
+        fault_rate (float): average random faults per camera per minute (0 = only manual faults)
+    """
+    def __init__(self, num_cameras=8, fps=15.0, width=1280, height=720, video_path=None,
+                 loop_frames=60, host="127.0.0.1", port=8090, fault_rate=0.0, fault_duration=3.0):
+        if video_path:
+            frames = video_frames(video_path, loop_frames, width, height)
+        else:
+            frames = synthetic_frames(loop_frames, width, height)
+        jpegs = encode_jpegs(frames)
+        print(f"[INFO] Simulator: {num_cameras} cameras, {len(jpegs)} frames {width}x{height} @ {fps} fps, "
+              f"~{sum(map(len, jpegs)) // len(jpegs) // 1024} KB/frame")
+
+        self.cameras = [SimulatedCamera(i, jpegs) for i in range(num_cameras)]
+        self.fps = fps
+        self.fault_rate = fault_rate
+        self.fault_duration = fault_duration
+        self.host = host
+        self._stop_event = threading.Event()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+
+    def url(self, index, kind="video"):
+        return f"http://{self.host}:{self.port}/cam/{index}/{kind}"
+
+    def camera_urls(self, kind="video"):
+        return [self.url(i, kind) for i in range(len(self.cameras))]
+
+    def _clock(self):
+        period = 1.0 / self.fps
+        next_tick = time.monotonic()
+        fault_prob = self.fault_rate / 60.0 * period
+        while not self._stop_event.is_set():
+            for cam in self.cameras:
+                cam.advance()
+                if fault_prob and random.random() < fault_prob:
+                    cam.inject(random.choice(["stall", "disconnect", "corrupt"]), self.fault_duration)
+            next_tick += period
+            self._stop_event.wait(max(next_tick - time.monotonic(), 0))
+
+    def start(self):
+        threading.Thread(target=self._clock, name="simulator-clock", daemon=True).start()
+        threading.Thread(target=self.httpd.serve_forever, name="simulator-http", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self):
+        return [
+            {"camera": c.index, "frames_sent": c.frames_sent, "clients": c.clients, "faults": dict(c.faults)}
+            for c in self.cameras
+        ]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.0"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _camera(self, parts):
+                try:
+                    return server.cameras[int(parts[1])]
+                except (IndexError, ValueError):
+                    return None
+
+            def _send_json(self, data, status=200):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                parts = urlparse(self.path).path.strip("/").split("/")
+                if parts == ["stats"]:
+                    return self._send_json(server.stats())
+                cam = self._camera(parts) if len(parts) == 3 and parts[0] == "cam" else None
+                if cam is None or parts[2] not in ("video", "raw"):
+                    return self._send_json({"message": "not found"}, 404)
+                if cam.is_disconnected():
+                    return self._send_json({"message": "camera offline"}, 503)
+                self._stream(cam, multipart=parts[2] == "video")
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                cam = self._camera(parts) if len(parts) == 3 and parts[2] == "fault" else None
+                if cam is None:
+                    return self._send_json({"message": "not found"}, 404)
+                query = parse_qs(url.query)
+                try:
+                    cam.inject(query.get("type", ["stall"])[0], float(query.get("duration", [server.fault_duration])[0]))
+                except ValueError as e:
+                    return self._send_json({"message": str(e)}, 400)
+                self._send_json({"camera": cam.index, "faults": cam.faults})
+
+            def _stream(self, cam, multipart):
+                self.send_response(200)
+                if multipart:
+                    self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+                else:
+                    self.send_header("Content-Type", "video/x-motion-jpeg")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+
+                cam.clients += 1
+                seq = -1
+                try:
+                    while not server._stop_event.is_set():
+                        if cam.is_disconnected():
+                            break
+                        seq, jpeg = cam.next_jpeg(seq)
+                        if jpeg is None:
+                            continue
+                        if multipart:
+                            self.wfile.write(
+                                f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                f"Content-Length: {len(jpeg)}\r\nX-Timestamp: {time.time():.6f}\r\n\r\n".encode()
+                            )
+                            self.wfile.write(jpeg)
+                            self.wfile.write(b"\r\n")
+                        else:
+                            self.wfile.write(jpeg)
+                        cam.frames_sent += 1
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    cam.clients -= 1
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve simulated IP Webcam MJPEG streams")
+    parser.add_argument("--cameras", type=int, default=8)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--video", default=None, help="local video file to loop (default: synthetic frames)")
+    parser.add_argument("--loop-frames", type=int, default=60)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="random faults per camera per minute")
+    parser.add_argument("--fault-duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    server = SimulatorServer(args.cameras, args.fps, args.width, args.height, args.video, args.loop_frames,
+                             args.host, args.port, args.fault_rate, args.fault_duration).start()
+    print(f"[INFO] Serving {server.url(0)} ... {server.url(args.cameras - 1)}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from collections import deque
+
+import torch
+
+from tsm.tsm_class_definition import TSMFeatureModel
+
+NUM_CAMERAS = 3
+N_SEGMENT = 4
+FEATURE_DIM = 64
+NUM_TICKS = 20
+
+
+class ReferenceWindows:
+    """
+    Plain per-camera windows of the last N_SEGMENT features, the first feature
+    of a camera filling its whole window (what the streaming state must match).
+    """
+    def __init__(self, num_cameras):
+        self.windows = [deque(maxlen=N_SEGMENT) for _ in range(num_cameras)]
+
+    def push(self, features, rows):
+        for feature, row in zip(features, rows):
+            window = self.windows[row]
+            window.extend([feature] * (N_SEGMENT if not window else 1))
+
+    def window(self):
+        return torch.stack([torch.stack(list(window)) for window in self.windows])
+
+
+def test_step_matches_full_window_forward():
+    """
+    TSMFeatureModel.step must give the same logits as forward() on the full
+    window of the last n_segment features, including partial updates.
+    """
+    torch.manual_seed(0)
+    model = TSMFeatureModel(feature_dim=FEATURE_DIM, num_classes=2, n_segment=N_SEGMENT).eval()
+    reference = ReferenceWindows(NUM_CAMERAS)
+    state = model.init_stream_state(NUM_CAMERAS)
+
+    with torch.no_grad():
+        for tick in range(NUM_TICKS):
+            # Camera 2 only delivers a frame every third tick
+            rows = [0, 1, 2] if tick % 3 == 0 else [0, 1]
+            features = torch.randn(len(rows), FEATURE_DIM)
+
+            reference.push(features, rows)
+            logits, state = model.step(features, state, rows=rows, resync_every=7)
+
+            expected = model(reference.window())
+            assert torch.allclose(logits, expected, atol=1e-5), f"mismatch at tick {tick}"
+
+
+def test_replay_matches_step():
+    """
+    TSMFeatureModel.replay must give the logits of pushing the same features
+    through step() one at a time, across chunk boundaries.
+    """
+    torch.manual_seed(0)
+    model = TSMFeatureModel(feature_dim=FEATURE_DIM, num_classes=2, n_segment=N_SEGMENT).eval()
+    features = torch.randn(NUM_TICKS, FEATURE_DIM)
+    state = model.init_stream_state(1)
+
+    with torch.no_grad():
+        expected = torch.cat([model.step(f.unsqueeze(0), state, resync_every=7)[0].clone() for f in features])
+        replayed = model.replay(features, chunk_size=6)
+    assert torch.allclose(replayed, expected, atol=1e-5)
+
+
+if __name__ == "__main__":
+    test_step_matches_full_window_forward()
+    test_replay_matches_step()
+    print("TSM streaming parity OK")
@@ -1,12 +1,80 @@
 # add the path into the system temporatory
 import sys
 sys.path.append(r"tsm\temporal-shift-module")
+import torch
 from torch import nn
 
 # Defining architecture
 from ops.temporal_shift import TemporalShift
 from ops.models import TSN # Hai class trên sẽ import dc sau khi thêm tsm\temporal-shift-module vào hệ thống
 
+class TSMStreamState:
+    """
+    Cached intermediate state for TSMFeatureModel.step (one row per camera).
+
+    Like the shift buffers of online_demo/mobilenet_v2_tsm.py, it keeps what the
+    next timestep needs instead of recomputing the whole window:
+        hidden:      (B, T, F) ring of fc1 + ReLU outputs of the last T features
+        head:        (B,) next write slot, i.e. the oldest entry of the window
+        filled:      (B,) number of real features seen (0 = no history yet)
+        running_sum: (B, F) sum of hidden over the window
+    plus the work buffers of step / stream_logits, kept from one tick to the next
+    so a steady-state step allocates nothing new.
+    """
+    def __init__(self, batch_size, n_segment, feature_dim, device='cpu', dtype=torch.float32):
+        self.n_segment = n_segment
+        self.hidden = torch.zeros(batch_size, n_segment, feature_dim, device=device, dtype=dtype)
+        self.head = torch.zeros(batch_size, dtype=torch.long, device=device)
+        self.filled = torch.zeros(batch_size, dtype=torch.long, device=device)
+        self.running_sum = torch.zeros(batch_size, feature_dim, device=device, dtype=dtype)
+        self.steps_since_resync = 0
+        self._scratch = {}
+
+    @property
+    def batch_size(self):
+        return self.hidden.size(0)
+
+    def scratch(self, name, shape, dtype=None):
+        """
+        Work buffer reused across steps, reallocated only when its shape changes
+        (i.e. when rows are added or removed).
+        """
+        dtype = dtype or self.hidden.dtype
+        buffer = self._scratch.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            # Normal tensor even when created under inference_mode, so it can be reused under no_grad too
+            with torch.inference_mode(False):
+                buffer = self._scratch[name] = torch.empty(shape, dtype=dtype, device=self.hidden.device)
+        return buffer
+
+    def reset(self, rows=None):
+        """Forget the history of the given rows (all rows if None)."""
+        rows = slice(None) if rows is None else torch.as_tensor(rows, dtype=torch.long, device=self.hidden.device)
+        self.hidden[rows] = 0
+        self.head[rows] = 0
+        self.filled[rows] = 0
+        self.running_sum[rows] = 0
+
+    def add_rows(self, count):
+        """Append count empty rows (new cameras) without touching the existing ones."""
+        def grow(t):
+            return torch.cat([t, t.new_zeros((count,) + t.shape[1:])], dim=0)
+        self.hidden = grow(self.hidden)
+        self.head = grow(self.head)
+        self.filled = grow(self.filled)
+        self.running_sum = grow(self.running_sum)
+
+    def remove_rows(self, rows):
+        """Drop the given rows; the remaining rows keep their history and order."""
+        drop = set(int(r) for r in rows)
+        keep = torch.tensor([i for i in range(self.batch_size) if i not in drop],
+                            dtype=torch.long, device=self.hidden.device)
+        self.hidden = self.hidden[keep]
+        self.head = self.head[keep]
+        self.filled = self.filled[keep]
+        self.running_sum = self.running_sum[keep]
+
+
 # ... class TSM
 class TSMFeatureModel(nn.Module):
     """
@@ -55,4 +123,142 @@ class TSMFeatureModel(nn.Module):
 
         # 4️⃣ Output layer
         logits = self.fc_out(x)  # (B, num_classes)
-        return logits
\ No newline at end of file
+        return logits
+
+    # =========================================
+    # Streaming (causal) inference
+    # - the window mean of a kernel-3 conv only depends on the window sum,
+    #   its oldest and its newest entry, so each new timestep costs one fc1
+    #   and one conv step, independent of T
+    # =========================================
+    def init_stream_state(self, batch_size, device=None):
+        device = device or self.fc1.weight.device
+        return TSMStreamState(batch_size, self.n_segment, self.feature_dim,
+                              device=device, dtype=self.fc1.weight.dtype)
+
+    def step(self, new_feature, state=None, rows=None, resync_every=64):
+        """
+        Push one new feature per row and return the logits of the updated windows.
+
+        Matches forward() on the window of the last n_segment features (oldest first),
+        where a row with no history gets its window filled with its first feature.
+
+        Args:
+            new_feature (torch.Tensor): (len(rows), feature_dim) newest features
+            state (TSMStreamState, optional): state from a previous call. None = new state.
+            rows (list[int] or torch.Tensor, optional): rows receiving a feature. None = all.
+            resync_every (int): recompute running sums from the cache every N steps to avoid float drift
+
+        Returns:
+            tuple: (logits (state.batch_size, num_classes), state)
+        """
+        if state is None:
+            state = self.init_stream_state(new_feature.size(0), device=new_feature.device)
+        device = state.hidden.device
+        B, T, F_dim = state.hidden.shape
+        if rows is None:
+            rows = torch.arange(B, out=state.scratch("all_rows", (B,), torch.long))
+        else:
+            rows = torch.as_tensor(rows, dtype=torch.long, device=device)
+
+        R = rows.numel()
+        if R > 0:
+            # h = relu(fc1(x)) into a reused buffer
+            h = torch.addmm(self.fc1.bias, new_feature.to(device, state.hidden.dtype), self.fc1.weight.t(),
+                            out=state.scratch("h", (B, F_dim))[:R])
+            h.relu_()
+
+            # Slot of each row in the flattened (B * T, F) ring: row * T + head
+            head = torch.index_select(state.head, 0, rows, out=state.scratch("head", (B,), torch.long)[:R])
+            slot = torch.mul(rows, T, out=state.scratch("slot", (B,), torch.long)[:R]).add_(head)
+            ring = state.hidden.view(B * T, F_dim)
+
+            delta = torch.index_select(ring, 0, slot, out=state.scratch("delta", (B, F_dim))[:R])
+            delta.neg_().add_(h)  # h - evicted
+            ring.index_copy_(0, slot, h)
+            state.running_sum.index_add_(0, rows, delta)
+
+            # First feature of a row: fill the whole window with it
+            filled = torch.index_select(state.filled, 0, rows, out=state.scratch("filled", (B,), torch.long)[:R])
+            if not bool(filled.all()):
+                is_new = filled == 0
+                new_rows = rows[is_new]
+                state.hidden[new_rows] = h[is_new].unsqueeze(1).expand(-1, self.n_segment, -1)
+                state.running_sum[new_rows] = h[is_new] * self.n_segment
+
+            state.head.index_copy_(0, rows, head.add_(1).remainder_(T))
+            state.filled.index_copy_(0, rows, filled.add_(1).clamp_(max=T))
+
+        state.steps_since_resync += 1
+        if state.steps_since_resync >= resync_every:
+            torch.sum(state.hidden, dim=1, out=state.running_sum)
+            state.steps_since_resync = 0
+
+        return self.stream_logits(state), state
+
+    def stream_logits(self, state):
+        """
+        Logits of the current window of every row, without recomputing it.
+
+        The returned tensor is a work buffer of state: it is overwritten by the next step.
+        """
+        B, T, F_dim = state.hidden.shape
+        ring = state.hidden.view(B * T, F_dim)
+        base = torch.arange(0, B * T, T, out=state.scratch("base", (B,), torch.long))  # row * T
+        index = state.scratch("index", (B,), torch.long)
+        oldest = torch.index_select(ring, 0, torch.add(base, state.head, out=index),
+                                    out=state.scratch("oldest", (B, F_dim)))
+        newest = torch.index_select(ring, 0, torch.add(state.head, T - 1, out=index).remainder_(T).add_(base),
+                                    out=state.scratch("newest", (B, F_dim)))
+        total = state.running_sum
+
+        # mean_t conv(x)_t = (W0 (S - x_last) + W1 S + W2 (S - x_first)) / T + b
+        z = state.scratch("z", (B, F_dim, 3))
+        z[:, :, 0].copy_(total).sub_(newest)
+        z[:, :, 1].copy_(total)
+        z[:, :, 2].copy_(total).sub_(oldest)
+        z.div_(T)
+        # A kernel-3 conv over a length-3 input is one matmul with the flattened weight
+        weight = self.temporal_conv.weight.view(F_dim, F_dim * 3)
+        x = torch.addmm(self.temporal_conv.bias, z.view(B, F_dim * 3), weight.t(),
+                        out=state.scratch("x", (B, F_dim)))
+
+        return torch.addmm(self.fc_out.bias, x, self.fc_out.weight.t(),
+                           out=state.scratch("logits", (B, self.num_classes)))
+
+    def replay(self, features, chunk_size=4096):
+        """
+        Logits step() would return at each position when the features are pushed
+        one at a time into a fresh row, computed for the whole sequence at once
+        (used to re-score logged features).
+
+        Args:
+            features (torch.Tensor): (N, feature_dim) features of one stream, oldest first
+                (any dtype / device: converted chunk by chunk)
+            chunk_size (int): positions scored per batch, bounds the memory used
+
+        Returns:
+            torch.Tensor: (N, num_classes) logits
+        """
+        T = self.n_segment
+        N = features.size(0)
+        if N == 0:
+            return features.new_zeros(0, self.num_classes)
+        weight = self.temporal_conv.weight.view(self.feature_dim, self.feature_dim * 3)
+        logits = []
+        for start in range(0, N, chunk_size):
+            end = min(start + chunk_size, N)
+            # Window of position t: features t-T+1 .. t, the first feature standing in before position 0
+            first = max(start - T + 1, 0)
+            h = self.relu(self.fc1(features[first:end].to(self.fc1.weight.device, self.fc1.weight.dtype)))
+            missing = T - 1 - (start - first)
+            if missing > 0:
+                h = torch.cat([h[:1].expand(missing, -1), h])
+            windows = h.unfold(0, T, 1)                       # (end - start, F, T)
+            total = windows.sum(dim=2)
+            newest, oldest = windows[:, :, -1], windows[:, :, 0]
+            z = torch.stack([total - newest, total, total - oldest], dim=2) / T
+            x = torch.addmm(self.temporal_conv.bias, z.reshape(end - start, -1), weight.t())
+            logits.append(self.fc_out(x))
+        return torch.cat(logits)
+
@@ -29,7 +29,9 @@ const App: React.FC = () => {
         const newData: ViolenceDetectionData = JSON.parse(event.data);
         const newProbs: Record<number, number> = {};
         for (const cam of newData.cameras) {
-          newProbs[cam.cameraId] = cam.probability;
+          if (cam.probability !== null) {
+            newProbs[cam.cameraId] = cam.probability;
+          }
         }
         setCameraProbabilities(newProbs);
         setDetectionHistory(prevData => [newData, ...prevData.slice(0, 49)]); // Keep last 50 entries
@@ -3,6 +3,9 @@ import React, { useState, useEffect, useRef } from 'react';
 import type { Camera } from '../types';
 import { CameraIcon, LoadingSpinner } from './icons';
 
+// The backend re-serves every camera it already pulls, so the phone is only read once
+const PREVIEW_PROXY_URL = 'http://127.0.0.1:8000/preview';
+
 interface CameraFeedProps {
   camera: Camera;
   probability: number;
@@ -13,6 +16,8 @@ export const CameraFeed: React.FC<CameraFeedProps> = ({ camera, probability }) =
   const [isLoading, setIsLoading] = useState(true);
   const [hasError, setHasError] = useState(false);
   const [errorMessage, setErrorMessage] = useState('Stream Unavailable');
+  // Fall back to the camera's own URL if the backend does not know this camera
+  const [useProxy, setUseProxy] = useState(true);
 
   const isAlert = probability > 50;
 
@@ -20,6 +25,7 @@ export const CameraFeed: React.FC<CameraFeedProps> = ({ camera, probability }) =
     // Reset state whenever the camera source changes
     setIsLoading(true);
     setHasError(false);
+    setUseProxy(true);
 
     if (!camera.isLocal) {
       // For MJPEG streams, loading/error is handled by the <img> tag's onLoad/onError events
@@ -97,11 +103,15 @@ export const CameraFeed: React.FC<CameraFeedProps> = ({ camera, probability }) =
           />
         ) : (
           <img
-            src={camera.streamUrl}
+            src={useProxy ? `${PREVIEW_PROXY_URL}?url=${encodeURIComponent(camera.streamUrl)}` : camera.streamUrl}
             alt={`Live feed from ${camera.name}`}
             className={`w-full h-full object-cover ${isLoading || hasError ? 'invisible' : ''}`}
             onLoad={() => setIsLoading(false)}
             onError={() => {
+              if (useProxy) {
+                setUseProxy(false);
+                return;
+              }
               setHasError(true);
               setErrorMessage('Stream Unavailable');
               setIsLoading(false);
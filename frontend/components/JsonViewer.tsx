@@ -36,12 +36,12 @@ export const JsonViewer: React.FC<JsonViewerProps> = ({ data }) => {
           </p>
           <div className="grid grid-cols-2 gap-x-4 gap-y-1">
             {entry.cameras.map(cam => {
-              const isAlert = cam.probability > 50;
+              const isAlert = cam.probability !== null && cam.probability > 50;
               return (
                 <p key={cam.cameraId}>
                   <span className="text-cyan-400">Cam {cam.cameraId}:</span>
                   <span className={`ml-2 font-bold ${isAlert ? 'text-red-500' : 'text-green-400'}`}>
-                    {cam.probability}%
+                    {cam.probability === null ? '–' : `${cam.probability}%`}
                   </span>
                 </p>
               )
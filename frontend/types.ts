@@ -8,13 +8,55 @@ export interface Camera {
 
 export interface CameraProbability {
   cameraId: number;
-  probability: number;
+  probability: number | null;  // null until the camera's TSM window received a frame
+  status?: string;
+  captureTs?: number | null; // unix seconds of the frame behind this probability
+  rois?: RoiProbability[];     // only for cameras with regions of interest; probability = max over them
+}
+
+export interface RoiProbability {
+  name: string;
+  probability: number | null;
+}
+
+export interface ResultTiming {
+  inferenceStartTs: number;
+  backboneEndTs: number;
+  inferenceEndTs: number;
+  emitTs: number;
 }
 
 export interface ViolenceDetectionData {
   id: number;
   timestamp: string;
   cameras: CameraProbability[];
+  timing?: ResultTiming;
+}
+
+export interface HistoryPoint {
+  ts: number;      // unix seconds, start of the point
+  min: number;
+  max: number;
+  mean: number;
+  samples: number;
+}
+
+export interface HistoryEvent {
+  ts: number;
+  type: 'incident_start' | 'incident_end';
+  incidentId: number;
+  peakProbability: number;
+}
+
+export interface CameraHistory {
+  cameraId: number;
+  start: number;
+  end: number;
+  resolution: number; // seconds per stored bucket
+  step: number;       // seconds per point; buckets without samples are left out
+  points: HistoryPoint[];
+  events: HistoryEvent[];
+  elapsedMs: number;
 }
 
 export interface TimestampProbability {